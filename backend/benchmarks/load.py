@@ -0,0 +1,373 @@
+"""
+HTTP load benchmark of the movies API: throughput, tail latency and DB queries per request
+
+Seeds a SQLite database with `--rows` movies (built once per size, then copied for each run),
+starts the app under uvicorn in a subprocess, with OMDB replaced by an in-process stub
+answering after `--omdb-latency` seconds, and drives each scenario at fixed concurrency.
+DB queries per request come from the app's own /metrics. Results are printed and saved as
+JSON, `--compare` prints the change against a previous result file
+
+    cd backend && python -m benchmarks.load --rows 100000 --concurrency 32
+
+The load generator is a Python process too: when the server stops scaling with
+`--concurrency`, check the generator is not the one saturating a CPU
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+SCENARIOS = ("list", "detail", "search", "create", "delete")
+# Read scenarios get unmeasured warm-up requests, the write ones would change the dataset
+READ_SCENARIOS = ("list", "detail", "search")
+WARMUP_REQUESTS = 50
+
+# Seeded titles are "<word> <word> <n>", so every search word matches many movies
+TITLE_WORDS = (
+    "black", "city", "dark", "dream", "empire", "fire", "ghost", "golden", "heart", "last",
+    "lost", "love", "midnight", "night", "ocean", "red", "river", "secret", "shadow", "star",
+    "storm", "summer", "winter", "wild",
+)
+GENRES = ("Drama", "Comedy", "Action, Thriller", "Sci-Fi", "Crime, Drama", "Animation")
+SEED_BATCH_ROWS = 10_000
+LIST_PAGES = 100  # Pages the list scenario spreads over
+ADMIN_TOKEN = "token123"
+STARTUP_TIMEOUT = 600.0
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+
+def configure_environment(db_path: str) -> None:
+    """Point the app settings at the benchmark database, before anything imports them"""
+    os.environ["ENV"] = "DEV"
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("APP_TITLE", "Movies benchmark")
+    os.environ.setdefault("OMDB_API_KEY", "benchmark")
+    os.environ["OMDB_CACHE_PATH"] = ""  # In memory, every run starts cold
+    os.environ.setdefault("OMDB_RATE_LIMIT", "100000")  # The stub is not rate limited
+    os.environ.setdefault("SLOW_QUERY_MS", "0")  # Logging would dominate the measurements
+
+
+class OMDBStub(httpx.AsyncBaseTransport):
+    """
+    OMDB stand-in answering every title lookup with a new movie after `latency` seconds
+    """
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.latency)
+        self.calls += 1
+        title = request.url.params.get("t", "Unknown")
+        return httpx.Response(200, json={
+            "Response": "True", "Title": title, "Year": "2024", "imdbID": f"tt{20_000_000 + self.calls}",
+            "Type": "movie", "Poster": "N/A", "Genre": "Drama", "Director": "Jane Doe", "Plot": "Benchmarked.",
+        })
+
+
+def serve(db_path: str, port: int, omdb_latency: float) -> None:
+    """Run the app under uvicorn on `db_path`, with OMDB replaced by OMDBStub"""
+    configure_environment(db_path)
+    import uvicorn
+
+    import main
+    from config.settings import settings
+    from utils.omdb_api import OMDBClient
+
+    logging.getLogger().setLevel(logging.WARNING)  # The app logs every request at DEBUG
+    app_lifespan = main.app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with app_lifespan(app):
+            await app.state.omdb_client.aclose()
+            app.state.omdb_client = OMDBClient(
+                settings.OMDB_API_KEY, transport=OMDBStub(omdb_latency), rate_limit=settings.OMDB_RATE_LIMIT
+            )
+            yield
+
+    main.app.router.lifespan_context = lifespan
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+async def seed_database(db_path: str, rows: int) -> None:
+    """Create the schema, full-text index and `rows` movies with titles made of TITLE_WORDS"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from models import metadata
+    from repositories.movie import movies_table
+    from repositories.search import get_search_backend
+
+    rng = random.Random(0)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        for start in range(1, rows + 1, SEED_BATCH_ROWS):
+            await conn.execute(movies_table.insert(), [
+                {
+                    "title": f"{rng.choice(TITLE_WORDS).title()} {rng.choice(TITLE_WORDS)} {i}",
+                    "imdb_id": f"tt{i:07d}", "year": 1950 + i % 75, "type": "movie",
+                    "poster_url": f"https://example.com/posters/{i}.jpg", "genre": rng.choice(GENRES),
+                    "director": f"Director {i % 5_000}", "plot": "A benchmark movie. " * 5,
+                }
+                for i in range(start, min(start + SEED_BATCH_ROWS, rows + 1))
+            ])
+        await get_search_backend("sqlite").ensure_index(conn)
+    await engine.dispose()
+
+
+def prepare_database(rows: int, workdir: str) -> str:
+    """
+    Copy of a seeded database of `rows` movies, the seeded template is kept in the temp
+    directory so later runs of the same size skip seeding
+    """
+    template = os.path.join(tempfile.gettempdir(), f"movies-benchmark-{rows}.sqlite3")
+    if not os.path.exists(template):
+        print(f"Seeding {rows} movies into {template}...")
+        started = time.perf_counter()
+        partial = f"{template}.partial"
+        if os.path.exists(partial):
+            os.remove(partial)
+        configure_environment(partial)
+        asyncio.run(seed_database(partial, rows))
+        os.replace(partial, template)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+    db_path = os.path.join(workdir, "movies.sqlite3")
+    shutil.copyfile(template, db_path)
+    return db_path
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, server: subprocess.Popen) -> None:
+    """
+    Poll the app until its suggest index is built, the background build would otherwise
+    compete with the measured requests for the CPU
+    """
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    headers = {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Benchmark server exited with code {server.returncode}")
+        try:
+            response = httpx.get(f"{base_url}/api/admin/suggest-index", headers=headers, timeout=1)
+            if response.status_code == 200 and response.json()["ready"]:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Benchmark server not ready after {STARTUP_TIMEOUT:.0f}s")
+
+
+def request_builders(rows: int, seed: int) -> Dict[str, Callable[[int], Request]]:
+    """Request of the i-th call of each scenario, reproducible across runs with the same seed"""
+    rng = random.Random(seed)
+    run_id = uuid.uuid4().hex[:8]  # Titles to create must not be stored by an earlier run
+    auth = {"Authorization": f"Bearer {ADMIN_TOKEN}"}
+    return {
+        "list": lambda i: ("GET", "/api/movies/", {"params": {"page": 1 + rng.randrange(LIST_PAGES)}}),
+        "detail": lambda i: ("GET", f"/api/movies/{rng.randint(1, rows)}", {}),
+        "search": lambda i: ("GET", "/api/movies/search", {"params": {"title": rng.choice(TITLE_WORDS)}}),
+        "create": lambda i: ("POST", "/api/movies/create", {"params": {"title": f"Benchmark {run_id} {i}"}}),
+        # Highest ids first, each deleted once, so the read scenarios run before are not affected
+        "delete": lambda i: ("DELETE", f"/api/movies/{rows - i}", {"headers": auth}),
+    }
+
+
+async def db_queries(client: httpx.AsyncClient) -> float:
+    """Statements run by the server so far, from its /metrics"""
+    response = await client.get("/metrics")
+    return sum(
+        float(line.rsplit(" ", 1)[1])
+        for line in response.text.splitlines()
+        if line.startswith("db_queries_total{")
+    )
+
+
+async def run_scenario(
+        client: httpx.AsyncClient, build: Callable[[int], Request], requests: int, concurrency: int
+) -> Dict[str, Any]:
+    """Send `requests` requests from `concurrency` workers, timing each one"""
+    latencies: List[float] = []
+    errors = 0
+    calls = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in calls:  # Shared iterator: each call is sent by exactly one worker
+            method, url, kwargs = build(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    queries_before = await db_queries(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    queries = await db_queries(client) - queries_before
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentiles[49] * 1000, 2),
+            "p95": round(percentiles[94] * 1000, 2),
+            "p99": round(percentiles[98] * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "max": round(max(latencies, default=0) * 1000, 2),
+        },
+        "db_queries_per_request": round(queries / requests, 2),
+    }
+
+
+async def run_benchmark(base_url: str, args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    builders = request_builders(args.rows, args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for name in args.scenarios:
+            requests = min(args.requests, args.rows - 1) if name == "delete" else args.requests
+            if name in READ_SCENARIOS:
+                await run_scenario(client, builders[name], WARMUP_REQUESTS, args.concurrency)
+            results[name] = await run_scenario(client, builders[name], requests, args.concurrency)
+            print_result(name, results[name])
+    return results
+
+
+def print_result(name: str, result: Dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    print(f"{name:>7}: {result['rps']:8.1f} req/s   p50 {latency['p50']:7.2f} ms   p95 {latency['p95']:7.2f} ms   "
+          f"p99 {latency['p99']:7.2f} ms   {result['db_queries_per_request']:5.2f} queries/req   "
+          f"{result['errors']} errors")
+
+
+def print_comparison(report: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"Compared to {baseline.get('commit')} ({baseline_path}):")
+    if baseline.get("config") != report["config"]:
+        print(f"  Warning: different settings, baseline ran with {baseline.get('config')}")
+    for name, result in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        rps = (result["rps"] / before["rps"] - 1) * 100 if before["rps"] else 0.0
+        p99 = (result["latency_ms"]["p99"] / before["latency_ms"]["p99"] - 1) * 100 if before["latency_ms"]["p99"] else 0.0
+        queries = result["db_queries_per_request"] - before["db_queries_per_request"]
+        print(f"{name:>7}: req/s {rps:+6.1f}%   p99 {p99:+6.1f}%   queries/req {queries:+.2f}")
+
+
+def current_commit() -> str:
+    """Short hash of HEAD, suffixed with -dirty when the tree has changes"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000, help="Movies in the database, e.g. 1000, 100000, 1000000")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument("--requests", type=int, default=2_000, help="Requests sent per scenario")
+    parser.add_argument("--omdb-latency", type=float, default=0.05, help="Seconds the OMDB stub takes to answer")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS),
+                        help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random ids, pages and search words")
+    parser.add_argument("--output", help="Result file, benchmarks/results/<commit>-<rows>.json by default")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    # Internal: run the benchmarked server
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    if args.rows < 2:
+        parser.error("--rows must be at least 2")
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+    if args.serve:
+        serve(args.db, args.port, args.omdb_latency)
+        return
+
+    commit = current_commit()
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = prepare_database(args.rows, workdir)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen([
+            sys.executable, "-m", "benchmarks.load", "--serve", "--db", db_path, "--port", str(port),
+            "--omdb-latency", str(args.omdb_latency),
+        ])
+        try:
+            wait_until_ready(base_url, server)
+            print(f"{args.rows} movies, concurrency {args.concurrency}, {args.requests} requests per scenario, "
+                  f"OMDB latency {args.omdb_latency * 1000:.0f} ms")
+            results = asyncio.run(run_benchmark(base_url, args))
+        finally:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "config": {
+            "rows": args.rows, "concurrency": args.concurrency, "requests": args.requests,
+            "omdb_latency": args.omdb_latency, "seed": args.seed,
+        },
+        "scenarios": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}-{args.rows}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to {output}")
+    if args.compare:
+        print_comparison(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-request serialization time of a movie list page, for 10, 100 and 1000 movies
+
+Compares FastAPI's response_model path (the route builds the model, FastAPI validates it
+again then encodes it with json) to the prebuilt TypeAdapter + orjson path the routes use
+
+    cd backend && python -m benchmarks.serialization
+"""
+import argparse
+import asyncio
+import datetime
+import time
+from typing import Callable, List, Optional
+
+from pydantic import BaseModel
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from models.movies import Movie
+from routers.movies import dump_movies
+from schemas.movies import MovieOut
+
+PAGE_SIZES = (10, 100, 1000)
+
+
+class FullPage(BaseModel):
+    """List page with every field of MovieOut, as `fields=` set to all of them renders it"""
+    movies: List[MovieOut]
+    total_pages: Optional[int]
+    next_cursor: Optional[str]
+
+
+response_field = create_model_field(name="response", type_=FullPage, mode="serialization")
+
+
+def make_movies(count: int) -> List[Movie]:
+    now = datetime.datetime.now()
+    return [
+        Movie(
+            id=i, title=f"Movie {i}", imdb_id=f"tt{i:07d}", year=2000 + i % 25, type="movie",
+            poster_url=f"https://example.com/{i}.jpg", genre="Crime, Drama", director="Jane Doe",
+            plot="A thief who steals corporate secrets through dream-sharing technology. " * 2,
+            created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def response_model_path(movies: List[Movie]) -> bytes:
+    page = FullPage.model_validate({"movies": movies, "total_pages": 1, "next_cursor": None})
+    content = await serialize_response(field=response_field, response_content=page)
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+async def adapter_path(movies: List[Movie]) -> bytes:
+    return ORJSONResponse({"movies": dump_movies(movies), "total_pages": 1, "next_cursor": None}).body
+
+
+def measure(render: Callable, movies: List[Movie], repeat: int) -> float:
+    """Mean milliseconds per call"""
+
+    async def run() -> float:
+        await render(movies)  # Warm-up
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await render(movies)
+        return (time.perf_counter() - started) / repeat * 1000
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=20_000, help="Movies serialized per page size and path")
+    args = parser.parse_args()
+
+    for size in PAGE_SIZES:
+        movies = make_movies(size)
+        repeat = max(5, args.calls // size)
+        before = measure(response_model_path, movies, repeat)
+        after = measure(adapter_path, movies, repeat)
+        print(f"{size:>5} movies: response_model {before:8.3f} ms   adapter+orjson {after:8.3f} ms   "
+              f"x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
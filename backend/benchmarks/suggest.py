@@ -0,0 +1,82 @@
+"""
+Suggest index lookup time on a synthetic catalog, for prefix, typo and no-match queries
+
+Typos and misses go past the prefix lookups to the trigram fallback, the expensive path;
+lookups run on the event loop, so their cost adds to the latency of every concurrent request
+
+    cd backend && python -m benchmarks.suggest --rows 100000
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.suggest import SuggestIndex
+
+# Consonant-vowel syllables give words whose trigrams spread roughly like those of real titles
+SYLLABLES = [consonant + vowel for consonant in "bcdfghklmnprstvz" for vowel in "aeiou"] + ["an", "er", "in", "on"]
+WORDS_PER_TITLE = (1, 4)
+
+
+def make_rows(count: int, seed: int = 1) -> List[Tuple[int, str, int, str]]:
+    """(id, title, year, director) rows with titles made of random pseudo-words"""
+    rng = random.Random(seed)
+    vocabulary = list({"".join(rng.choices(SYLLABLES, k=rng.randint(1, 4))) for _ in range(30_000)})
+    common = ["the", "of", "a", "love", "night", "man", "story"]
+    rows = []
+    for i in range(count):
+        words = rng.choices(vocabulary, k=rng.randint(*WORDS_PER_TITLE))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(common))
+        rows.append((i, " ".join(words).title(), 1950 + i % 75, f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}"))
+    return rows
+
+
+def make_queries(
+        rows: List[Tuple[int, str, int, str]], count: int, seed: int = 2
+) -> Dict[str, List[Tuple[str, Optional[int]]]]:
+    """(query, id expected among the suggestions) per kind: title prefixes, titles with a swapped letter pair, unknown words"""
+    rng = random.Random(seed)
+    sample = rng.sample(rows, count)
+    typos = []
+    for movie_id, title, _, _ in sample:
+        position = rng.randrange(len(title) - 1)
+        typos.append((title[:position] + title[position + 1] + title[position] + title[position + 2:], movie_id))
+    return {
+        "prefix": [(title[:4], None) for _, title, _, _ in sample],
+        "typo": typos,
+        "miss": [("".join(rng.choices("jqwxy", k=rng.randint(6, 14))), None) for _ in range(count)],
+        "common miss": [("the night of love story man"[:rng.randint(12, 27)] + " zq", None) for _ in range(count)],
+    }
+
+
+def measure(index: SuggestIndex, queries: List[Tuple[str, Optional[int]]]) -> Tuple[float, float, Optional[float]]:
+    """Mean and worst milliseconds per suggest call, and share of the expected movies found"""
+    timings = []
+    found = 0
+    for query, expected in queries:
+        started = time.perf_counter()
+        suggestions = index.suggest(query)
+        timings.append((time.perf_counter() - started) * 1000)
+        found += any(suggestion.id == expected for suggestion in suggestions)
+    recall = found / len(queries) if queries[0][1] is not None else None
+    return sum(timings) / len(timings), max(timings), recall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[20_000, 100_000], help="Catalog sizes")
+    parser.add_argument("--queries", type=int, default=500, help="Queries per kind")
+    args = parser.parse_args()
+
+    for count in args.rows:
+        rows = make_rows(count)
+        index = SuggestIndex.build(rows)
+        for kind, queries in make_queries(rows, args.queries).items():
+            mean, worst, recall = measure(index, queries)
+            found = f"   found {recall:.0%}" if recall is not None else ""
+            print(f"{count:>8} movies  {kind:<12} mean {mean:7.3f} ms   worst {worst:7.3f} ms{found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,85 @@
-from config.settings import settings
+OMDB_BASE_URL = "https://www.omdbapi.com/"
 
-OMDB_BASE_URL = f'http://www.omdbapi.com/?apikey={settings.OMDB_API_KEY}&'
+# OMDB HTTP client tuning (seconds / connection counts)
+OMDB_TIMEOUT = 10.0
+OMDB_CONNECT_TIMEOUT = 5.0
+OMDB_MAX_CONNECTIONS = 20
+OMDB_MAX_KEEPALIVE_CONNECTIONS = 10
+OMDB_KEEPALIVE_EXPIRY = 30.0
+
+# OMDB rate limiting shared by every caller: requests/second, burst and the range the
+# adaptive concurrency limit moves in
+OMDB_RATE_LIMIT = 10.0
+OMDB_RATE_BURST = 10
+OMDB_MIN_CONCURRENCY = 1
+OMDB_INITIAL_CONCURRENCY = 4
+OMDB_MAX_CONCURRENCY = OMDB_MAX_CONNECTIONS
+
+# OMDB response cache: in-memory entries and TTLs (seconds) for found / not found payloads
+OMDB_CACHE_SIZE = 10_000
+OMDB_CACHE_TTL = 7 * 24 * 60 * 60
+OMDB_NEGATIVE_CACHE_TTL = 60 * 60
 
 SEED_MOVIE_COUNT = 100
+# Random IMDb IDs are drawn from tt0000001..tt<SEED_MAX_IMDB_ID>, with at most
+# SEED_CALL_BUDGET_FACTOR OMDB lookups per requested movie
+SEED_MAX_IMDB_ID = 100_000
+SEED_CALL_BUDGET_FACTOR = 3
+
+# Seeding pipeline: concurrent OMDB fetches, movies per insert, retries and base backoff (seconds)
+SEED_CONCURRENCY = 10
+SEED_BATCH_SIZE = 50
+SEED_MAX_RETRIES = 3
+SEED_RETRY_BACKOFF = 0.5
+# Most recent seeding errors reported by the seed status endpoint
+SEED_ERROR_HISTORY = 20
+# Offline seeding from a dump file: records read per chunk and movies per insert batch
+SEED_FILE_CHUNK_SIZE = 2_000
+SEED_FILE_BATCH_SIZE = 1_000
+# Seeded movies added to the suggest index at once, every addition re-sorts the index keys
+SEED_INDEX_BATCH_SIZE = 10_000
+
+# Rows per multi-row INSERT of bulk upserts, and most movies accepted by one bulk request
+BULK_BATCH_SIZE = 500
+BULK_MAX_ITEMS = 10_000
+
+# Words MySQL's InnoDB FULLTEXT index leaves out with its default settings: shorter than
+# innodb_ft_min_token_size, or in INNODB_FT_DEFAULT_STOPWORD
+MYSQL_FT_MIN_TOKEN_SIZE = 3
+MYSQL_FT_STOPWORDS = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from", "how", "i", "in",
+    "is", "it", "la", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where", "who",
+    "will", "with", "und", "www",
+))
+
+# Rows fetched per server-side cursor round trip, and sent per chunk, by catalog exports
+EXPORT_BATCH_SIZE = 1_000
+
+# NDJSON imports: movies per upsert batch, longest accepted line and whole upload (bytes), most line errors reported
+IMPORT_BATCH_SIZE = 1_000
+IMPORT_MAX_LINE_BYTES = 64 * 1024
+IMPORT_MAX_BYTES = 64 * 1024 * 1024
+IMPORT_MAX_ERRORS = 1_000
+# Imported movies added to the suggest index at once, every addition re-sorts the index keys
+IMPORT_INDEX_BATCH_SIZE = 10_000
+
+# Upper bounds (seconds) of the latency histograms served at /metrics
+METRICS_HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+METRICS_OMDB_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statements slower than this (milliseconds) are logged with their plan, and most statements a
+# request should run before it is reported as a likely N+1
+SLOW_QUERY_MS = 100
+QUERY_BUDGET = 10
+
+# Seconds a cached movie count may be served before it is recounted
+MOVIE_COUNT_CACHE_TTL = 60
+
+# Read-through cache of movies by id: entries kept in memory and seconds each stays valid
+MOVIE_CACHE_SIZE = 10_000
+MOVIE_CACHE_TTL = 5 * 60
+# Invalidation counters kept per cache, keys share them by hash so their memory stays fixed
+CACHE_GENERATION_SLOTS = 4096
 
 MOVIE_NOT_FOUND_MESSAGE = "Movie not found"
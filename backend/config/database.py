@@ -1,116 +1,497 @@
 import asyncio
+import csv
+import gzip
+import json
 import logging
 import random
-from typing import List, Optional, Dict
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Awaitable, Callable, Deque, Iterator, List, Optional, Dict, Set, TextIO
 
-import httpx
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.declarative import DeclarativeMeta, declarative_base
-from sqlalchemy.orm import sessionmaker
 
-from config.constants import OMDB_BASE_URL
+from config.constants import (
+    SEED_CONCURRENCY,
+    SEED_BATCH_SIZE,
+    SEED_MAX_RETRIES,
+    SEED_RETRY_BACKOFF,
+    SEED_MAX_IMDB_ID,
+    SEED_CALL_BUDGET_FACTOR,
+    SEED_ERROR_HISTORY,
+    SEED_FILE_BATCH_SIZE,
+    SEED_FILE_CHUNK_SIZE,
+)
 from config.settings import settings
 from schemas.movies import MovieCreate
+from utils.metrics import instrument_engine
+from utils.omdb_api import OMDBClient, OMDBError
+from utils.query_log import QueryLog
 from utils.transformers import transform_movie_data
 
 # ORM setup
 engine = settings.get_db_connection()
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Statement counts and latencies served at /metrics
+instrument_engine(engine)
+# Per-request statement tracking and slow-query log
+QueryLog(settings.SLOW_QUERY_MS, settings.SLOW_QUERY_EXPLAIN).install(engine)
+# Objects are kept loaded after commit, lazy refreshes are not possible on an AsyncSession
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 Base: DeclarativeMeta = declarative_base()
 
+# Seeder sink: stores a batch of movies and returns how many were stored
+InsertBatch = Callable[[List[MovieCreate]], Awaitable[int]]
+
+
+@dataclass
+class SeedStats:
+    """
+    Counters of a seeding run, updated live while it runs
+    """
+
+    state: str = "idle"  # idle, pending, running, completed, failed or cancelled
+    requested: int = 0
+    budget: int = 0  # Most OMDB lookups allowed, 0 when not bounded
+    calls: int = 0  # OMDB lookups made
+    skipped: int = 0  # Candidate IDs already stored, never looked up
+    # Every lookup or dump record ends in one of fetched, not_found and failed
+    fetched: int = 0
+    not_found: int = 0
+    failed: int = 0
+    rejected: int = 0  # Fetched movies that were invalid or could not be stored
+    retries: int = 0
+    inserted: int = 0
+    batches: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    errors: Deque[str] = field(default_factory=lambda: deque(maxlen=SEED_ERROR_HISTORY))
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent so far, 0 until the run starts"""
+        if self.state in ("idle", "pending"):
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Movies inserted per second"""
+        return self.inserted / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the OMDB lookups that returned a movie"""
+        return self.fetched / self.calls if self.calls else 0.0
+
+    @property
+    def progress(self) -> float:
+        """
+        Share of the run done: towards the requested movies or the lookup budget, whichever
+        ends the run first, or share of the records processed when there is no budget
+        """
+        if not self.requested:
+            return 0.0
+        if self.budget:
+            return min(max(self.fetched / self.requested, self.calls / self.budget), 1.0)
+        processed = self.fetched + self.not_found + self.failed
+        return min(processed / self.requested, 1.0)
+
+    def record_error(self, message: str) -> None:
+        """Keep the message among the most recent errors"""
+        self.errors.append(message)
+
+    def as_dict(self) -> Dict:
+        return {
+            "state": self.state,
+            "progress": round(self.progress, 3),
+            "requested": self.requested,
+            "budget": self.budget,
+            "calls": self.calls,
+            "skipped": self.skipped,
+            "hit_rate": round(self.hit_rate, 3),
+            "fetched": self.fetched,
+            "not_found": self.not_found,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "inserted": self.inserted,
+            "batches": self.batches,
+            "elapsed": round(self.elapsed, 3),
+            "rate": round(self.rate, 2),
+            "errors": list(self.errors),
+        }
+
+
+def is_retryable(error: OMDBError) -> bool:
+    """Timeouts/connection errors, throttling and server errors are worth retrying"""
+    return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+
 
 class MovieFetcher:
     """
-    Class to handle fetching movie data from OMDB API
+    Class to handle fetching movie data from OMDB API, retrying transient failures
     """
 
-    def __init__(self, client: httpx.AsyncClient, base_url: str = OMDB_BASE_URL):
+    def __init__(
+            self,
+            client: OMDBClient,
+            max_retries: int = SEED_MAX_RETRIES,
+            backoff: float = SEED_RETRY_BACKOFF,
+            stats: Optional[SeedStats] = None,
+            sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
         self.client = client
-        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.stats = stats or SeedStats()
+        self.sleep = sleep
 
     async def fetch_movie(self, imdb_id: str) -> Optional[Dict]:
         """
-        Fetch a movie by IMDb ID from the OMDB API
+        Fetch a movie by IMDb ID from the OMDB API, with exponential backoff on 429/5xx/timeouts
 
         Args:
             imdb_id (str): IMDb ID of the movie.
 
         Returns:
-            Optional[Dict]: Movie data if available, otherwise None
+            Optional[Dict]: Movie data if available, None if OMDB does not know the movie
+
+        Raises:
+            OMDBError: If the movie could not be fetched once retries are exhausted
         """
+        for attempt in range(self.max_retries + 1):
+            try:
+                data = await self.client.fetch_by_imdb_id(imdb_id)
+            except OMDBError as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    logging.error(f"Exception fetching movie {imdb_id}: {e}")
+                    self.stats.record_error(f"{imdb_id}: {e}")
+                    raise
+                delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                logging.warning(f"Retrying movie {imdb_id} in {delay:.2f}s: {e}")
+                self.stats.retries += 1
+                await self.sleep(delay)
+                continue
+
+            if data.get("Response") == "True":
+                logging.debug(f"Movie data: {data}")
+                return data
+            logging.debug(f"Movie {imdb_id} not available: {data.get('Error')}")
+            return None
+
+
+# Seeder source: fills the queue with OMDB payloads
+Producer = Callable[[asyncio.Queue], Awaitable[None]]
+
+
+class BaseSeeder:
+    """
+    Streaming pipeline shared by the seeders: a producer puts OMDB payloads on a bounded
+    queue, the insert stage transforms them into MovieCreate schemas and inserts them
+    every `batch_size` movies
+    """
+
+    def __init__(self, batch_size: int = SEED_BATCH_SIZE, stats: Optional[SeedStats] = None):
+        self.batch_size = batch_size
+        self.stats = stats or SeedStats()
+
+    async def run(self, produce: Producer, insert_batch: InsertBatch) -> SeedStats:
+        """
+        Run the producer and the insert stage concurrently until the producer is exhausted
+
+        Args:
+            produce (Producer): Puts payloads on the queue
+            insert_batch (InsertBatch): Stores a batch of movies, returns how many were stored
+
+        Returns:
+            SeedStats: Counters of the run
+        """
+        self.stats.state = "running"
+        self.stats.started_at = time.monotonic()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.batch_size * 2)
+
+        async def produce_stage():
+            try:
+                await produce(queue)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await queue.put(None)  # Let the insert stage store what was produced
+                raise
+            await queue.put(None)  # End of stream
+
+        producer = asyncio.create_task(produce_stage())
         try:
-            response = await self.client.get(f"{self.base_url}i={imdb_id}")
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("Response") == "True":
-                    logging.debug(f"Movie data: {data}")
-                    return data
-                else:
-                    logging.error(f"Error fetching movie {imdb_id}: {data.get('Error')}")
-            else:
-                logging.error(f"Error fetching movie {imdb_id}: HTTP {response.status_code}")
+            await self.insert_stage(queue, insert_batch)
+            await producer  # Surface producer errors
+            self.stats.state = "completed"
+        except asyncio.CancelledError:
+            self.stats.state = "cancelled"
+            raise
         except Exception as e:
-            logging.error(f"Exception fetching movie {imdb_id}: {e}")
-        return None
+            self.stats.state = "failed"
+            self.stats.record_error(str(e))
+            raise
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+            self.stats.finished_at = time.monotonic()
 
+        logging.info(f"Seeding finished: {self.stats.as_dict()}")
+        return self.stats
 
-class MovieSeeder:
+    async def insert_stage(self, queue: asyncio.Queue, insert_batch: InsertBatch) -> None:
+        """Transform queued payloads and insert them every `batch_size` movies"""
+        batch: List[MovieCreate] = []
+        while (data := await queue.get()) is not None:
+            try:
+                movie = transform_movie_data(data)
+                batch.append(MovieCreate(**movie))
+            except Exception as e:
+                logging.error(f"Invalid movie data {data.get('imdbID')}: {e}")
+                self.stats.record_error(f"{data.get('imdbID')}: invalid movie data")
+                self.stats.rejected += 1
+                continue
+            if len(batch) >= self.batch_size:
+                await self.flush(batch, insert_batch)
+                batch = []
+        if batch:
+            await self.flush(batch, insert_batch)
+
+    async def flush(self, batch: List[MovieCreate], insert_batch: InsertBatch) -> None:
+        inserted = await insert_batch(batch)
+        self.stats.inserted += inserted
+        self.stats.rejected += len(batch) - inserted
+        self.stats.batches += 1
+        logging.debug(f"Inserted batch of {inserted} movies ({self.stats.rate:.1f} movies/s)")
+
+
+class MovieSeeder(BaseSeeder):
     """
     Class to handle seeding the database with movie data
+
+    `concurrency` workers look up random IMDb IDs on OMDB and feed the insert stage until
+    `movie_count` movies were found or `call_budget` lookups were made. Candidate IDs are
+    drawn without repetition and skip the IDs already stored
     """
 
-    def __init__(self, fetcher: MovieFetcher, movie_count: int = 100):
+    def __init__(
+            self,
+            fetcher: MovieFetcher,
+            movie_count: int = 100,
+            concurrency: int = SEED_CONCURRENCY,
+            batch_size: int = SEED_BATCH_SIZE,
+            existing_ids: Optional[Set[str]] = None,
+            call_budget: Optional[int] = None,
+            id_space: int = SEED_MAX_IMDB_ID,
+    ):
+        super().__init__(batch_size, fetcher.stats)
         self.fetcher = fetcher
         self.movie_count = movie_count
+        self.concurrency = concurrency
+        self.existing_ids = existing_ids or set()
+        self.call_budget = call_budget if call_budget is not None else movie_count * SEED_CALL_BUDGET_FACTOR
+        self.id_space = id_space
 
-    async def seed_database(self) -> List[MovieCreate]:
+    async def seed_database(self, insert_batch: InsertBatch) -> SeedStats:
         """
         Seed the database with a specified number of movies.
 
         Args:
-            count (int): The number of movies to generate and fetch
+            insert_batch (InsertBatch): Stores a batch of movies, returns how many were stored
 
         Returns:
-            List[MovieCreate]: List of MovieCreate schemas to be inserted into the DB
+            SeedStats: Counters of the run
         """
-        ids = await self.generate_random_ids(self.movie_count)
-        tasks = [self.fetcher.fetch_movie(imdb_id) for imdb_id in ids]
-        results = await asyncio.gather(*tasks)
-
-        logging.debug(f"Results: {results}")
-        # Transform API responses and filter out invalid ones
-        movies = [
-            transform_movie_data(movie) for movie in results if movie
-        ]
-        logging.debug(f"Movies: {movies}")
-        valid_movies = [MovieCreate(**movie) for movie in movies if movie]
-
-        return valid_movies
-
-    @staticmethod
-    async def generate_random_ids(count: int) -> List[str]:
+        candidates = self.generate_candidate_ids()
+        self.stats.requested = self.movie_count
+        self.stats.budget = self.call_budget
+        in_flight = 0
+
+        async def fetch_worker(queue: asyncio.Queue):
+            nonlocal in_flight
+            # Lookups in flight count towards the target, so the workers never overshoot it
+            while self.stats.fetched + in_flight < self.movie_count and self.stats.calls < self.call_budget:
+                imdb_id = next(candidates, None)  # Shared iterator: each id is taken by exactly one worker
+                if imdb_id is None:
+                    break
+                in_flight += 1
+                self.stats.calls += 1
+                try:
+                    data = await self.fetcher.fetch_movie(imdb_id)
+                except OMDBError:
+                    self.stats.failed += 1
+                    continue
+                finally:
+                    in_flight -= 1
+                if data is None:
+                    self.stats.not_found += 1
+                    continue
+                self.stats.fetched += 1
+                await queue.put(data)
+
+        async def produce(queue: asyncio.Queue):
+            await asyncio.gather(*(fetch_worker(queue) for _ in range(self.concurrency)))
+            if self.stats.fetched < self.movie_count:
+                logging.warning(
+                    f"Seeding stopped at {self.stats.fetched}/{self.movie_count} movies after "
+                    f"{self.stats.calls} lookups (hit rate {self.stats.hit_rate:.0%})"
+                )
+
+        return await self.run(produce, insert_batch)
+
+    def generate_candidate_ids(self) -> Iterator[str]:
+        """
+        Yield random IMDb IDs, each at most once, skipping the IDs already stored
+
+        Stops once every ID of the ID space was drawn
+
+        Returns:
+            Iterator[str]: Randomly drawn IMDb IDs
+        """
+        drawn: Set[int] = set()
+        while len(drawn) < self.id_space:
+            number = random.randint(1, self.id_space)
+            if number in drawn:
+                continue
+            drawn.add(number)
+            imdb_id = f"tt{str(number).zfill(7)}"
+            if imdb_id in self.existing_ids:
+                self.stats.skipped += 1
+                continue
+            yield imdb_id
+
+
+def open_dump(path: str) -> TextIO:
+    """Open a dump file for reading text, gzip-compressed when it ends with .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def read_dump(path: str) -> Iterator[Optional[Dict]]:
+    """
+    Yield the OMDB payloads of a JSONL or CSV dump, one per line/row (None for unparsable lines)
+
+    CSV columns use the OMDB field names (Title, Year, imdbID, Type, Poster, Genre, Director, Plot)
+    """
+    is_csv = path.removesuffix(".gz").endswith(".csv")
+    with open_dump(path) as dump:
+        rows = csv.DictReader(dump) if is_csv else dump
+        for row in rows:
+            if is_csv:
+                record = row
+            elif not row.strip():
+                continue
+            else:
+                try:
+                    record = json.loads(row)
+                except json.JSONDecodeError:
+                    yield None
+                    continue
+            if isinstance(record, dict):
+                record.setdefault("Response", "True")  # Dumps hold successful responses only
+            yield record
+
+
+def count_dump_records(path: str) -> int:
+    """Number of non-blank lines of a dump, minus the CSV header, used to report progress"""
+    with open_dump(path) as dump:
+        count = sum(1 for line in dump if line.strip())
+    return count - 1 if path.removesuffix(".gz").endswith(".csv") else count
+
+
+class FileSeeder(BaseSeeder):
+    """
+    Seed the database from a local JSONL/CSV dump of OMDB payloads, without network access
+
+    The file is read in chunks of `chunk_size` records off the event loop, so memory stays
+    bounded by the chunk and the insert queue whatever the size of the dump
+    """
+
+    def __init__(
+            self,
+            path: str,
+            batch_size: int = SEED_FILE_BATCH_SIZE,
+            chunk_size: int = SEED_FILE_CHUNK_SIZE,
+            stats: Optional[SeedStats] = None,
+    ):
+        super().__init__(batch_size, stats)
+        self.path = path
+        self.chunk_size = chunk_size
+
+    async def seed_database(self, insert_batch: InsertBatch) -> SeedStats:
         """
-        Generate a list of random IMDb IDs
+        Seed the database with every movie of the dump
 
         Args:
-            count (int): Number of random IMDb IDs to generate
+            insert_batch (InsertBatch): Stores a batch of movies, returns how many were stored
 
         Returns:
-            List[str]: List of randomly generated IMDb IDs
+            SeedStats: Counters of the run
         """
-        return [f"tt{str(random.randint(1, 100000)).zfill(7)}" for _ in range(count)]
+        self.stats.requested = await asyncio.to_thread(count_dump_records, self.path)
+        records = read_dump(self.path)
+
+        def read_chunk() -> List[Optional[Dict]]:
+            return list(islice(records, self.chunk_size))
 
+        async def produce(queue: asyncio.Queue):
+            while chunk := await asyncio.to_thread(read_chunk):
+                for data in chunk:
+                    if not isinstance(data, dict):
+                        self.stats.failed += 1
+                        self.stats.record_error(f"{self.path}: unparsable record")
+                        continue
+                    self.stats.fetched += 1
+                    await queue.put(data)
+
+        try:
+            return await self.run(produce, insert_batch)
+        finally:
+            with suppress(ValueError):  # Still being read by a cancelled chunk read
+                records.close()
 
-async def get_movie_seeder(count: int = 100) -> List[MovieCreate]:
+
+async def run_movie_seeder(
+        client: OMDBClient,
+        insert_batch: InsertBatch,
+        count: int = 100,
+        stats: Optional[SeedStats] = None,
+        existing_ids: Optional[Set[str]] = None,
+) -> SeedStats:
     """
     Entry point to start the movie seeding process
 
     Args:
-        count (int): Number of movies to generate and fetch
+        client (OMDBClient): Shared OMDB client
+        insert_batch (InsertBatch): Stores a batch of movies, returns how many were stored
+        count (int): Number of movies to fetch
+        stats (Optional[SeedStats]): Counters to update while running, e.g. for progress reporting
+        existing_ids (Optional[Set[str]]): IMDb IDs already stored, never looked up
+
+    Returns:
+        SeedStats: Counters of the run
+    """
+    fetcher = MovieFetcher(client, stats=stats)
+    seeder = MovieSeeder(fetcher, count, existing_ids=existing_ids)
+    return await seeder.seed_database(insert_batch)
+
+
+async def run_file_seeder(path: str, insert_batch: InsertBatch, stats: Optional[SeedStats] = None) -> SeedStats:
+    """
+    Entry point to seed the database from a local dump of OMDB payloads
+
+    Args:
+        path (str): JSONL or CSV dump, optionally gzip-compressed
+        insert_batch (InsertBatch): Stores a batch of movies, returns how many were stored
+        stats (Optional[SeedStats]): Counters to update while running, e.g. for progress reporting
 
     Returns:
-        List[MovieCreate]: A list of valid movies ready for insertion
+        SeedStats: Counters of the run
     """
-    async with httpx.AsyncClient() as client:
-        fetcher = MovieFetcher(client)
-        seeder = MovieSeeder(fetcher, count)
-        return await seeder.seed_database()
+    seeder = FileSeeder(path, stats=stats)
+    return await seeder.seed_database(insert_batch)
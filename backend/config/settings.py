@@ -1,12 +1,31 @@
 import logging
 import os
-from typing import Optional
+import tempfile
+from typing import Optional, Tuple
 
-import pymysql
 from dotenv import load_dotenv
 from google.cloud import secretmanager
-from google.cloud.sql.connector import Connector, IPTypes
-from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from config.constants import OMDB_RATE_LIMIT, QUERY_BUDGET, SLOW_QUERY_MS
+
+# Where startup seeding takes movies from: random OMDB lookups or a local dump file
+SEED_SOURCES = ("omdb", "file")
+
+# Async DBAPI drivers used for each database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+def to_async_database_url(database_url: str) -> str:
+    """Rewrite a database URL so it uses the async driver of its backend"""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
 
 
 class BaseSettings:
@@ -17,12 +36,36 @@ class BaseSettings:
     APP_TITLE: str
     OMDB_API_KEY: str
     DEBUG: bool
+    OMDB_CACHE_PATH: str
+    OMDB_RATE_LIMIT: float
+    CACHE_URL: Optional[str]
+    SEED_SOURCE: str
+    SEED_FILE_PATH: Optional[str]
+    SLOW_QUERY_MS: float
+    SLOW_QUERY_EXPLAIN: bool
+    QUERY_BUDGET: int
+    QUERY_BUDGET_STRICT: bool
 
     def __init__(self):
         """Initialize base settings"""
         self.APP_TITLE = self.get_config_value("APP_TITLE")
         self.OMDB_API_KEY = self.get_config_value("OMDB_API_KEY")
         self.DEBUG = self.get_debug_mode()
+        # Persistent OMDB cache, an empty value keeps the cache in memory only
+        self.OMDB_CACHE_PATH = os.getenv(
+            "OMDB_CACHE_PATH", os.path.join(tempfile.gettempdir(), "omdb_cache.sqlite3")
+        )
+        self.OMDB_RATE_LIMIT = self.get_omdb_rate_limit()
+        # Shared cache of movie reads (e.g. redis://host:6379/0), empty caches in process memory
+        self.CACHE_URL = os.getenv("CACHE_URL") or None
+        self.SEED_SOURCE, self.SEED_FILE_PATH = self.get_seed_source()
+        # Statements slower than SLOW_QUERY_MS are logged (with their plan unless SLOW_QUERY_EXPLAIN
+        # is false), requests running more than QUERY_BUDGET statements are reported, or fail
+        # when QUERY_BUDGET_STRICT is set (tests). 0 disables either check
+        self.SLOW_QUERY_MS = self.get_number("SLOW_QUERY_MS", SLOW_QUERY_MS)
+        self.SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("true", "1", "yes")
+        self.QUERY_BUDGET = int(self.get_number("QUERY_BUDGET", QUERY_BUDGET))
+        self.QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "false").lower() in ("true", "1", "yes")
 
     def get_config_value(self, key: str) -> str:
         """Abstract method to fetch configuration values"""
@@ -32,8 +75,43 @@ class BaseSettings:
         """Default debug mode is False."""
         return False
 
+    def get_omdb_rate_limit(self) -> float:
+        """OMDB requests per second shared by every caller (OMDB_RATE_LIMIT)"""
+        value = os.getenv("OMDB_RATE_LIMIT")
+        try:
+            rate = float(value) if value else OMDB_RATE_LIMIT
+        except ValueError:
+            rate = 0
+        if rate <= 0:
+            logging.error(f"Invalid OMDB_RATE_LIMIT '{value}', using {OMDB_RATE_LIMIT}")
+            rate = OMDB_RATE_LIMIT
+        return rate
+
+    def get_number(self, key: str, default: float) -> float:
+        """Non-negative number from the environment, `default` when unset or invalid"""
+        value = os.getenv(key)
+        try:
+            number = float(value) if value else default
+        except ValueError:
+            number = -1
+        if number < 0:
+            logging.error(f"Invalid {key} '{value}', using {default}")
+            number = default
+        return number
+
+    def get_seed_source(self) -> Tuple[str, Optional[str]]:
+        """Seeding source (SEED_SOURCE, `omdb` by default) and the dump it reads (SEED_FILE_PATH)"""
+        source = os.getenv("SEED_SOURCE", "omdb").lower()
+        if source not in SEED_SOURCES:
+            logging.error(f"Unsupported SEED_SOURCE '{source}', seeding from OMDB")
+            source = "omdb"
+        file_path = os.getenv("SEED_FILE_PATH") or None
+        if source == "file" and not file_path:
+            raise ValueError("SEED_FILE_PATH is required when SEED_SOURCE is 'file'")
+        return source, file_path
+
     def get_db_connection(self):
-        """Abstract method to get database connection"""
+        """Abstract method to get an async database engine"""
         raise NotImplementedError("Subclasses must implement `get_db_connection`")
 
 
@@ -62,10 +140,10 @@ class DevSettings(BaseSettings):
         return os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
 
     def get_db_connection(self):
-        """Create a connection to the local SQLite database"""
+        """Create an async engine for the local SQLite database (aiosqlite)"""
         if not self.DATABASE_URL:
             raise ValueError("DATABASE_URL is not configured.")
-        return create_engine(self.DATABASE_URL)
+        return create_async_engine(to_async_database_url(self.DATABASE_URL))
 
 
 class ProdSettings(BaseSettings):
@@ -92,29 +170,32 @@ class ProdSettings(BaseSettings):
             raise ValueError(f"Error fetching secret '{key}' from Secret Manager") from e
 
     def get_db_connection(self):
-        """Create a connection to the Cloud SQL database"""
+        """
+        Create an async engine for the Cloud SQL database (aiomysql)
+
+        App Engine exposes the Cloud SQL instance through a unix socket under /cloudsql,
+        set DB_HOST to connect over TCP instead (e.g. private IP through a VPC connector)
+        """
         connection_name = os.getenv("CLOUD_SQL_CONNECTION_NAME")
         if not connection_name:
             raise ValueError("CLOUD_SQL_CONNECTION_NAME is not configured.")
 
         db_user = os.getenv("DB_USER", "root")
         db_name = os.getenv("DB_NAME", "brite-movies")
+        db_host = os.getenv("DB_HOST")
         db_password = self.get_config_value("DB_PASSWORD")
 
-        ip_type = IPTypes.PRIVATE if os.getenv("PRIVATE_IP", "").lower() in ("true", "1", "yes") else IPTypes.PUBLIC
-
-        connector = Connector(ip_type)
-
-        def getconn() -> pymysql.connections.Connection:
-            return connector.connect(
-                connection_name,
-                "pymysql",
-                user=db_user,
-                password=db_password,
-                db=db_name,
-            )
-
-        return create_engine("mysql+pymysql://", creator=getconn)
+        url = URL.create(
+            "mysql+aiomysql",
+            username=db_user,
+            password=db_password,
+            host=db_host,
+            database=db_name,
+            query={} if db_host else {"unix_socket": f"/cloudsql/{connection_name}"},
+        )
+
+        # Cloud SQL closes idle connections, recycle them before that happens
+        return create_async_engine(url, pool_pre_ping=True, pool_recycle=1800)
 
 
 class SettingsFactory:
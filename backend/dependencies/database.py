@@ -1,8 +1,14 @@
 # Dependency for database session
-def get_db():
+async def get_db():
     from config.database import SessionLocal
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+# Dependency for the session factory, for work outliving the request (e.g. streamed responses)
+def get_session_factory():
+    from config.database import SessionLocal
+    return SessionLocal
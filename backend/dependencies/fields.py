@@ -0,0 +1,29 @@
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+from schemas.movies import MOVIE_FIELDS
+
+
+def movie_fields(default: Tuple[str, ...]):
+    """
+    Parse the `fields` query parameter: a comma-separated sparse fieldset of MovieOut,
+    `default` when absent. Fields are returned in MovieOut order
+    """
+
+    def fields_parser(
+            fields: Optional[str] = Query(
+                None,
+                description=f"Comma-separated fields to return among: {', '.join(MOVIE_FIELDS)}. "
+                            f"Default: {', '.join(default)}",
+            ),
+    ) -> Tuple[str, ...]:
+        requested = {name.strip() for name in fields.split(",") if name.strip()} if fields else set()
+        if not requested:
+            return default
+        unknown = requested.difference(MOVIE_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        return tuple(name for name in MOVIE_FIELDS if name in requested)
+
+    return fields_parser
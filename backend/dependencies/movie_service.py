@@ -1,14 +1,24 @@
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from dependencies.database import get_db
+from dependencies.database import get_db, get_session_factory
+from dependencies.omdb import get_omdb_client
+from dependencies.suggest import get_suggest_index
 from services.movie import MovieService
+from utils.omdb_api import OMDBClient
+from utils.suggest import SuggestIndex
 
 
 # Dependency to provide MovieService
-def get_movie_service(db: Session = Depends(get_db)) -> MovieService:
+def get_movie_service(
+        db: AsyncSession = Depends(get_db),
+        omdb_client: OMDBClient = Depends(get_omdb_client),
+        suggest_index: SuggestIndex = Depends(get_suggest_index),
+        session_factory=Depends(get_session_factory),
+) -> MovieService:
     """
     Dependency that returns a MovieService instance
-    It automatically injects the database session using get_db
+    It automatically injects the database session using get_db, the shared OMDB client,
+    the suggest index and the session factory of work shared between requests
     """
-    return MovieService(db)
+    return MovieService(db, omdb_client, suggest_index, session_factory)
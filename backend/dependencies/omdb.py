@@ -0,0 +1,11 @@
+from fastapi import Request
+
+from utils.omdb_api import OMDBClient
+
+
+# Dependency to provide the shared OMDB client
+def get_omdb_client(request: Request) -> OMDBClient:
+    """
+    Dependency that returns the OMDB client created by the app lifespan
+    """
+    return request.app.state.omdb_client
@@ -0,0 +1,11 @@
+from fastapi import Request
+
+from config.database import SeedStats
+
+
+# Dependency to provide the counters of the background seeding
+def get_seed_stats(request: Request) -> SeedStats:
+    """
+    Dependency that returns the seeding counters updated by the background seeding task
+    """
+    return request.app.state.seed_stats
@@ -0,0 +1,11 @@
+from fastapi import Request
+
+from utils.suggest import SuggestIndex
+
+
+# Dependency to provide the shared suggest index
+def get_suggest_index(request: Request) -> SuggestIndex:
+    """
+    Dependency that returns the typeahead index built by the app lifespan
+    """
+    return request.app.state.suggest_index
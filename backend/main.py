@@ -1,53 +1,161 @@
+import asyncio
 import logging
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from typing import List
 
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.constants import SEED_MOVIE_COUNT
-from config.database import SessionLocal, get_movie_seeder
+from config.constants import MOVIE_CACHE_SIZE, SEED_INDEX_BATCH_SIZE, SEED_MOVIE_COUNT
+from config.database import SeedStats, SessionLocal, engine, run_file_seeder, run_movie_seeder
 from config.settings import settings
-from models import metadata
+from models import metadata, sync_indexes
 from repositories.movie import MovieRepository
+from repositories.search import get_search_backend
+from schemas.movies import BulkItemStatus
 from routers import api_router
+from utils.cache_backend import create_cache_backend
+from utils.metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from utils.omdb_api import OMDBClient
+from utils.omdb_cache import OMDBCache
+from utils.query_log import QueryBudgetMiddleware
+from utils.suggest import SuggestIndex
+
+
+async def seed_database(app: FastAPI, stats: SeedStats) -> None:
+    """
+    Seed the database in the background, with its own session so requests are not affected.
+    Stored movies are added to the suggest index every SEED_INDEX_BATCH_SIZE movies, so the
+    event loop never stalls on indexing a whole dump at once
+    """
+    async with SessionLocal() as db:
+        movie_repo = MovieRepository(db)
+        unindexed: List[str] = []  # IMDb IDs stored but not in the suggest index yet
+
+        async def index_stored():
+            app.state.suggest_index.add_many(await movie_repo.get_suggest_rows(unindexed))
+            unindexed.clear()
+
+        async def insert_batch(movies):
+            results = await movie_repo.bulk_upsert(movies)
+            stored = [imdb_id for imdb_id, status, _ in results if status != BulkItemStatus.error]
+            unindexed.extend(stored)
+            if len(unindexed) >= SEED_INDEX_BATCH_SIZE:
+                await index_stored()
+            return len(stored)
+
+        try:
+            if settings.SEED_SOURCE == "file":
+                logging.info(f"Seeding from {settings.SEED_FILE_PATH}")
+                await run_file_seeder(settings.SEED_FILE_PATH, insert_batch, stats)
+            else:
+                # Top up a partly seeded database (e.g. seeding cancelled by a shutdown), never
+                # looking up the movies already stored
+                existing_ids = await movie_repo.get_imdb_ids()
+                missing = SEED_MOVIE_COUNT - len(existing_ids)
+                await run_movie_seeder(app.state.omdb_client, insert_batch, missing, stats, existing_ids)
+            logging.info(f"Database seeded successfully: {stats.inserted} movies in {stats.elapsed:.1f}s.")
+        except asyncio.CancelledError:
+            logging.info(f"Seeding cancelled after {stats.inserted} movies.")
+            raise
+        except Exception as e:
+            logging.error(f"Error while seeding the database: {e}")
+        finally:
+            if unindexed:
+                try:
+                    await index_stored()
+                except Exception as e:
+                    logging.error(f"Failed to index seeded movies: {e}")
+
+
+async def build_suggest_index(index: SuggestIndex) -> None:
+    """
+    Fill the suggest index without blocking the event loop: rows are read with their own
+    session and indexed in a worker thread, then loaded into the live index in place.
+    Writes made meanwhile are recorded by the index and replayed on top of the build
+    """
+    index.start_recording()
+    try:
+        async with SessionLocal() as db:
+            rows = await MovieRepository(db).get_suggest_rows()
+        index.load(await asyncio.to_thread(SuggestIndex.build, rows))
+        logging.info(f"Suggest index built with {len(index)} movies.")
+    except Exception as e:
+        index.stop_recording()
+        logging.error(f"Failed to build the suggest index: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    db: Session = SessionLocal()  # Create the DB session
+    db: AsyncSession = SessionLocal()  # Create the DB session
+    omdb_cache = OMDBCache(settings.OMDB_CACHE_PATH)
+    await omdb_cache.open()
+    # Shared, pooled and rate limited OMDB client
+    app.state.omdb_client = OMDBClient(settings.OMDB_API_KEY, cache=omdb_cache, rate_limit=settings.OMDB_RATE_LIMIT)
+    app.state.suggest_index = SuggestIndex()
+    MovieRepository.movie_cache = create_cache_backend(settings.CACHE_URL, MOVIE_CACHE_SIZE)
+    app.state.seed_stats = SeedStats()
+    app.state.seed_task = None
+    app.state.suggest_task = None
     try:
         logging.info("Creating database and models")
-        engine = settings.get_db_connection()
         try:
-            metadata.create_all(bind=engine)
+            async with engine.begin() as conn:
+                await conn.run_sync(metadata.create_all)
+                await conn.run_sync(sync_indexes)
             logging.info("Tables created successfully.")
+            search_backend = get_search_backend(engine.dialect.name)
+            if search_backend is not None:
+                async with engine.begin() as conn:
+                    await search_backend.ensure_index(conn)
         except Exception as e:
             logging.error(f"Failed to create tables: {e}")
 
-        # Movie repository and seeding logic
+        # Typeahead index, built in the background: /suggest serves a partial index until it is
+        # ready, and it is kept up to date by MovieService and the seeder
+        app.state.suggest_task = asyncio.create_task(build_suggest_index(app.state.suggest_index))
         movie_repo = MovieRepository(db)
-        if movie_repo.count_movies() == 0:
-            logging.info("Database is not ready, seeding...")
-            try:
-                seed_movies = await get_movie_seeder(SEED_MOVIE_COUNT)
-                for movie_data in seed_movies:
-                    movie_repo.create(movie_data)
-                logging.info("Database seeded successfully.")
-            except Exception as e:
-                logging.error(f"Error while seeding the database: {e}")
+
+        # Seeding runs in the background, the app serves requests meanwhile. OMDB seeding tops up
+        # to SEED_MOVIE_COUNT movies, a dump file is only loaded into an empty database
+        movie_count = await movie_repo.count_movies()
+        if settings.SEED_SOURCE == "file":
+            needs_seeding = movie_count == 0
+        else:
+            needs_seeding = movie_count < SEED_MOVIE_COUNT
+        if needs_seeding:
+            logging.info("Database is not ready, seeding in the background...")
+            app.state.seed_stats.state = "pending"
+            app.state.seed_task = asyncio.create_task(seed_database(app, app.state.seed_stats))
 
         yield
 
     except Exception as e:
         logging.error(f"Error while creating the database: {e}")
     finally:
-        db.close()
-
-
-app = FastAPI(title=settings.APP_TITLE, debug=settings.DEBUG, lifespan=lifespan)
+        for task in (app.state.seed_task, app.state.suggest_task):
+            if task is not None:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        await db.close()
+        await MovieRepository.movie_cache.close()
+        await app.state.omdb_client.aclose()
+        logging.info(f"OMDB cache stats: {omdb_cache.stats()}")
+        await omdb_cache.close()
+        await engine.dispose()
+
+
+app = FastAPI(
+    title=settings.APP_TITLE,
+    debug=settings.DEBUG,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 logging.basicConfig(level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s")
 app.include_router(api_router, prefix="/api")
@@ -63,6 +171,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryBudgetMiddleware, budget=settings.QUERY_BUDGET, strict=settings.QUERY_BUDGET_STRICT)
+# Added last so it wraps every other middleware and times whole requests
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -81,5 +192,11 @@ async def app_settings():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Request, database and OMDB metrics in the Prometheus text format"""
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="localhost", port=8000)
@@ -1,3 +1,7 @@
+import logging
+from typing import Set
+
+from sqlalchemy import Connection, inspect, text
 from sqlalchemy.orm import DeclarativeBase
 
 class ModelBase(DeclarativeBase):
@@ -5,4 +9,42 @@ class ModelBase(DeclarativeBase):
 
 import models.movies
 
-metadata = ModelBase.metadata
\ No newline at end of file
+metadata = ModelBase.metadata
+
+# (table, index) pairs replaced by newer indexes, dropped from existing databases
+RETIRED_INDEXES = (("movies", "ix_movies_title"),)
+
+
+def index_names(connection: Connection, table: str) -> Set[str]:
+    """
+    Names of the indexes of a table. The catalogs are read directly on SQLite and MySQL, the
+    inspector does not reflect expression indexes such as ix_movies_title_lower
+    """
+    if connection.dialect.name == "sqlite":
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"
+    elif connection.dialect.name == "mysql":
+        query = (
+            "SELECT DISTINCT index_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = :table"
+        )
+    else:
+        return {index["name"] for index in inspect(connection).get_indexes(table)}
+    return set(connection.scalars(text(query), {"table": table}))
+
+
+def sync_indexes(connection: Connection) -> None:
+    """
+    Bring the indexes of existing tables up to date, for use with `run_sync` after `create_all`,
+    which only indexes the tables it creates: missing model indexes are created, retired ones dropped
+    """
+    for table in metadata.sorted_tables:
+        existing = index_names(connection, table.name)
+        for index in table.indexes:
+            if index.name not in existing:
+                logging.info(f"Creating index {index.name} on {table.name}")
+                index.create(connection)
+        for name in (name for table_name, name in RETIRED_INDEXES if table_name == table.name):
+            if name in existing:
+                logging.info(f"Dropping retired index {name} on {table.name}")
+                on_table = f" ON {table.name}" if connection.dialect.name == "mysql" else ""
+                connection.execute(text(f"DROP INDEX {name}{on_table}"))
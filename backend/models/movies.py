@@ -1,6 +1,6 @@
 import datetime
 
-from sqlalchemy import String, Integer, DateTime, Text
+from sqlalchemy import String, Integer, DateTime, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -13,8 +13,8 @@ class Movie(ModelBase):
     # Primary key with auto-increment
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
-    # Title (string length should be reasonable for titles)
-    title: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    # Title (string length should be reasonable for titles), indexed together with id below
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
 
     # Year (4-digit integer, can be null)
     year: Mapped[int] = mapped_column(Integer, nullable=True)
@@ -45,8 +45,11 @@ class Movie(ModelBase):
         DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    # MySQL 8.x has support for utf8mb4
+    # (title, id) index serves keyset pagination in title order, lower(title) the case-insensitive
+    # title lookups of create-by-title. MySQL 8.x has support for utf8mb4
     __table_args__ = (
+        Index("ix_movies_title_id", "title", "id"),
+        Index("ix_movies_title_lower", func.lower(title)),
         {'mysql_charset': 'utf8mb4'},
     )
 
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import TypeVar, List, Optional, Generic
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Type variables for Entity and Schema
 TEntity = TypeVar('TEntity')
@@ -9,36 +10,48 @@ TSchema = TypeVar('TSchema')
 
 
 class BaseRepository(Generic[TEntity, TSchema], ABC):
-    def __init__(self, db_session: Session, model: TEntity):
+    def __init__(self, db_session: AsyncSession, model: TEntity):
         self.db_session = db_session
         self.model = model
 
-    def create(self, data: TSchema) -> TEntity:
+    async def create(self, data: TSchema) -> TEntity:
         """Create a new record in the database."""
         entity = self.model(**data.dict())
         self.db_session.add(entity)
-        self.db_session.commit()
-        self.db_session.refresh(entity)
+        try:
+            await self.db_session.commit()
+        except Exception:
+            await self.db_session.rollback()  # Keep the session usable, e.g. after a unique violation
+            raise
+        await self.after_write(entity.id)
+        await self.db_session.refresh(entity)
         return entity
 
-    def get_by_id(self, id: int) -> Optional[TEntity]:
+    async def get_by_id(self, id: int) -> Optional[TEntity]:
         """Retrieve an entity by its ID."""
-        return self.db_session.query(self.model).filter(self.model.id == id).first()
+        result = await self.db_session.execute(select(self.model).filter(self.model.id == id))
+        return result.scalars().first()
 
-    def get_all(self, skip: int = 0, limit: int = 10) -> List[TEntity]:
+    async def get_all(self, skip: int = 0, limit: int = 10) -> List[TEntity]:
         """Retrieve all entities with optional pagination."""
-        return self.db_session.query(self.model).offset(skip).limit(limit).all()
+        result = await self.db_session.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars().all())
 
-    def delete_by_id(self, id: int) -> bool:
+    async def delete_by_id(self, id: int) -> bool:
         """Delete an entity by its ID."""
-        entity = self.get_by_id(id)
+        entity = await self.get_by_id(id)
         if entity:
-            self.db_session.delete(entity)
-            self.db_session.commit()
+            await self.db_session.delete(entity)
+            await self.db_session.commit()
+            await self.after_write(id)
             return True
         return False
 
+    async def after_write(self, id: Optional[int] = None) -> None:
+        """Hook called after a write is committed, e.g. to invalidate cached reads of the entity `id`."""
+        pass
+
     @abstractmethod
-    def update(self, id: int, data: TSchema) -> TEntity:
+    async def update(self, id: int, data: TSchema) -> TEntity:
         """Abstract method for updating an entity. Needs to be implemented in the child class."""
         pass
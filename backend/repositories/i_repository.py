@@ -9,38 +9,38 @@ TSchema = TypeVar('TSchema', bound=BaseModel)  # Schema type (e.g., MovieCreate,
 
 class ICreateRepository(ABC, Generic[TEntity, TSchema]):
     @abstractmethod
-    def create(self, data: TSchema) -> TEntity:
+    async def create(self, data: TSchema) -> TEntity:
         """Create a new record in the databas."""
         pass
 
 
 class IGetRepository(ABC, Generic[TEntity]):
     @abstractmethod
-    def get_by_id(self, id: int) -> Optional[TEntity]:
+    async def get_by_id(self, id: int) -> Optional[TEntity]:
         """Retrieve an entity by its ID"""
         pass
 
     @abstractmethod
-    def get_all(self, skip: int = 0, limit: int = 10) -> List[TEntity]:
+    async def get_all(self, skip: int = 0, limit: int = 10) -> List[TEntity]:
         """Retrieve all records with pagination"""
         pass
 
     @abstractmethod
-    def search_by_name(self, name: str) -> List[TEntity]:
+    async def search_by_name(self, name: str) -> List[TEntity]:
         """Search for entities by name"""
         pass
 
 
 class IDeleteRepository(ABC, Generic[TEntity]):
     @abstractmethod
-    def delete_by_id(self, id: int) -> bool:
+    async def delete_by_id(self, id: int) -> bool:
         """Delete an entity by its ID"""
         pass
 
 
 class IUpdateRepository(ABC, Generic[TEntity, TSchema]):
     @abstractmethod
-    def update(self, id: int, data: TSchema) -> TEntity:
+    async def update(self, id: int, data: TSchema) -> TEntity:
         """Update an entity by its ID"""
         pass
 
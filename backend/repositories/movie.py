@@ -1,31 +1,194 @@
-from typing import List, Type
+import datetime
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
 
 from fastapi import HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import Insert, Select, and_, func, or_, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.constants import (
+    MOVIE_COUNT_CACHE_TTL, MOVIE_CACHE_SIZE, MOVIE_CACHE_TTL, BULK_BATCH_SIZE, EXPORT_BATCH_SIZE,
+)
 from models.movies import Movie
 from repositories.base import BaseRepository
-from schemas.movies import MovieCreate, MovieUpdate
+from repositories.search import get_search_backend, search_tokens
+from schemas.movies import MOVIE_FIELDS, MovieCreate, MovieUpdate, BulkItemStatus
+from utils.cache import LRUCache
+from utils.cache_backend import CacheBackend, MemoryCacheBackend
+from utils.transformers import normalize_title
+
+# Columns overwritten when an upserted imdb_id already exists
+UPSERT_COLUMNS = ("title", "year", "type", "poster_url", "genre", "director", "plot")
+
+movies_table = Movie.__table__
+
+
+def read_columns(fields: Sequence[str]) -> Tuple:
+    """Columns of the movies table selected by the read-only path for a sparse fieldset."""
+    return tuple(movies_table.c[name] for name in fields)
+
+
+def upsert_statement(dialect_name: str) -> Insert:
+    """
+    INSERT of movies that updates the existing row on an imdb_id conflict.
+    Executed with a list of rows (executemany), so it is compiled once and cached rather
+    than rendering a fresh multi-row VALUES clause for every batch.
+    """
+    if dialect_name == "mysql":
+        stmt = mysql.insert(Movie)
+        return stmt.on_duplicate_key_update(
+            {**{column: stmt.inserted[column] for column in UPSERT_COLUMNS}, "updated_at": func.now()}
+        )
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect = sqlite if dialect_name == "sqlite" else postgresql
+        stmt = dialect.insert(Movie)
+        return stmt.on_conflict_do_update(
+            index_elements=[Movie.imdb_id],
+            set_={**{column: stmt.excluded[column] for column in UPSERT_COLUMNS}, "updated_at": func.now()},
+        )
+    raise NotImplementedError(f"Upserts are not supported on {dialect_name}")
+
+
+def movie_cache_key(movie_id: int) -> str:
+    """Cache key of a movie read by id."""
+    return f"movie:{movie_id}"
+
+
+def movie_to_cache(movie: Movie) -> Dict:
+    """JSON-compatible column values of a movie."""
+    data = {column.key: getattr(movie, column.key) for column in Movie.__table__.columns}
+    for key in ("created_at", "updated_at"):
+        if data[key] is not None:
+            data[key] = data[key].isoformat()
+    return data
+
+
+def movie_from_cache(data: Dict) -> Movie:
+    """Detached movie rebuilt from cached column values, for reads only."""
+    data = dict(data)
+    for key in ("created_at", "updated_at"):
+        if data[key] is not None:
+            data[key] = datetime.datetime.fromisoformat(data[key])
+    return Movie(**data)
 
 
 class MovieRepository(BaseRepository[Movie, MovieCreate]):
-    def __init__(self, db_session: Session):
+    # Process-wide movie count, dropped on every write made through a repository
+    count_cache = LRUCache(maxsize=1, ttl=MOVIE_COUNT_CACHE_TTL)
+    # Bumped with every count invalidation, a count read across a write must not be cached
+    count_generation = 0
+    # Process-wide read-through cache of movies by id, the app lifespan installs the configured backend
+    movie_cache: CacheBackend = MemoryCacheBackend(MOVIE_CACHE_SIZE)
+
+    def __init__(self, db_session: AsyncSession):
         super().__init__(db_session, Movie)
 
-    def get_all_ordered_by_title(self, skip: int = 0, limit: int = 10) -> List[Type[Movie]]:
-        """Retrieve all movies ordered by title with optional pagination."""
-        return (
-            self.db_session.query(Movie)
-            .order_by(Movie.title)
+    async def after_write(self, movie_id: Optional[int] = None) -> None:
+        """Invalidate the cached movie count, and the cached movie when its id is given."""
+        MovieRepository.count_generation += 1
+        self.count_cache.clear()
+        if movie_id is not None:
+            await self.movie_cache.delete(movie_cache_key(movie_id))
+
+    async def get_by_id_cached(self, movie_id: int) -> Optional[Movie]:
+        """
+        Retrieve a movie by id through the movie cache (read-through, invalidated on writes).
+        The movie may be detached from the session, use `get_by_id` for movies to modify.
+        """
+        key = movie_cache_key(movie_id)
+        generation = self.movie_cache.generation(key)
+        data = await self.movie_cache.get(key)
+        if data is not None:
+            return movie_from_cache(data)
+        # populate_existing: a movie already loaded in this session may predate a bulk upsert
+        movie = await self.db_session.scalar(
+            select(Movie).where(Movie.id == movie_id).execution_options(populate_existing=True)
+        )
+        # A write invalidated the movie while it was read: the row may be older than the write
+        if movie is not None and self.movie_cache.generation(key) == generation:
+            await self.movie_cache.set(key, movie_to_cache(movie), MOVIE_CACHE_TTL)
+        return movie
+
+    async def get_by_id_fresh(self, movie_id: int) -> Optional[Movie]:
+        """Retrieve a movie by id, refreshing a copy already loaded in this session (e.g. written by another one)."""
+        return await self.db_session.scalar(
+            select(Movie).where(Movie.id == movie_id).execution_options(populate_existing=True)
+        )
+
+    async def get_by_imdb_id(self, imdb_id: str) -> Optional[Movie]:
+        """Retrieve a movie by its IMDb ID."""
+        return await self.db_session.scalar(select(Movie).where(Movie.imdb_id == imdb_id))
+
+    async def get_by_title(self, title: str) -> Optional[Movie]:
+        """
+        Retrieve the first movie with this title regardless of case: lower(title) is compared to the
+        normalized title the suggest index is keyed on (seeks on ix_movies_title_lower).
+        """
+        return await self.db_session.scalar(
+            select(Movie)
+            .where(func.lower(Movie.title) == normalize_title(title))
+            .order_by(Movie.id)
+            .limit(1)
+        )
+
+    async def read_rows(self, query: Select) -> List[Dict[str, Any]]:
+        """
+        Run a read-only Core select and map its row tuples straight to dicts.
+        No ORM objects are built: nothing lands in the identity map or gets instrumented.
+        """
+        result = await self.db_session.execute(query)
+        keys = list(result.keys())
+        return [dict(zip(keys, row)) for row in result]
+
+    async def get_all_ordered_by_title(
+            self, skip: int = 0, limit: int = 10, fields: Sequence[str] = MOVIE_FIELDS
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the `fields` of all movies ordered by title with optional pagination, as read-only dicts."""
+        return await self.read_rows(
+            select(*read_columns(fields))
+            .order_by(movies_table.c.title, movies_table.c.id)
             .offset(skip)
             .limit(limit)
-            .all()
         )
 
-    def update(self, movie_id: int, movie_data: MovieUpdate) -> Movie:
+    async def get_all_after(
+            self,
+            title: Optional[str] = None,
+            movie_id: Optional[int] = None,
+            limit: int = 10,
+            fields: Sequence[str] = MOVIE_FIELDS,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the `fields` of the movies following (title, id) in title order (keyset pagination)."""
+        columns = movies_table.c
+        query = select(*read_columns(fields)).order_by(columns.title, columns.id).limit(limit)
+        if title is not None:
+            # Expanded row comparison, so both SQLite and MySQL seek on ix_movies_title_id
+            query = query.filter(
+                or_(columns.title > title, and_(columns.title == title, columns.id > movie_id))
+            )
+        return await self.read_rows(query)
+
+    async def stream_rows(
+            self, fields: Sequence[str] = MOVIE_FIELDS, batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield the `fields` of every movie in id order, `batch_size` rows at a time, as read-only dicts.
+        Rows come through a server-side cursor, so memory does not grow with the table.
+        """
+        result = await self.db_session.stream(
+            select(*read_columns(fields)).order_by(movies_table.c.id).execution_options(yield_per=batch_size)
+        )
+        try:
+            keys = list(result.keys())
+            async for rows in result.partitions():
+                yield [dict(zip(keys, row)) for row in rows]
+        finally:
+            await result.close()
+
+    async def update(self, movie_id: int, movie_data: MovieUpdate) -> Movie:
         """Update a movie."""
-        movie = self.get_by_id(movie_id)
+        movie = await self.get_by_id(movie_id)
         if not movie:
             raise HTTPException(status_code=404, detail="Movie not found.")
 
@@ -33,19 +196,106 @@ class MovieRepository(BaseRepository[Movie, MovieCreate]):
         for key, value in update_data.items():
             setattr(movie, key, value)
 
-        self.db_session.commit()
-        self.db_session.refresh(movie)
+        await self.db_session.commit()
+        await self.after_write(movie_id)
+        await self.db_session.refresh(movie)
         return movie
 
-    def search_by_name(self, title: str) -> List[Type[Movie]]:
-        """Search for movies by title."""
-        return (
-            self.db_session.query(Movie)
-            .filter(Movie.title.ilike(f"%{title}%"))
-            .order_by(Movie.title)
-            .all()
-        )
+    async def search_by_name(
+            self, title: str, limit: Optional[int] = None, offset: int = 0, fields: Sequence[str] = MOVIE_FIELDS
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for movies by title, best matches first, as read-only dicts of `fields`.
+        Uses the dialect's full-text index (prefix matching per word) and falls back
+        to ILIKE when there is none or the term has no word the index can match.
+        """
+        bind = self.db_session.get_bind()
+        backend = get_search_backend(bind.dialect.name)
+        tokens = backend.indexed_tokens(search_tokens(title)) if backend is not None else []
+        if backend is not None and backend.is_available(bind) and tokens:
+            query = backend.search_query(tokens, read_columns(fields))
+        else:
+            query = (
+                select(*read_columns(fields))
+                .filter(movies_table.c.title.ilike(f"%{title}%"))
+                .order_by(movies_table.c.title)
+            )
+
+        if limit is not None:
+            query = query.limit(limit).offset(offset)
+        return await self.read_rows(query)
+
+    async def bulk_upsert(
+            self, movies: Sequence[MovieCreate], batch_size: int = BULK_BATCH_SIZE
+    ) -> List[Tuple[str, BulkItemStatus, Optional[str]]]:
+        """
+        Insert or update movies by imdb_id with one batched INSERT ... ON CONFLICT per batch.
+
+        Returns:
+            (imdb_id, status, error detail) for every input movie, in input order. Repeated
+            imdb_ids behave as sequential upserts: the last occurrence is the one stored.
+        """
+        stmt = upsert_statement(self.db_session.get_bind().dialect.name)
+        results = []
+        for start in range(0, len(movies), batch_size):
+            batch = movies[start:start + batch_size]
+            rows = {movie.imdb_id: movie.model_dump() for movie in batch}  # Last occurrence wins
+            try:
+                existing = set(await self.db_session.scalars(
+                    select(Movie.imdb_id).where(Movie.imdb_id.in_(list(rows)))
+                ))
+                await self.db_session.execute(stmt, list(rows.values()))
+                await self.db_session.commit()
+            except Exception as e:
+                logging.error(f"Bulk upsert of {len(rows)} movies failed: {e}")
+                await self.db_session.rollback()
+                results.extend((movie.imdb_id, BulkItemStatus.error, "Database error") for movie in batch)
+                continue
+
+            for movie in batch:
+                if movie.imdb_id in existing:
+                    results.append((movie.imdb_id, BulkItemStatus.updated, None))
+                else:
+                    results.append((movie.imdb_id, BulkItemStatus.created, None))
+                    existing.add(movie.imdb_id)
 
-    def count_movies(self) -> int:
+        updated = [imdb_id for imdb_id, status, _ in results if status == BulkItemStatus.updated]
+        for start in range(0, len(updated), batch_size):
+            movie_ids = await self.db_session.scalars(
+                select(Movie.id).where(Movie.imdb_id.in_(updated[start:start + batch_size]))
+            )
+            await self.movie_cache.delete(*(movie_cache_key(movie_id) for movie_id in movie_ids))
+        await self.after_write()
+        return results
+
+    async def get_suggest_rows(
+            self, imdb_ids: Optional[Sequence[str]] = None
+    ) -> List[Tuple[int, str, Optional[int], Optional[str]]]:
+        """Return (id, title, year, director) of every movie, or of the given imdb_ids, for the suggest index."""
+        query = select(Movie.id, Movie.title, Movie.year, Movie.director)
+        if imdb_ids is not None:
+            query = query.where(Movie.imdb_id.in_(imdb_ids))
+        result = await self.db_session.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    async def get_imdb_ids(self) -> Set[str]:
+        """Return the IMDb IDs of every stored movie."""
+        return set(await self.db_session.scalars(select(Movie.imdb_id)))
+
+    async def count_movies(self) -> int:
         """Return the total count of entities."""
-        return self.db_session.query(func.count(Movie.id)).scalar()
+        return await self.db_session.scalar(select(func.count(Movie.id)))
+
+    async def count_movies_cached(self) -> int:
+        """
+        Return the movie count, served from the process-wide cache when possible.
+        Writes made by other instances show up once the cache TTL expires.
+        """
+        count = self.count_cache.get("movies")
+        if count is None:
+            generation = self.count_generation
+            count = await self.count_movies()
+            # A write invalidated the count while it was read: the count may be older than the write
+            if self.count_generation == generation:
+                self.count_cache.set("movies", count)
+        return count
@@ -0,0 +1,143 @@
+import logging
+import re
+import weakref
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Column, Engine, Select, column, select, table, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config.constants import MYSQL_FT_MIN_TOKEN_SIZE, MYSQL_FT_STOPWORDS
+from models.movies import Movie
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+movies = Movie.__table__
+
+
+def search_tokens(term: str) -> List[str]:
+    """Split a search term into lowercase word tokens, dropping any query syntax"""
+    return TOKEN_PATTERN.findall(term.lower())
+
+
+class SearchBackend(ABC):
+    """
+    Full-text search over movie titles
+
+    `ensure_index` creates the index (idempotent) at startup. The backend is only used on the
+    engines where that succeeded, searches on any other engine fall back to ILIKE
+    """
+
+    def __init__(self):
+        # Engines whose index is in place, dropped with the engine
+        self.indexed_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+    def is_available(self, bind: Engine) -> bool:
+        """Whether `ensure_index` succeeded on the engine of `bind`"""
+        return bind.engine in self.indexed_engines
+
+    @abstractmethod
+    async def create_index(self, conn: AsyncConnection) -> None:
+        """Create the full-text index and whatever keeps it in sync with the movies table"""
+        pass
+
+    @abstractmethod
+    def search_query(self, tokens: List[str], columns: Sequence[Column]) -> Select:
+        """Select `columns` of the movies matching every token as a prefix, best matches first"""
+        pass
+
+    def indexed_tokens(self, tokens: List[str]) -> List[str]:
+        """Keep the tokens the index can match, searches with none left fall back to ILIKE"""
+        return tokens
+
+    async def ensure_index(self, conn: AsyncConnection) -> None:
+        """Create the index if needed and mark the backend as usable on the engine of `conn`"""
+        try:
+            await self.create_index(conn)
+            self.indexed_engines.add(conn.sync_engine)
+        except Exception as e:
+            logging.error(f"Full-text index unavailable, searches will use ILIKE: {e}")
+            self.indexed_engines.discard(conn.sync_engine)
+
+
+class SQLiteFTSSearch(SearchBackend):
+    """
+    SQLite FTS5 external-content table over movies.title, kept in sync by triggers
+    """
+
+    movies_fts = table("movies_fts", column("rowid"), column("rank"))
+
+    async def create_index(self, conn: AsyncConnection) -> None:
+        exists = await conn.scalar(
+            text("SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name = 'movies_fts'")
+        )
+        await conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5("
+            "title, content='movies', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+        await conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS movies_fts_ai AFTER INSERT ON movies BEGIN "
+            "INSERT INTO movies_fts(rowid, title) VALUES (new.id, new.title); END"
+        ))
+        await conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS movies_fts_ad AFTER DELETE ON movies BEGIN "
+            "INSERT INTO movies_fts(movies_fts, rowid, title) VALUES ('delete', old.id, old.title); END"
+        ))
+        await conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS movies_fts_au AFTER UPDATE OF title ON movies BEGIN "
+            "INSERT INTO movies_fts(movies_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+            "INSERT INTO movies_fts(rowid, title) VALUES (new.id, new.title); END"
+        ))
+        if not exists:
+            # Index the rows inserted before the table existed
+            await conn.execute(text("INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')"))
+
+    def search_query(self, tokens: List[str], columns: Sequence[Column]) -> Select:
+        # Quoted tokens are plain strings to FTS5, the trailing * makes them prefix queries
+        expression = " ".join(f'"{token}"*' for token in tokens)
+        return (
+            select(*columns)
+            .select_from(movies)
+            .join(self.movies_fts, self.movies_fts.c.rowid == movies.c.id)
+            .where(text("movies_fts MATCH :expression").bindparams(expression=expression))
+            .order_by(self.movies_fts.c.rank, movies.c.title, movies.c.id)
+        )
+
+
+class MySQLFullTextSearch(SearchBackend):
+    """
+    MySQL InnoDB FULLTEXT index over movies.title, maintained by MySQL itself
+    """
+
+    async def create_index(self, conn: AsyncConnection) -> None:
+        exists = await conn.scalar(text(
+            "SELECT count(*) FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name = 'movies' AND index_name = 'ft_movies_title'"
+        ))
+        if not exists:
+            await conn.execute(text("CREATE FULLTEXT INDEX ft_movies_title ON movies (title)"))
+
+    def indexed_tokens(self, tokens: List[str]) -> List[str]:
+        # Short words and stopwords are not in the index, requiring them would match nothing
+        return [
+            token for token in tokens
+            if len(token) >= MYSQL_FT_MIN_TOKEN_SIZE and token not in MYSQL_FT_STOPWORDS
+        ]
+
+    def search_query(self, tokens: List[str], columns: Sequence[Column]) -> Select:
+        # Boolean mode: every token required (+), matched as a prefix (*)
+        score = match(movies.c.title, against=" ".join(f"+{token}*" for token in tokens)).in_boolean_mode()
+        return select(*columns).where(score).order_by(score.desc(), movies.c.title, movies.c.id)
+
+
+SEARCH_BACKENDS: Dict[str, SearchBackend] = {
+    "sqlite": SQLiteFTSSearch(),
+    "mysql": MySQLFullTextSearch(),
+}
+
+
+def get_search_backend(dialect_name: str) -> Optional[SearchBackend]:
+    """Return the full-text backend of a database dialect, if it has one"""
+    return SEARCH_BACKENDS.get(dialect_name)
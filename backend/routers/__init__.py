@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from routers.admin import router as admin_router
 from routers.movies import router as movies_router
 
 # Create a main router to include all sub-routers
@@ -7,3 +8,4 @@ api_router = APIRouter()
 
 # Include route modules
 api_router.include_router(movies_router, prefix="/movies", tags=["Movies"])
+api_router.include_router(admin_router, prefix="/admin", tags=["Admin"])
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends
+
+from config.database import SeedStats
+from dependencies.authorization import require_role
+from dependencies.omdb import get_omdb_client
+from dependencies.seeding import get_seed_stats
+from dependencies.suggest import get_suggest_index
+from repositories.movie import MovieRepository
+from schemas.admin import CacheStatus, RateLimiterStatus, SeedStatus, SuggestIndexStatus
+from utils.omdb_api import OMDBClient
+from utils.suggest import SuggestIndex
+
+router = APIRouter(
+    dependencies=[Depends(require_role("admin"))],
+    responses={403: {"description": "Forbidden"}},
+)
+
+
+@router.get("/seed-status", response_model=SeedStatus)
+async def seed_status(stats: SeedStats = Depends(get_seed_stats)):
+    """
+    Report the progress of the background database seeding
+    """
+    return stats.as_dict()
+
+
+@router.get("/omdb-limiter", response_model=RateLimiterStatus)
+async def omdb_limiter_status(omdb_client: OMDBClient = Depends(get_omdb_client)):
+    """
+    Report the rate, concurrency limit and queue depth of the shared OMDB rate limiter
+    """
+    return omdb_client.limiter.stats()
+
+
+@router.get("/movie-cache", response_model=CacheStatus)
+async def movie_cache_status():
+    """
+    Report the hit ratio of the movie read cache
+    """
+    return MovieRepository.movie_cache.stats()
+
+
+@router.get("/suggest-index", response_model=SuggestIndexStatus)
+async def suggest_index_status(suggest_index: SuggestIndex = Depends(get_suggest_index)):
+    """
+    Report whether the typeahead index finished its startup build, and its size
+    """
+    return {"ready": suggest_index.ready, "movies": len(suggest_index)}
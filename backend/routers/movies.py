@@ -1,14 +1,25 @@
 import logging
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List, Sequence, Tuple
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 
-from config.constants import MOVIE_NOT_FOUND_MESSAGE
+from config.constants import (
+    MOVIE_NOT_FOUND_MESSAGE, BULK_MAX_ITEMS, IMPORT_MAX_BYTES, IMPORT_MAX_LINE_BYTES,
+)
 from dependencies.authorization import require_role
+from dependencies.database import get_session_factory
+from dependencies.fields import movie_fields
 from dependencies.movie_service import get_movie_service
-from schemas.movies import MovieOut, MovieCreate, MovieUpdate, MovieListResponse
+from schemas.movies import (
+    MovieOut, MovieCreate, MovieUpdate, MovieListResponse, MovieSuggestion, MovieSummary, TotalCount,
+    BulkUpsertResponse, ExistingMovie, ExportFormat, MovieImportResponse, MOVIE_FIELDS, MOVIE_SUMMARY_FIELDS, movie_adapters,
+)
 from schemas.users import UserBase
+from services.export import EXPORT_MEDIA_TYPES, export_movies
 from services.movie import MovieService
+from utils.http_cache import cached_json_response
+from utils.ndjson import iter_lines
 
 router = APIRouter(
     dependencies=[],
@@ -16,25 +27,53 @@ router = APIRouter(
 )
 
 
+def dump_movies(movies: List, fields: Sequence[str] = MOVIE_FIELDS) -> List[dict]:
+    """
+    Validate movies (ORM objects or dicts) once and dump their `fields` as JSON-compatible dicts
+
+    Routes returning a Response skip FastAPI's response_model pass, which would validate
+    the page a second time
+    """
+    _, adapter = movie_adapters(tuple(fields))
+    return adapter.dump_python(adapter.validate_python(movies, from_attributes=True), mode="json")
+
+
+async def limited_body(request: Request) -> AsyncIterator[bytes]:
+    """
+    Stream the request body, failing with 413 once it goes over `IMPORT_MAX_BYTES`
+
+    Covers chunked uploads sent without a Content-Length; batches stored before that stay stored
+    """
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > IMPORT_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"At most {IMPORT_MAX_BYTES} bytes can be imported at once.")
+        yield chunk
+
+
 @router.post("/create", response_model=MovieOut)
 async def create_movie(
         title: Optional[str] = Query(None, description="Title of the movie to fetch from OMDB"),
+        if_exists: ExistingMovie = Query(
+            ExistingMovie.return_existing, description="When `title` is already stored: return it or answer 409"
+        ),
         movie_data: Optional[MovieCreate] = None,
         movie_service: MovieService = Depends(get_movie_service)
 ):
     """
     Create a movie in two ways:
-    1. Provide `title` to fetch details from OMDB and save it to the database.
+    1. Provide `title` to fetch details from OMDB and save it to the database, unless it is already stored.
     2. Provide full `MovieCreate` data to directly save it to the database.
     """
     # movie_service = MovieService(db)
 
     if title:
         # Fetch movie details from OMDB and create it
-        return movie_service.create_movie_from_title(title)
+        return await movie_service.create_movie_from_title(title, if_exists)
     elif movie_data:
         # Create movie directly with provided data
-        return movie_service.create_movie(movie_data)
+        return await movie_service.create_movie(movie_data)
     else:
         raise HTTPException(
             status_code=400,
@@ -42,6 +81,51 @@ async def create_movie(
         )
 
 
+@router.post("/bulk", response_model=BulkUpsertResponse)
+async def bulk_upsert_movies(
+        movies: List[MovieCreate],
+        movie_service: MovieService = Depends(get_movie_service),
+        user: UserBase = Depends(require_role("admin")),
+):
+    """
+    Create or update many movies at once, matched on `imdb_id`.
+    Movies are written in batched multi-row statements and the status of each one is returned.
+    Only admins can bulk upsert movies.
+    """
+    if not movies:
+        raise HTTPException(status_code=400, detail="At least one movie must be provided.")
+    if len(movies) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} movies can be sent at once.")
+
+    return await movie_service.bulk_upsert_movies(movies)
+
+
+@router.post(
+    "/import",
+    response_model=MovieImportResponse,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/x-ndjson": {"schema": {"type": "string", "format": "binary"}}},
+    }},
+)
+async def import_movies(
+        request: Request,
+        movie_service: MovieService = Depends(get_movie_service),
+        user: UserBase = Depends(require_role("admin")),
+):
+    """
+    Create or update movies from an NDJSON upload, matched on `imdb_id`.
+    Each line holds either the fields of `MovieCreate` or an OMDB payload (`Title`, `imdbID`, ...).
+    The body is read as it arrives and upserted in fixed-size batches; invalid lines are skipped
+    and reported with their line number. Only admins can import movies, at most `IMPORT_MAX_BYTES` at once.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"At most {IMPORT_MAX_BYTES} bytes can be imported at once.")
+
+    return await movie_service.import_movies(iter_lines(limited_body(request), IMPORT_MAX_LINE_BYTES))
+
+
 @router.patch("/{movie_id}", response_model=MovieOut)
 async def update_movie(
         movie_id: int,
@@ -53,7 +137,7 @@ async def update_movie(
     """
 
     try:
-        updated_movie = movie_service.update_movie(movie_id, movie_data)
+        updated_movie = await movie_service.update_movie(movie_id, movie_data)
         return updated_movie
     except HTTPException as e:
         raise e
@@ -62,33 +146,97 @@ async def update_movie(
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
-@router.get("/search", response_model=List[MovieOut])
+@router.get("/search", response_model=List[MovieSummary])
 async def search_movies(
         title: Optional[str] = None,
+        page: int = Query(1, ge=1, description="Page of results"),
+        limit: int = Query(20, ge=1, le=100, description="Results per page"),
+        fields: Tuple[str, ...] = Depends(movie_fields(MOVIE_SUMMARY_FIELDS)),
         movie_service: MovieService = Depends(get_movie_service),
 ):
+    """
+    Full-text search on titles: every word matches as a prefix, best matches first.
+    Movies carry the MovieSummary fields unless `fields` asks for others.
+    """
     if not title:
         raise HTTPException(status_code=400, detail="Title is required for searching")
 
-    movies = movie_service.search_movies_by_name(title)
+    movies = await movie_service.search_movies_by_name(title, limit, (page - 1) * limit, fields)
     if not movies:
         raise HTTPException(status_code=404, detail="Movies not found")
 
-    return movies
+    return ORJSONResponse(dump_movies(movies, fields))
 
 
-@router.get("/{movie_id}", response_model=MovieOut)
-async def get_movie_by_id(movie_id: int, movie_service: MovieService = Depends(get_movie_service), ):
-    # movie_service = MovieService(db)
-    movie = movie_service.get_movie_by_id(movie_id)
+@router.get("/suggest", response_model=List[MovieSuggestion])
+async def suggest_movies(
+        q: str = Query(..., min_length=1, description="What the user typed so far"),
+        limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions"),
+        movie_service: MovieService = Depends(get_movie_service),
+):
+    """
+    Typeahead suggestions from the in-memory title index, the database is not queried.
+    """
+    return [suggestion._asdict() for suggestion in movie_service.suggest_movies(q, limit)]
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}},
+)
+async def export_catalog(
+        request: Request,
+        export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format", description="`ndjson` or `csv`"),
+        fields: Tuple[str, ...] = Depends(movie_fields(MOVIE_FIELDS)),
+        session_factory=Depends(get_session_factory),
+):
+    """
+    Stream the whole catalog in id order, every field unless `fields` is given.
+    Rows are read through a server-side cursor and sent batch by batch, so memory stays flat
+    whatever the catalog size; the export stops when the client disconnects.
+    """
+    return StreamingResponse(
+        export_movies(session_factory, export_format, fields, is_disconnected=request.is_disconnected),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="movies.{export_format.value}"'},
+    )
+
+
+@router.get("/{movie_id}", response_model=MovieOut, responses={304: {"description": "Not modified"}})
+async def get_movie_by_id(
+        movie_id: int,
+        request: Request,
+        fields: Tuple[str, ...] = Depends(movie_fields(MOVIE_FIELDS)),
+        movie_service: MovieService = Depends(get_movie_service),
+):
+    """
+    Get a movie, limited to `fields` if given. Supports conditional requests: send back the ETag
+    (If-None-Match) or Last-Modified (If-Modified-Since) of a previous response to get an empty 304 if unchanged.
+    """
+    # Whole rows are read through the movie cache, `fields` only trims the payload
+    movie = await movie_service.get_movie_by_id(movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail=MOVIE_NOT_FOUND_MESSAGE)
-    return movie
+    adapter, _ = movie_adapters(fields)
+    return cached_json_response(
+        request,
+        adapter.dump_python(adapter.validate_python(movie, from_attributes=True), mode="json"),
+        last_modified=getattr(movie, "updated_at", None),
+    )
 
 
-@router.get("/", response_model=MovieListResponse)
+@router.get("/", response_model=MovieListResponse, responses={304: {"description": "Not modified"}})
 async def get_movies(
+        request: Request,
         page: int = 1, limit: int = 10,
+        cursor: Optional[str] = Query(
+            None, description="`next_cursor` of a previous page, seeks past it instead of using `page`"
+        ),
+        total: TotalCount = Query(
+            TotalCount.estimated, description="`exact` recounts, `estimated` uses a cached count, `none` skips it"
+        ),
+        fields: Tuple[str, ...] = Depends(movie_fields(MOVIE_SUMMARY_FIELDS)),
         movie_service: MovieService = Depends(get_movie_service),
 ):
     if page < 1:
@@ -96,24 +244,27 @@ async def get_movies(
     if limit < 1:
         raise HTTPException(status_code=400, detail="Limit must be greater than 0")
 
-    # Calculate skip based on page and limit
-    skip = (page - 1) * limit
-    movies, total_movies = movie_service.get_movies_with_pagination(skip, limit)
+    if cursor:
+        # Keyset pagination: cost does not grow with the page depth
+        movies, total_movies, next_cursor = await movie_service.get_movies_after_cursor(cursor, limit, total, fields)
+    else:
+        # Calculate skip based on page and limit
+        skip = (page - 1) * limit
+        movies, total_movies, next_cursor = await movie_service.get_movies_with_pagination(skip, limit, total, fields)
 
     # Calculate total pages
-    total_pages = (total_movies + limit - 1) // limit
+    total_pages = (total_movies + limit - 1) // limit if total_movies is not None else None
 
-    return {
-        "movies": movies,
-        "total_pages": total_pages
-    }
+    # The ETag covers the page content, Last-Modified is not sent: deletes do not move it
+    page_data = {"movies": dump_movies(movies, fields), "total_pages": total_pages, "next_cursor": next_cursor}
+    return cached_json_response(request, page_data)
 
 
 @router.delete("/{movie_id}")
 async def delete_movie(movie_id: int,
                        movie_service: MovieService = Depends(get_movie_service),
                        user: UserBase = Depends(require_role("admin"))):
-    result = movie_service.delete_movie_by_id(movie_id)
+    result = await movie_service.delete_movie_by_id(movie_id)
     if not result:
         raise HTTPException(status_code=404, detail=MOVIE_NOT_FOUND_MESSAGE)
     return {"detail": "Movie deleted successfully"}
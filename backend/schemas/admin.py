@@ -0,0 +1,58 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SeedStatus(BaseModel):
+    """
+    Progress of the background database seeding
+    """
+    state: str = Field(..., example="running", description="idle, pending, running, completed, failed or cancelled")
+    progress: float = Field(..., example=0.42, description="Share of the requested movies processed, 0 to 1")
+    requested: int = Field(..., example=100, description="Number of movies to fetch")
+    budget: int = Field(..., example=300, description="Most OMDB lookups allowed, 0 when not bounded")
+    calls: int = Field(..., example=45, description="OMDB lookups made")
+    skipped: int = Field(..., example=3, description="Random IDs skipped as already stored")
+    hit_rate: float = Field(..., example=0.89, description="Share of the OMDB lookups that found a movie")
+    fetched: int = Field(..., example=40, description="Movies fetched from OMDB")
+    not_found: int = Field(..., example=2, description="Random IDs OMDB does not know")
+    failed: int = Field(..., example=0, description="Movies that could not be fetched or parsed")
+    rejected: int = Field(..., example=0, description="Fetched movies that were invalid or could not be stored")
+    retries: int = Field(..., example=1, description="OMDB calls retried after a transient error")
+    inserted: int = Field(..., example=38, description="Movies stored in the database")
+    batches: int = Field(..., example=1, description="Insert batches flushed")
+    elapsed: float = Field(..., example=3.2, description="Seconds since seeding started")
+    rate: float = Field(..., example=11.9, description="Movies stored per second")
+    errors: List[str] = Field(default_factory=list, description="Most recent errors")
+
+
+class RateLimiterStatus(BaseModel):
+    """
+    State of the OMDB rate limiter shared by every OMDB caller
+    """
+    rate_limit: float = Field(..., example=10.0, description="Requests per second allowed")
+    observed_rate: float = Field(..., example=8.4, description="Requests per second sent over the last 10 seconds")
+    concurrency_limit: int = Field(..., example=6, description="Current adaptive limit of concurrent requests")
+    in_flight: int = Field(..., example=5, description="Requests being sent")
+    waiting: int = Field(..., example=12, description="Callers queued for a slot or a token")
+    requests: int = Field(..., example=1520, description="Requests sent since startup")
+    throttled: int = Field(..., example=3, description="Requests answered with 429/5xx or timed out")
+
+
+class CacheStatus(BaseModel):
+    """
+    Metrics of the movie read cache
+    """
+    backend: str = Field(..., example="MemoryCacheBackend", description="Cache backend in use")
+    hits: int = Field(..., example=940, description="Reads served from the cache")
+    misses: int = Field(..., example=60, description="Reads that went to the database")
+    hit_ratio: float = Field(..., example=0.94, description="Share of the reads served from the cache")
+    size: Optional[int] = Field(None, example=250, description="Entries held, for in-process backends")
+
+
+class SuggestIndexStatus(BaseModel):
+    """
+    State of the in-process typeahead index
+    """
+    ready: bool = Field(..., example=True, description="False while the startup build runs, entries may be missing")
+    movies: int = Field(..., example=25000, description="Movies indexed")
@@ -1,6 +1,8 @@
-from typing import Optional, List
+from enum import Enum
+from functools import lru_cache
+from typing import Optional, List, Tuple
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, create_model
 
 
 class MovieBase(BaseModel):
@@ -49,9 +51,87 @@ class MovieUpdate(BaseModel):
     director: Optional[str] = Field(None, example="Christopher Nolan")
 
 
+class TotalCount(str, Enum):
+    """How the list endpoint computes its total"""
+    exact = "exact"  # Fresh COUNT on every request
+    estimated = "estimated"  # Cached count, invalidated on writes
+    none = "none"  # No count, total_pages is null
+
+
+class ExistingMovie(str, Enum):
+    """What create-by-title does when the movie is already stored"""
+    return_existing = "return"  # Respond with the stored movie
+    conflict = "conflict"  # Respond 409 Conflict
+
+
+class ExportFormat(str, Enum):
+    """Encoding of catalog exports"""
+    ndjson = "ndjson"  # One JSON object per line
+    csv = "csv"  # Header row, then one row per movie
+
+
+class MovieSummary(BaseModel):
+    """Compact movie of list pages, what a movie card shows. Default fieldset of list and search"""
+    id: int = Field(..., example=1)
+    title: str = Field(..., example="Inception")
+    year: Optional[int] = Field(None, example=2010)
+    poster_url: Optional[str] = Field(None, example="https://example.com/poster.jpg")
+
+    class Config:
+        from_attributes = True
+
+
 class MovieListResponse(BaseModel):
-    movies: List[MovieOut] = Field(..., example=["movie1", "movie2"])
-    total_pages: int = Field(..., example=2)
+    movies: List[MovieSummary] = Field(
+        ..., example=["movie1", "movie2"], description="MovieSummary fields unless `fields` asks for others"
+    )
+    total_pages: Optional[int] = Field(..., example=2, description="Null when the total was not requested")
+    next_cursor: Optional[str] = Field(
+        None,
+        example="WyJJbmNlcHRpb24iLDFd",
+        description="Opaque cursor of the next page, pass it back as `cursor`. Null on the last page"
+    )
+
+
+class BulkItemStatus(str, Enum):
+    """Outcome of one movie of a bulk upsert"""
+    created = "created"
+    updated = "updated"
+    error = "error"
+
+
+class BulkMovieResult(BaseModel):
+    imdb_id: str = Field(..., example="tt1375666")
+    status: BulkItemStatus = Field(..., example=BulkItemStatus.created)
+    detail: Optional[str] = Field(None, description="Why the movie could not be stored")
+
+
+class BulkUpsertResponse(BaseModel):
+    created: int = Field(..., example=2)
+    updated: int = Field(..., example=1)
+    failed: int = Field(..., example=0)
+    results: List[BulkMovieResult]
+
+
+class ImportLineError(BaseModel):
+    line: int = Field(..., example=12, description="Line number in the upload, from 1")
+    imdb_id: Optional[str] = Field(None, example="tt1375666")
+    detail: str = Field(..., example="year: Input should be greater than or equal to 1888")
+
+
+class MovieImportResponse(BaseModel):
+    lines: int = Field(..., example=1000, description="Lines read, blank ones included")
+    created: int = Field(..., example=990)
+    updated: int = Field(..., example=8)
+    failed: int = Field(..., example=2)
+    errors: List[ImportLineError] = Field(..., description="Failed lines, the first IMPORT_MAX_ERRORS of them")
+    errors_truncated: bool = Field(False, description="Whether more lines failed than `errors` lists")
+
+
+class MovieSuggestion(BaseModel):
+    id: int = Field(..., example=1)
+    title: str = Field(..., example="Inception")
+    year: Optional[int] = Field(None, example=2010)
 
 
 class MovieResponse(MovieBase):
@@ -59,3 +139,25 @@ class MovieResponse(MovieBase):
 
     class Config:
         from_attributes = True
+
+
+# Fields a `fields=` sparse fieldset may pick, in response order
+MOVIE_FIELDS = tuple(MovieOut.model_fields)
+MOVIE_SUMMARY_FIELDS = tuple(MovieSummary.model_fields)
+
+# Prebuilt adapters: building one compiles its validator and serializer, so it is done once
+movie_out_adapter = TypeAdapter(MovieOut)
+movie_list_adapter = TypeAdapter(List[MovieOut])
+
+
+@lru_cache(maxsize=None)
+def movie_adapters(fields: Tuple[str, ...]) -> Tuple[TypeAdapter, TypeAdapter]:
+    """(movie, list of movies) adapters rendering only `fields` of MovieOut, built once per fieldset"""
+    if fields == MOVIE_FIELDS:
+        return movie_out_adapter, movie_list_adapter
+    model = create_model(
+        "MovieFields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (MovieOut.model_fields[name].annotation, MovieOut.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(model), TypeAdapter(List[model])
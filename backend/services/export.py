@@ -0,0 +1,58 @@
+import csv
+import io
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Sequence
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config.constants import EXPORT_BATCH_SIZE
+from repositories.movie import MovieRepository
+from schemas.movies import ExportFormat
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def ndjson_chunk(rows: Iterable[Dict[str, Any]]) -> bytes:
+    """Rows as newline-delimited JSON"""
+    return b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+def csv_chunk(rows: Iterable[Dict[str, Any]], fields: Sequence[str], header: bool = False) -> bytes:
+    """Rows as CSV lines (RFC 4180), preceded by the header line if asked. None is written as an empty cell"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows([row[name] for name in fields] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def export_movies(
+        session_factory: async_sessionmaker[AsyncSession],
+        export_format: ExportFormat,
+        fields: Sequence[str],
+        batch_size: int = EXPORT_BATCH_SIZE,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Encoded chunks of the whole catalog, one per batch of rows, for a streamed response
+
+    The export opens its own session: a streamed body is sent after the request's
+    dependencies are closed. It stops early once `is_disconnected` reports the client left
+    """
+    if export_format == ExportFormat.csv:
+        yield csv_chunk((), fields, header=True)
+
+    exported = 0
+    async with session_factory() as session:
+        async for rows in MovieRepository(session).stream_rows(fields, batch_size):
+            if is_disconnected is not None and await is_disconnected():
+                logging.info(f"Export stopped after {exported} movies, the client disconnected")
+                return
+            exported += len(rows)
+            yield ndjson_chunk(rows) if export_format == ExportFormat.ndjson else csv_chunk(rows, fields)
+    logging.info(f"Exported {exported} movies as {export_format.value}")
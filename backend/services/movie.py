@@ -1,52 +1,77 @@
 import logging
-from typing import List, Optional, Type, Tuple
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
-import httpx
+import orjson
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from config.constants import OMDB_BASE_URL
+from config.constants import (
+    BULK_BATCH_SIZE, IMPORT_BATCH_SIZE, IMPORT_INDEX_BATCH_SIZE, IMPORT_MAX_ERRORS, IMPORT_MAX_LINE_BYTES,
+)
 from models.movies import Movie
 from repositories.movie import MovieRepository
-from schemas.movies import MovieCreate, MovieUpdate
+from schemas.movies import MOVIE_FIELDS, MovieCreate, MovieUpdate, TotalCount, BulkItemStatus, ExistingMovie
+from utils.omdb_api import OMDBClient, OMDBError
+from utils.pagination import encode_cursor, decode_cursor
+from utils.single_flight import SingleFlight
+from utils.suggest import SuggestIndex, Suggestion
+from utils.transformers import import_record_data, normalize_title
+
+T = TypeVar("T")
 
 
 class MovieService:
-    def __init__(self, db_session: Session):
+    # Process-wide: concurrent creations of the same title share one lookup and OMDB fetch,
+    # and of the same IMDb ID one upsert
+    title_flights = SingleFlight()
+    imdb_flights = SingleFlight()
+
+    def __init__(
+            self,
+            db_session: AsyncSession,
+            omdb_client: OMDBClient,
+            suggest_index: Optional[SuggestIndex] = None,
+            session_factory: Optional[async_sessionmaker] = None,
+    ):
         self.movie_repository = MovieRepository(db_session)
+        self.omdb_client = omdb_client
+        self.suggest_index = suggest_index
+        # Sessions of the work shared by coalesced calls, which outlives the request starting it
+        self.session_factory = session_factory or async_sessionmaker(
+            bind=db_session.bind, autoflush=False, expire_on_commit=False
+        )
 
-    def fetch_movie_from_omdb(self, title: str) -> MovieCreate:
+    async def fetch_movie_from_omdb(self, title: str) -> MovieCreate:
         """
         Fetch movie details from OMDB API and map them to MovieCreate schema.
         Raises HTTPException if the movie is not found or the API call fails.
         """
         try:
-            search_url = f"{OMDB_BASE_URL}t={title}"
-            logging.info(f"Fetching movie from OMDB: {search_url}")
-            response = httpx.get(search_url)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('Response') == 'True':
-                    logging.info(f"OMDB API responded with data: {data}")
-                    return MovieCreate(
-                        title=data['Title'],
-                        year=int(data['Year']),
-                        genre=data['Genre'],
-                        type=data['Type'],
-                        director=data['Director'],
-                        plot=data['Plot'],
-                        imdb_id=data['imdbID'],
-                        poster_url=data.get('Poster')
-                    )
-                else:
-                    logging.warning(f"OMDB API responded with error: {data.get('Error')}")
-                    raise HTTPException(status_code=404, detail=f"Movie '{title}' not found in OMDB.")
-            else:
-                logging.error(f"OMDB API call failed with status {response.status_code}: {response.text}")
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to fetch movie from OMDB. Please try again later."
+            data = await self.omdb_client.fetch_by_title(title)
+            if data.get('Response') == 'True':
+                logging.info(f"OMDB API responded with data: {data}")
+                return MovieCreate(
+                    title=data['Title'],
+                    year=int(data['Year']),
+                    genre=data['Genre'],
+                    type=data['Type'],
+                    director=data['Director'],
+                    plot=data['Plot'],
+                    imdb_id=data['imdbID'],
+                    poster_url=data.get('Poster')
                 )
+            else:
+                logging.warning(f"OMDB API responded with error: {data.get('Error')}")
+                raise HTTPException(status_code=404, detail=f"Movie '{title}' not found in OMDB.")
+        except HTTPException:
+            raise
+        except OMDBError as e:
+            logging.error(f"OMDB API call failed: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to fetch movie from OMDB. Please try again later."
+            )
         except Exception as e:
             logging.error(f"Error calling OMDB API: {e}")
             raise HTTPException(
@@ -54,49 +79,269 @@ class MovieService:
                 detail="An unexpected error occurred while communicating with OMDB."
             )
 
-    def create_movie(self, movie_data: MovieCreate) -> Movie:
+    async def create_movie(self, movie_data: MovieCreate) -> Movie:
         """
         Create a movie in the database using provided MovieCreate data.
         """
         try:
             logging.info(f"Creating movie with provided data: {movie_data}")
-            return self.movie_repository.create(movie_data)
+            movie = await self.movie_repository.create(movie_data)
         except Exception as e:
             logging.error(f"Error creating movie in database: {e}")
-            raise HTTPException(status_code=400, detail="Error creating movie.")
+            raise HTTPException(status_code=400, detail="Error creating movie.") from e
+        self._index_movie(movie)
+        return movie
+
+    async def bulk_upsert_movies(self, movies: List[MovieCreate]) -> Dict:
+        """
+        Insert or update many movies by imdb_id in batched multi-row statements.
+        Returns the created/updated/failed counts and the status of every movie.
+        """
+        logging.info(f"Bulk upserting {len(movies)} movies")
+        results = await self.movie_repository.bulk_upsert(movies)
+        if self.suggest_index is not None:
+            self.suggest_index.add_many(await self._suggest_rows(results))
+
+        statuses = [status for _, status, _ in results]
+        return {
+            "created": statuses.count(BulkItemStatus.created),
+            "updated": statuses.count(BulkItemStatus.updated),
+            "failed": statuses.count(BulkItemStatus.error),
+            "results": [
+                {"imdb_id": imdb_id, "status": status, "detail": detail} for imdb_id, status, detail in results
+            ],
+        }
 
-    def create_movie_from_title(self, title: str) -> Movie:
+    async def import_movies(
+            self, lines: AsyncIterable[Optional[bytes]], batch_size: int = IMPORT_BATCH_SIZE
+    ) -> Dict:
         """
-        Fetch movie details from OMDB by title and create it in the database.
+        Upsert the movies of an NDJSON upload by imdb_id, `batch_size` at a time, as lines arrive.
+        Each line holds MovieCreate fields or an OMDB payload; None stands for an overlong line.
+        Returns the created/updated/failed counts and the errors of the failed lines.
         """
-        movie_data = self.fetch_movie_from_omdb(title)
-        return self.create_movie(movie_data)
+        summary = {"lines": 0, "created": 0, "updated": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+        def fail(line_number: int, imdb_id: Optional[str], detail: str) -> None:
+            summary["failed"] += 1
+            if len(summary["errors"]) < IMPORT_MAX_ERRORS:
+                summary["errors"].append({"line": line_number, "imdb_id": imdb_id, "detail": detail})
+            else:
+                summary["errors_truncated"] = True
+
+        # Suggest index additions are grouped: each one re-sorts the index keys
+        unindexed: List[Tuple[int, str, Optional[int], Optional[str]]] = []
 
-    def get_all_movies(self, page: int = 1, limit: int = 10) -> List[Movie]:
-        return self.movie_repository.get_all(page, limit)
+        async def flush(batch: List[Tuple[int, MovieCreate]], last: bool = False) -> None:
+            results = await self.movie_repository.bulk_upsert([movie for _, movie in batch]) if batch else []
+            for (line_number, _), (imdb_id, status, detail) in zip(batch, results):
+                if status == BulkItemStatus.error:
+                    fail(line_number, imdb_id, detail)
+                else:
+                    summary[status.value] += 1
+            if self.suggest_index is not None:
+                unindexed.extend(await self._suggest_rows(results))
+                if last or len(unindexed) >= IMPORT_INDEX_BATCH_SIZE:
+                    self.suggest_index.add_many(unindexed)
+                    unindexed.clear()
 
-    def get_movies_with_pagination(self, skip: int, limit: int) -> Tuple[List[Type[Movie]], int]:
-        """Get movies with pagination."""
-        # Get the paginated results from the repository
-        movies = self.movie_repository.get_all_ordered_by_title(skip, limit)
-        total_movies = self.movie_repository.count_movies()
-        return movies, total_movies
+        batch: List[Tuple[int, MovieCreate]] = []
+        async for line in lines:
+            summary["lines"] += 1
+            if line is None:
+                fail(summary["lines"], None, f"Line longer than {IMPORT_MAX_LINE_BYTES} bytes")
+                continue
+            if not line.strip():
+                continue
 
-    def count_movies(self) -> int:
-        return self.movie_repository.count_movies()
+            record = None
+            try:
+                record = orjson.loads(line)
+                batch.append((summary["lines"], MovieCreate.model_validate(import_record_data(record))))
+            except orjson.JSONDecodeError:
+                fail(summary["lines"], None, "Invalid JSON")
+            except ValidationError as e:
+                detail = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                fail(summary["lines"], self._record_imdb_id(record), detail)
+            except ValueError as e:
+                fail(summary["lines"], self._record_imdb_id(record), str(e))
 
-    def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
-        return self.movie_repository.get_by_id(movie_id)
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        await flush(batch, last=True)
 
-    def search_movies_by_name(self, title: str) -> List[Type[Movie]]:
-        return self.movie_repository.search_by_name(title)
+        logging.info(
+            f"Imported {summary['lines']} lines: {summary['created']} created, "
+            f"{summary['updated']} updated, {summary['failed']} failed"
+        )
+        return summary
 
-    def update_movie(self, movie_id: int, movie_data: MovieUpdate) -> Movie:
+    @staticmethod
+    def _record_imdb_id(record: Any) -> Optional[str]:
+        """IMDb ID of an imported record, if it has a usable one, to point at failed lines."""
+        if not isinstance(record, dict):
+            return None
+        imdb_id = record.get("imdb_id", record.get("imdbID"))
+        return imdb_id if isinstance(imdb_id, str) else None
+
+    async def _suggest_rows(
+            self, results: List[Tuple[str, BulkItemStatus, Optional[str]]]
+    ) -> List[Tuple[int, str, Optional[int], Optional[str]]]:
+        """Suggest index rows of the movies a bulk upsert stored."""
+        stored = [imdb_id for imdb_id, status, _ in results if status != BulkItemStatus.error]
+        rows = []
+        for start in range(0, len(stored), BULK_BATCH_SIZE):
+            rows.extend(await self.movie_repository.get_suggest_rows(stored[start:start + BULK_BATCH_SIZE]))
+        return rows
+
+    async def create_movie_from_title(
+            self, title: str, if_exists: ExistingMovie = ExistingMovie.return_existing
+    ) -> Movie:
+        """
+        Create a movie by title, looking in the local catalog before calling OMDB.
+        A stored movie with the same (or a loosely equal) title is returned, or rejected with
+        409 depending on `if_exists`. Otherwise the movie is fetched from OMDB and upserted
+        by IMDb ID. Concurrent calls for the same normalized title share the work.
+
+        The shared work runs in its own session and only hands out the movie id, every
+        caller then reads the movie in its own session
+        """
+        movie_id, created = await self.title_flights.do(
+            normalize_title(title), lambda: self._shared(lambda service: service._create_movie_from_title(title))
+        )
+        movie = await self.movie_repository.get_by_id_fresh(movie_id)
+        if movie is None:  # Deleted in the meantime
+            raise HTTPException(status_code=404, detail=f"Movie '{title}' was deleted while being created.")
+        if not created and if_exists == ExistingMovie.conflict:
+            raise HTTPException(status_code=409, detail=f"Movie '{movie.title}' already exists with id {movie.id}.")
+        return movie
+
+    async def _shared(self, work: Callable[["MovieService"], Awaitable[T]]) -> T:
+        """Run `work` on a service with a session of its own, closed once the work is done"""
+        async with self.session_factory() as session:
+            return await work(MovieService(session, self.omdb_client, self.suggest_index, self.session_factory))
+
+    async def _create_movie_from_title(self, title: str) -> Tuple[int, bool]:
+        movie = await self.find_stored_movie(title)
+        if movie is not None:
+            logging.info(f"Movie '{title}' found locally (id {movie.id}), OMDB not called")
+            return movie.id, False
+        movie_data = await self.fetch_movie_from_omdb(title)
+        return await self.imdb_flights.do(
+            movie_data.imdb_id, lambda: self._shared(lambda service: service._upsert_movie(movie_data))
+        )
+
+    async def find_stored_movie(self, title: str) -> Optional[Movie]:
+        """
+        Find a stored movie by title: exact then loose match on the suggest index followed by
+        a primary key read, then an indexed title read. The index only sees the writes of this
+        process, movies stored by other instances are found by the title read.
+        """
+        if self.suggest_index is not None and self.suggest_index.ready:
+            for movie_id in self.suggest_index.lookup(title) or self.suggest_index.lookup_similar(title):
+                movie = await self.movie_repository.get_by_id(movie_id)
+                if movie is not None:  # The index may lag behind deletes made by other instances
+                    return movie
+        return await self.movie_repository.get_by_title(title)
+
+    async def _upsert_movie(self, movie_data: MovieCreate) -> Tuple[int, bool]:
+        """Insert the movie or refresh the row stored under its IMDb ID, returns its id and True when inserted."""
+        [(_, status, _)] = await self.movie_repository.bulk_upsert([movie_data])
+        movie = await self.movie_repository.get_by_imdb_id(movie_data.imdb_id)
+        if status == BulkItemStatus.error or movie is None:
+            raise HTTPException(status_code=400, detail="Error creating movie.")
+        self._index_movie(movie)
+        return movie.id, status == BulkItemStatus.created
+
+    async def get_all_movies(self, page: int = 1, limit: int = 10) -> List[Movie]:
+        return await self.movie_repository.get_all(page, limit)
+
+    async def get_movies_with_pagination(
+            self,
+            skip: int,
+            limit: int,
+            total: TotalCount = TotalCount.estimated,
+            fields: Sequence[str] = MOVIE_FIELDS,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+        """Get movies with offset pagination, along with the cursor of the next page."""
+        # Get the paginated results from the repository, one extra row tells if a next page exists
+        movies = await self.movie_repository.get_all_ordered_by_title(skip, limit + 1, self._cursor_fields(fields))
+        total_movies = await self._count_movies(total)
+        return movies[:limit], total_movies, self._next_cursor(movies, limit)
+
+    async def get_movies_after_cursor(
+            self,
+            cursor: str,
+            limit: int,
+            total: TotalCount = TotalCount.estimated,
+            fields: Sequence[str] = MOVIE_FIELDS,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], Optional[str]]:
+        """Get the page of movies following `cursor` (keyset pagination)."""
+        try:
+            title, movie_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        movies = await self.movie_repository.get_all_after(title, movie_id, limit + 1, self._cursor_fields(fields))
+        total_movies = await self._count_movies(total)
+        return movies[:limit], total_movies, self._next_cursor(movies, limit)
+
+    async def _count_movies(self, total: TotalCount) -> Optional[int]:
+        """Count movies the way the caller asked for."""
+        if total == TotalCount.none:
+            return None
+        if total == TotalCount.exact:
+            return await self.movie_repository.count_movies()
+        return await self.movie_repository.count_movies_cached()
+
+    @staticmethod
+    def _cursor_fields(fields: Sequence[str]) -> Tuple[str, ...]:
+        """Fields to read for a page: the requested ones plus what the next cursor is made of."""
+        return tuple(fields) + tuple(name for name in ("title", "id") if name not in fields)
+
+    @staticmethod
+    def _next_cursor(movies: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """Cursor pointing after the last movie of the page, None on the last page."""
+        if len(movies) <= limit:
+            return None
+        last = movies[limit - 1]
+        return encode_cursor(last["title"], last["id"])
+
+    async def count_movies(self) -> int:
+        return await self.movie_repository.count_movies()
+
+    async def get_movie_by_id(self, movie_id: int) -> Optional[Movie]:
+        """Read a movie for display, served from the movie cache when possible."""
+        return await self.movie_repository.get_by_id_cached(movie_id)
+
+    def suggest_movies(self, query: str, limit: int = 10) -> List[Suggestion]:
+        """Typeahead suggestions, served from the in-memory index without touching the DB."""
+        if self.suggest_index is None:
+            return []
+        return self.suggest_index.suggest(query, limit)
+
+    async def search_movies_by_name(
+            self, title: str, limit: Optional[int] = None, offset: int = 0, fields: Sequence[str] = MOVIE_FIELDS
+    ) -> List[Dict[str, Any]]:
+        return await self.movie_repository.search_by_name(title, limit, offset, fields)
+
+    async def update_movie(self, movie_id: int, movie_data: MovieUpdate) -> Movie:
         """
         Partially update an existing movie's details.
         """
         logging.info(f"Updating movie ID: {movie_id} with data: {movie_data}")
-        return self.movie_repository.update(movie_id, movie_data)
+        movie = await self.movie_repository.update(movie_id, movie_data)
+        self._index_movie(movie)
+        return movie
+
+    async def delete_movie_by_id(self, movie_id: int) -> bool:
+        deleted = await self.movie_repository.delete_by_id(movie_id)
+        if deleted and self.suggest_index is not None:
+            self.suggest_index.remove(movie_id)
+        return deleted
 
-    def delete_movie_by_id(self, movie_id: int) -> bool:
-        return self.movie_repository.delete_by_id(movie_id)
+    def _index_movie(self, movie: Movie) -> None:
+        """Add or refresh a movie in the suggest index."""
+        if self.suggest_index is not None:
+            self.suggest_index.add(movie.id, movie.title, movie.year, movie.director)
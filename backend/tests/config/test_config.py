@@ -2,7 +2,7 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from config.settings import DevSettings, ProdSettings, SettingsFactory
+from config.settings import DevSettings, ProdSettings, SettingsFactory, to_async_database_url
 
 
 @pytest.fixture
@@ -103,8 +103,55 @@ def test_settings_factory_invalid(mock_env_vars):
 
 
 def test_dev_settings_get_db_connection(mock_env_vars):
-    with patch("config.settings.create_engine") as mock_create_engine:
+    with patch("config.settings.create_async_engine") as mock_create_engine:
         settings = DevSettings()
         settings.get_db_connection()
 
-        mock_create_engine.assert_called_once_with("sqlite:///test.db")
+        mock_create_engine.assert_called_once_with("sqlite+aiosqlite:///test.db")
+
+
+def test_to_async_database_url():
+    assert to_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+    assert to_async_database_url("mysql+pymysql://user:pw@host/db") == "mysql+aiomysql://user:pw@host/db"
+    assert to_async_database_url("sqlite+aiosqlite:///test.db") == "sqlite+aiosqlite:///test.db"
+
+
+def test_dev_settings_seed_source(mock_env_vars):
+    settings = DevSettings()
+    assert settings.SEED_SOURCE == "omdb"
+    assert settings.SEED_FILE_PATH is None
+
+    mock_env_vars.side_effect = lambda key, default=None: {
+        "APP_TITLE": "Test App", "OMDB_API_KEY": "test_api_key", "DATABASE_URL": "sqlite:///test.db",
+        "SEED_SOURCE": "file", "SEED_FILE_PATH": "/data/movies.jsonl",
+    }.get(key, default)
+    settings = DevSettings()
+    assert settings.SEED_SOURCE == "file"
+    assert settings.SEED_FILE_PATH == "/data/movies.jsonl"
+
+
+def test_dev_settings_seed_file_required(mock_env_vars):
+    mock_env_vars.side_effect = lambda key, default=None: {
+        "APP_TITLE": "Test App", "OMDB_API_KEY": "test_api_key", "DATABASE_URL": "sqlite:///test.db",
+        "SEED_SOURCE": "file",
+    }.get(key, default)
+    with pytest.raises(ValueError, match="SEED_FILE_PATH"):
+        DevSettings()
+
+
+def test_dev_settings_query_log(mock_env_vars):
+    settings = DevSettings()
+    assert settings.SLOW_QUERY_MS == 100
+    assert settings.SLOW_QUERY_EXPLAIN is True
+    assert settings.QUERY_BUDGET == 10
+    assert settings.QUERY_BUDGET_STRICT is False
+
+    mock_env_vars.side_effect = lambda key, default=None: {
+        "APP_TITLE": "Test App", "OMDB_API_KEY": "test_api_key", "DATABASE_URL": "sqlite:///test.db",
+        "SLOW_QUERY_MS": "-5", "SLOW_QUERY_EXPLAIN": "false", "QUERY_BUDGET": "3", "QUERY_BUDGET_STRICT": "1",
+    }.get(key, default)
+    settings = DevSettings()
+    assert settings.SLOW_QUERY_MS == 100
+    assert settings.SLOW_QUERY_EXPLAIN is False
+    assert settings.QUERY_BUDGET == 3
+    assert settings.QUERY_BUDGET_STRICT is True
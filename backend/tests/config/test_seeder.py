@@ -0,0 +1,224 @@
+import csv
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+
+from config.database import FileSeeder, MovieFetcher, MovieSeeder
+from utils.omdb_api import OMDBError
+
+
+def movie_payload(imdb_id: str) -> dict:
+    return {
+        "Response": "True", "Title": f"Movie {imdb_id}", "Year": "2001", "imdbID": imdb_id,
+        "Type": "movie", "Poster": "N/A", "Genre": "Drama", "Director": "N/A", "Plot": "N/A",
+    }
+
+
+class FakeOMDBClient:
+    """Answers from a script of per-id outcomes: a payload or an OMDBError to raise."""
+
+    def __init__(self, outcomes=None):
+        self.outcomes = outcomes or {}
+        self.calls = []
+
+    async def fetch_by_imdb_id(self, imdb_id: str) -> dict:
+        self.calls.append(imdb_id)
+        outcome = self.outcomes.get(imdb_id, movie_payload(imdb_id))
+        if isinstance(outcome, list):
+            outcome = outcome.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.mark.asyncio
+async def test_fetch_movie_retries_throttling():
+    client = FakeOMDBClient({"tt0000001": [OMDBError("throttled", 429), OMDBError("down", 503), movie_payload("tt0000001")]})
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    fetcher = MovieFetcher(client, max_retries=3, backoff=1, sleep=sleep)
+
+    data = await fetcher.fetch_movie("tt0000001")
+
+    assert data["imdbID"] == "tt0000001"
+    assert len(client.calls) == 3
+    assert fetcher.stats.retries == 2
+    assert 0.5 <= delays[0] <= 1.5 and 1 <= delays[1] <= 3  # Exponential backoff with jitter
+
+
+@pytest.mark.asyncio
+async def test_fetch_movie_does_not_retry_client_errors():
+    client = FakeOMDBClient({"tt0000001": OMDBError("unauthorized", 401)})
+    fetcher = MovieFetcher(client, max_retries=3, backoff=0)
+
+    with pytest.raises(OMDBError):
+        await fetcher.fetch_movie("tt0000001")
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_movie_not_found():
+    client = FakeOMDBClient({"tt0000001": {"Response": "False", "Error": "Incorrect IMDb ID."}})
+    assert await MovieFetcher(client).fetch_movie("tt0000001") is None
+
+
+@pytest.mark.asyncio
+async def test_seed_database_streams_batches():
+    ids = [f"tt{i:07d}" for i in range(1, 13)]
+    client = FakeOMDBClient({
+        "tt0000003": {"Response": "False", "Error": "Incorrect IMDb ID."},
+        "tt0000004": OMDBError("bad request", 400),
+    })
+    seeder = MovieSeeder(MovieFetcher(client, backoff=0), movie_count=10, concurrency=3, batch_size=4)
+    batches = []
+
+    async def insert_batch(movies):
+        batches.append([movie.imdb_id for movie in movies])
+        return len(movies)
+
+    with patch.object(MovieSeeder, "generate_candidate_ids", return_value=iter(ids)):
+        stats = await seeder.seed_database(insert_batch)
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert sorted(sum(batches, [])) == sorted(set(ids) - {"tt0000003", "tt0000004"})
+    assert stats.fetched == 10
+    assert stats.inserted == 10
+    assert stats.not_found == 1
+    assert stats.failed == 1
+    assert stats.batches == 3
+    assert stats.calls == 12
+    assert stats.as_dict()["requested"] == 10
+    assert stats.state == "completed"
+    assert stats.progress == 1.0
+    assert list(stats.errors) == ["tt0000004: bad request"]
+
+
+@pytest.mark.asyncio
+async def test_seed_database_reports_failure():
+    ids = [f"tt{i:07d}" for i in range(1, 5)]
+    seeder = MovieSeeder(MovieFetcher(FakeOMDBClient(), backoff=0), movie_count=len(ids), batch_size=2)
+
+    async def insert_batch(movies):
+        raise RuntimeError("database is down")
+
+    with patch.object(MovieSeeder, "generate_candidate_ids", return_value=iter(ids)):
+        with pytest.raises(RuntimeError):
+            await seeder.seed_database(insert_batch)
+
+    assert seeder.stats.state == "failed"
+    assert "database is down" in seeder.stats.errors
+
+
+def test_candidate_ids_are_unique_and_skip_existing():
+    existing = {f"tt{i:07d}" for i in range(1, 11)}
+    seeder = MovieSeeder(MovieFetcher(FakeOMDBClient()), existing_ids=existing, id_space=20)
+
+    candidates = list(seeder.generate_candidate_ids())
+
+    assert sorted(candidates) == [f"tt{i:07d}" for i in range(11, 21)]
+    assert seeder.stats.skipped == 10
+
+
+@pytest.mark.asyncio
+async def test_seed_database_keeps_drawing_until_target():
+    not_found = {"Response": "False", "Error": "Incorrect IMDb ID."}
+    client = FakeOMDBClient({f"tt{i:07d}": not_found for i in range(1, 21) if i % 2})
+    seeder = MovieSeeder(MovieFetcher(client, backoff=0), movie_count=5, concurrency=4, id_space=20)
+
+    async def insert_batch(movies):
+        return len(movies)
+
+    stats = await seeder.seed_database(insert_batch)
+
+    assert stats.fetched == stats.inserted == 5
+    assert len(client.calls) == len(set(client.calls)) == stats.calls
+    assert stats.calls <= 15
+    assert stats.progress == 1.0
+
+
+@pytest.mark.asyncio
+async def test_seed_database_stops_at_call_budget():
+    client = FakeOMDBClient({f"tt{i:07d}": {"Response": "False", "Error": "Incorrect IMDb ID."} for i in range(1, 101)})
+    seeder = MovieSeeder(MovieFetcher(client, backoff=0), movie_count=10, call_budget=7, id_space=100)
+
+    async def insert_batch(movies):
+        return len(movies)
+
+    stats = await seeder.seed_database(insert_batch)
+
+    assert stats.calls == len(client.calls) == 7
+    assert stats.fetched == 0
+    assert stats.hit_rate == 0.0
+    assert stats.state == "completed"
+    assert stats.progress == 1.0
+
+
+@pytest.mark.asyncio
+async def test_file_seeder_streams_jsonl_dump(tmp_path):
+    path = tmp_path / "movies.jsonl"
+    lines = [json.dumps(movie_payload(f"tt{i:07d}")) for i in range(1, 8)]
+    lines[2] = "{not json"
+    lines.insert(4, "")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    batches = []
+
+    async def insert_batch(movies):
+        batches.append([movie.imdb_id for movie in movies])
+        return len(movies)
+
+    stats = await FileSeeder(str(path), batch_size=4, chunk_size=3).seed_database(insert_batch)
+
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert "tt0000003" not in sum(batches, [])
+    assert stats.requested == 7
+    assert stats.inserted == 6
+    assert stats.failed == 1
+    assert stats.state == "completed"
+    assert stats.progress == 1.0
+
+
+@pytest.mark.asyncio
+async def test_file_seeder_counts_each_record_once(tmp_path):
+    path = tmp_path / "movies.jsonl"
+    lines = [json.dumps(movie_payload(f"tt{i:07d}")) for i in range(1, 5)]
+    lines += [json.dumps({"imdbID": "tt0000005", "Type": "movie"}), "{not json"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    async def insert_batch(movies):
+        return len(movies) - 1  # One movie of the batch fails to store
+
+    stats = await FileSeeder(str(path), batch_size=10).seed_database(insert_batch)
+
+    assert stats.requested == 6
+    assert (stats.fetched, stats.failed) == (5, 1)
+    assert (stats.inserted, stats.rejected) == (3, 2)
+    assert stats.fetched + stats.not_found + stats.failed == stats.requested
+    assert stats.progress == 1.0
+
+
+@pytest.mark.asyncio
+async def test_file_seeder_reads_gzipped_csv(tmp_path):
+    path = tmp_path / "movies.csv.gz"
+    fields = ["Title", "Year", "imdbID", "Type", "Poster", "Genre", "Director", "Plot"]
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as dump:
+        writer = csv.DictWriter(dump, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for i in range(1, 4):
+            writer.writerow(movie_payload(f"tt{i:07d}"))
+    stored = []
+
+    async def insert_batch(movies):
+        stored.extend(movies)
+        return len(movies)
+
+    stats = await FileSeeder(str(path)).seed_database(insert_batch)
+
+    assert stats.requested == 3
+    assert [movie.imdb_id for movie in stored] == ["tt0000001", "tt0000002", "tt0000003"]
+    assert stored[0].year == 2001
+    assert stored[0].poster_url is None
@@ -0,0 +1,35 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from models import metadata
+from repositories.movie import MovieRepository
+from utils.cache_backend import MemoryCacheBackend
+from utils.query_log import QueryLog
+
+
+@pytest_asyncio.fixture
+async def sqlite_engine(tmp_path):
+    """Async engine on a fresh SQLite database file with all tables created, `query_budget` aware."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'movies.db'}")
+    QueryLog().install(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def sqlite_session(sqlite_engine):
+    """AsyncSession bound to the SQLite test database."""
+    session = async_sessionmaker(sqlite_engine, expire_on_commit=False)()
+    yield session
+    await session.close()
+
+
+@pytest.fixture(autouse=True)
+def movie_cache(monkeypatch):
+    """Fresh process-wide movie cache for every test."""
+    cache = MemoryCacheBackend(maxsize=100)
+    monkeypatch.setattr(MovieRepository, "movie_cache", cache)
+    return cache
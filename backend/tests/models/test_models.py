@@ -0,0 +1,25 @@
+import pytest
+from sqlalchemy import text
+
+from models import index_names, metadata, sync_indexes
+
+
+@pytest.mark.asyncio
+async def test_sync_indexes_upgrades_an_existing_table(sqlite_engine):
+    async with sqlite_engine.begin() as conn:
+        # Table of an older release: single title index, no (title, id) one
+        await conn.execute(text("DROP INDEX ix_movies_title_id"))
+        await conn.execute(text("DROP INDEX ix_movies_title_lower"))
+        await conn.execute(text("CREATE INDEX ix_movies_title ON movies (title)"))
+        await conn.run_sync(metadata.create_all)
+        assert await conn.run_sync(index_names, "movies") == {"ix_movies_imdb_id", "ix_movies_title"}
+
+        await conn.run_sync(sync_indexes)
+        indexes = await conn.run_sync(index_names, "movies")
+
+        assert "ix_movies_title" not in indexes
+        assert {"ix_movies_title_id", "ix_movies_title_lower"} <= indexes
+
+        # Up to date tables are left alone
+        await conn.run_sync(sync_indexes)
+        assert await conn.run_sync(index_names, "movies") == indexes
@@ -0,0 +1,45 @@
+import pytest
+
+from repositories.movie import MovieRepository
+from schemas.movies import MovieCreate, BulkItemStatus
+
+
+def make_movie(imdb_id: str, title: str) -> MovieCreate:
+    return MovieCreate(title=title, imdb_id=imdb_id, type="movie", poster_url=None)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_creates_and_updates(sqlite_session):
+    repository = MovieRepository(sqlite_session)
+    await repository.create(make_movie("tt0000001", "Old Title"))
+
+    results = await repository.bulk_upsert(
+        [
+            make_movie("tt0000001", "New Title"),
+            make_movie("tt0000002", "Second"),
+            make_movie("tt0000003", "Third"),
+            make_movie("tt0000002", "Second, again"),
+        ],
+        batch_size=2,
+    )
+
+    assert results == [
+        ("tt0000001", BulkItemStatus.updated, None),
+        ("tt0000002", BulkItemStatus.created, None),
+        ("tt0000003", BulkItemStatus.created, None),
+        ("tt0000002", BulkItemStatus.updated, None),
+    ]
+    assert await repository.count_movies() == 3
+    titles = {movie.imdb_id: movie.title for movie in await repository.get_all(limit=10)}
+    assert titles == {"tt0000001": "New Title", "tt0000002": "Second, again", "tt0000003": "Third"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_invalidates_count_cache(sqlite_session):
+    repository = MovieRepository(sqlite_session)
+    MovieRepository.count_cache.clear()
+    assert await repository.count_movies_cached() == 0
+
+    await repository.bulk_upsert([make_movie("tt0000001", "First")])
+
+    assert await repository.count_movies_cached() == 1
@@ -1,18 +1,32 @@
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.movies import Movie
 from repositories.movie import MovieRepository
 from schemas.movies import MovieUpdate
 
 
+@pytest.fixture(autouse=True)
+def clear_count_cache():
+    """Start every test with an empty process-wide count cache."""
+    MovieRepository.count_cache.clear()
+
+
 @pytest.fixture
 def mock_db_session():
     """Fixture for mocking the database session."""
-    return MagicMock(spec=Session)
+    return AsyncMock(spec=AsyncSession)
+
+
+@pytest.fixture
+def mock_result(mock_db_session):
+    """Fixture for the result returned by the mocked session's execute."""
+    result = MagicMock()
+    mock_db_session.execute.return_value = result
+    return result
 
 
 @pytest.fixture
@@ -37,35 +51,33 @@ def mock_movie():
     )
 
 
-def test_update_movie_success(movie_repository, mock_db_session, mock_movie):
-    # query().filter_by().first() returns the mock_movie instance
-    mock_db_session.query.return_value.filter.return_value.first.return_value = mock_movie
+@pytest.mark.asyncio
+async def test_update_movie_success(movie_repository, mock_db_session, mock_result, mock_movie):
+    # execute().scalars().first() returns the mock_movie instance
+    mock_result.scalars.return_value.first.return_value = mock_movie
 
     # Prepare update data
     movie_data = MovieUpdate(title="Updated Title")
 
-    # Mock commit and refresh
-    mock_db_session.commit = MagicMock()
-    mock_db_session.refresh = MagicMock()
-
     # Perform the update
-    updated_movie = movie_repository.update(movie_id=1, movie_data=movie_data)
+    updated_movie = await movie_repository.update(movie_id=1, movie_data=movie_data)
 
     # Assertions
     assert updated_movie.title == "Updated Title"
-    mock_db_session.commit.assert_called_once()
-    mock_db_session.refresh.assert_called_once_with(mock_movie)
+    mock_db_session.commit.assert_awaited_once()
+    mock_db_session.refresh.assert_awaited_once_with(mock_movie)
 
 
-def test_update_movie_not_found(movie_repository, mock_db_session):
-    mock_db_session.query.return_value.filter.return_value.first.return_value = None
+@pytest.mark.asyncio
+async def test_update_movie_not_found(movie_repository, mock_result):
+    mock_result.scalars.return_value.first.return_value = None
 
     # Prepare update data
     movie_data = MovieUpdate(title="Updated Title")
 
     # Expect HTTPException when movie is not found
     with pytest.raises(HTTPException) as exc_info:
-        movie_repository.update(movie_id=1, movie_data=movie_data)
+        await movie_repository.update(movie_id=1, movie_data=movie_data)
 
     # Assertions
     assert exc_info.value.status_code == 404
@@ -73,24 +85,48 @@ def test_update_movie_not_found(movie_repository, mock_db_session):
 
 
 # Test: Search movies by name
-def test_search_by_name(movie_repository, mock_db_session, mock_movie):
-    mock_db_session.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
-        mock_movie
-    ]
+@pytest.mark.asyncio
+async def test_search_by_name(movie_repository, mock_db_session, mock_result):
+    mock_result.keys.return_value = ["id", "title"]
+    mock_result.__iter__.return_value = iter([(1, "Test Movie")])
+
+    results = await movie_repository.search_by_name(title="Test")
 
-    results = movie_repository.search_by_name(title="Test")
+    assert results == [{"id": 1, "title": "Test Movie"}]
+    mock_db_session.execute.assert_awaited_once()
 
-    assert len(results) == 1
-    assert results[0].title == "Test Movie"
-    mock_db_session.query.assert_called_once_with(Movie)
+
+# Test: Delete movie
+@pytest.mark.asyncio
+async def test_delete_by_id(movie_repository, mock_db_session, mock_result, mock_movie):
+    mock_result.scalars.return_value.first.return_value = mock_movie
+
+    assert await movie_repository.delete_by_id(1) is True
+    mock_db_session.delete.assert_awaited_once_with(mock_movie)
+    mock_db_session.commit.assert_awaited_once()
 
 
 # Test: Count movies
-def test_count_movies(movie_repository, mock_db_session):
-    mock_db_session.query.return_value.scalar.return_value = 5
+@pytest.mark.asyncio
+async def test_count_movies(movie_repository, mock_db_session):
+    mock_db_session.scalar.return_value = 5
 
-    count = movie_repository.count_movies()
+    count = await movie_repository.count_movies()
 
     assert count == 5
-    mock_db_session.query.assert_called_once()
-    mock_db_session.query.return_value.scalar.assert_called_once()
+    mock_db_session.scalar.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_count_movies_cached(movie_repository, mock_db_session, mock_result, mock_movie):
+    mock_db_session.scalar.return_value = 5
+
+    assert await movie_repository.count_movies_cached() == 5
+    assert await movie_repository.count_movies_cached() == 5
+    mock_db_session.scalar.assert_awaited_once()
+
+    # A committed write drops the cached count
+    mock_result.scalars.return_value.first.return_value = mock_movie
+    await movie_repository.delete_by_id(1)
+    mock_db_session.scalar.return_value = 4
+    assert await movie_repository.count_movies_cached() == 4
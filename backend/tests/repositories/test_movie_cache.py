@@ -0,0 +1,83 @@
+import pytest
+
+from repositories.movie import MovieRepository, movie_cache_key
+from schemas.movies import MovieCreate, MovieUpdate
+
+
+def movie(imdb_id: str, title: str) -> MovieCreate:
+    return MovieCreate(title=title, imdb_id=imdb_id, type="movie", poster_url=None)
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_cached_reads_through(sqlite_session, movie_cache):
+    repository = MovieRepository(sqlite_session)
+    stored = await repository.create(movie("tt0000001", "Alien"))
+
+    first = await repository.get_by_id_cached(stored.id)
+    second = await repository.get_by_id_cached(stored.id)
+
+    assert first.title == second.title == "Alien"
+    assert second.updated_at == stored.updated_at
+    assert movie_cache.stats()["hits"] == 1
+    assert movie_cache.stats()["misses"] == 1
+    assert await repository.get_by_id_cached(999) is None
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cached_movie(sqlite_session, movie_cache):
+    repository = MovieRepository(sqlite_session)
+    stored = await repository.create(movie("tt0000001", "Alien"))
+    await repository.get_by_id_cached(stored.id)
+
+    await repository.update(stored.id, MovieUpdate(title="Aliens"))
+    assert await movie_cache.get(movie_cache_key(stored.id)) is None
+    assert (await repository.get_by_id_cached(stored.id)).title == "Aliens"
+
+    await repository.bulk_upsert([movie("tt0000001", "Alien 3"), movie("tt0000002", "Prometheus")])
+    assert (await repository.get_by_id_cached(stored.id)).title == "Alien 3"
+
+    await repository.delete_by_id(stored.id)
+    assert await repository.get_by_id_cached(stored.id) is None
+
+
+@pytest.mark.asyncio
+async def test_read_racing_a_write_is_not_cached(sqlite_session, movie_cache, monkeypatch):
+    repository = MovieRepository(sqlite_session)
+    stored = await repository.create(movie("tt0000001", "Alien"))
+    scalar = sqlite_session.scalar
+
+    async def read_then_write(statement):
+        # The row is read, then a write lands and invalidates it before the read fills the cache
+        row = await scalar(statement)
+        await movie_cache.delete(movie_cache_key(stored.id))
+        return row
+
+    monkeypatch.setattr(sqlite_session, "scalar", read_then_write)
+    assert (await repository.get_by_id_cached(stored.id)).title == "Alien"
+    assert await movie_cache.get(movie_cache_key(stored.id)) is None
+
+    monkeypatch.setattr(sqlite_session, "scalar", scalar)
+    await repository.get_by_id_cached(stored.id)
+    assert await movie_cache.get(movie_cache_key(stored.id)) is not None
+
+
+@pytest.mark.asyncio
+async def test_count_racing_a_write_is_not_cached(sqlite_session, monkeypatch):
+    repository = MovieRepository(sqlite_session)
+    MovieRepository.count_cache.clear()
+    await repository.create(movie("tt0000001", "Alien"))
+    scalar = sqlite_session.scalar
+
+    async def count_then_write(statement):
+        # The count is read, then a write lands and invalidates it before the read fills the cache
+        count = await scalar(statement)
+        await MovieRepository(sqlite_session).after_write()
+        return count
+
+    monkeypatch.setattr(sqlite_session, "scalar", count_then_write)
+    assert await repository.count_movies_cached() == 1
+    assert MovieRepository.count_cache.get("movies") is None
+
+    monkeypatch.setattr(sqlite_session, "scalar", scalar)
+    assert await repository.count_movies_cached() == 1
+    assert MovieRepository.count_cache.get("movies") == 1
@@ -0,0 +1,53 @@
+import pytest
+import pytest_asyncio
+
+from repositories.movie import MovieRepository
+from schemas.movies import MovieCreate, MovieOut
+
+TITLES = ["Heat", "Alien", "Brazil", "Alien"]
+
+
+@pytest_asyncio.fixture
+async def movie_repository(sqlite_session):
+    """MovieRepository on a real SQLite database holding a few movies."""
+    repository = MovieRepository(sqlite_session)
+    await repository.bulk_upsert([
+        MovieCreate(title=title, imdb_id=f"tt{2000000 + i}", type="movie", poster_url=None, plot="Plot")
+        for i, title in enumerate(TITLES)
+    ])
+    sqlite_session.expunge_all()
+    return repository
+
+
+@pytest.mark.asyncio
+async def test_list_returns_plain_dicts_without_orm_objects(movie_repository, sqlite_session):
+    movies = await movie_repository.get_all_ordered_by_title(0, 10)
+
+    assert [(movie["title"], movie["id"]) for movie in movies] == [
+        ("Alien", 2), ("Alien", 4), ("Brazil", 3), ("Heat", 1),
+    ]
+    assert all(set(movie) == set(MovieOut.model_fields) for movie in movies)
+    assert len(sqlite_session.identity_map) == 0
+
+
+@pytest.mark.asyncio
+async def test_keyset_page_follows_title_and_id(movie_repository):
+    movies = await movie_repository.get_all_after("Alien", 2, limit=2)
+
+    assert [(movie["title"], movie["id"]) for movie in movies] == [("Alien", 4), ("Brazil", 3)]
+
+
+@pytest.mark.asyncio
+async def test_rows_validate_as_movie_out(movie_repository):
+    movies = await movie_repository.search_by_name("bra")
+
+    assert MovieOut.model_validate(movies[0]).imdb_id == "tt2000002"
+
+
+@pytest.mark.asyncio
+async def test_sparse_fieldset_selects_only_its_columns(movie_repository):
+    movies = await movie_repository.get_all_after("Alien", 4, limit=1, fields=("title", "year"))
+    assert movies == [{"title": "Brazil", "year": None}]
+
+    movies = await movie_repository.search_by_name("alien", fields=("id",))
+    assert sorted(movie["id"] for movie in movies) == [2, 4]
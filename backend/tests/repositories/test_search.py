@@ -0,0 +1,97 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from models import metadata
+from models.movies import Movie
+from repositories.movie import MovieRepository
+from repositories.search import get_search_backend, search_tokens
+from schemas.movies import MovieCreate, MovieUpdate
+
+TITLES = ["The Matrix", "The Matrix Reloaded", "Matilda", "Alien", "Aliens", "Amélie"]
+
+
+@pytest_asyncio.fixture
+async def movie_repository(sqlite_engine, sqlite_session):
+    """MovieRepository on a real SQLite database with the FTS5 index."""
+    repository = MovieRepository(sqlite_session)
+    # Rows inserted before the index exists are picked up by the initial rebuild
+    await repository.create(_movie(0))
+    async with sqlite_engine.begin() as conn:
+        await get_search_backend("sqlite").ensure_index(conn)
+    for i in range(1, len(TITLES)):
+        await repository.create(_movie(i))
+    return repository
+
+
+def _movie(i: int) -> MovieCreate:
+    return MovieCreate(title=TITLES[i], imdb_id=f"tt{1000000 + i}", type="movie", poster_url=None)
+
+
+def test_search_tokens_drop_query_syntax():
+    assert search_tokens('matrix" OR *') == ["matrix", "or"]
+
+
+def test_mysql_search_only_requires_indexed_words():
+    backend = get_search_backend("mysql")
+    tokens = backend.indexed_tokens(search_tokens("The Toy Story 2"))
+    assert tokens == ["toy", "story"]
+
+    query = backend.search_query(tokens, [Movie.__table__.c.id])
+    compiled = str(query.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "AGAINST ('+toy* +story*' IN BOOLEAN MODE)" in compiled
+
+    # Nothing left to match: the repository searches with ILIKE instead
+    assert backend.indexed_tokens(search_tokens("Up")) == []
+
+
+@pytest.mark.asyncio
+async def test_full_text_prefix_search(movie_repository):
+    titles = [movie["title"] for movie in await movie_repository.search_by_name("the mat")]
+    assert sorted(titles) == ["The Matrix", "The Matrix Reloaded"]
+
+    titles = [movie["title"] for movie in await movie_repository.search_by_name("ali")]
+    assert sorted(titles) == ["Alien", "Aliens"]
+
+    # Diacritics are folded
+    assert [movie["title"] for movie in await movie_repository.search_by_name("amelie")] == ["Amélie"]
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_paging(movie_repository):
+    first = await movie_repository.search_by_name("mat", limit=2)
+    second = await movie_repository.search_by_name("mat", limit=2, offset=2)
+    assert len(first) == 2
+    assert len(second) == 1
+    assert {m["id"] for m in first}.isdisjoint({m["id"] for m in second})
+
+
+@pytest.mark.asyncio
+async def test_index_follows_updates_and_deletes(movie_repository):
+    alien = (await movie_repository.search_by_name("alien", limit=1))[0]
+    await movie_repository.update(alien["id"], MovieUpdate(title="Prometheus"))
+    assert [m["title"] for m in await movie_repository.search_by_name("prom")] == ["Prometheus"]
+
+    await movie_repository.delete_by_id(alien["id"])
+    assert await movie_repository.search_by_name("prom") == []
+
+
+@pytest.mark.asyncio
+async def test_search_without_words_falls_back_to_ilike(movie_repository):
+    assert await movie_repository.search_by_name("!!!") == []
+
+
+@pytest.mark.asyncio
+async def test_engines_without_the_index_fall_back_to_ilike(movie_repository, tmp_path):
+    other_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'other.db'}")
+    async with other_engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+    try:
+        async with async_sessionmaker(other_engine, expire_on_commit=False)() as session:
+            repository = MovieRepository(session)
+            await repository.create(_movie(1))
+            # The index exists on the fixture's engine only, this one has no movies_fts table
+            assert [m["title"] for m in await repository.search_by_name("Matrix")] == ["The Matrix Reloaded"]
+    finally:
+        await other_engine.dispose()
@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from config.database import SeedStats
+from dependencies.omdb import get_omdb_client
+from dependencies.seeding import get_seed_stats
+from dependencies.suggest import get_suggest_index
+from main import app
+from utils.omdb_api import OMDBClient
+from utils.suggest import SuggestIndex
+
+ADMIN_HEADERS = {"Authorization": "Bearer token123"}
+USER_HEADERS = {"Authorization": "Bearer token456"}
+
+
+@pytest.fixture
+def test_client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def seed_stats():
+    stats = SeedStats(state="running", requested=100, fetched=40, not_found=5, failed=5, inserted=40)
+    stats.record_error("tt0000001: throttled")
+    app.dependency_overrides[get_seed_stats] = lambda: stats
+    yield stats
+    app.dependency_overrides.clear()
+
+
+def test_seed_status(test_client, seed_stats):
+    response = test_client.get("/api/admin/seed-status", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["state"] == "running"
+    assert body["progress"] == 0.5
+    assert body["inserted"] == 40
+    assert body["errors"] == ["tt0000001: throttled"]
+
+
+def test_seed_status_requires_admin(test_client, seed_stats):
+    assert test_client.get("/api/admin/seed-status").status_code == 401
+    assert test_client.get("/api/admin/seed-status", headers=USER_HEADERS).status_code == 403
+
+
+def test_omdb_limiter_status(test_client):
+    client = OMDBClient("test_api_key", rate_limit=5)
+    app.dependency_overrides[get_omdb_client] = lambda: client
+    try:
+        response = test_client.get("/api/admin/omdb-limiter", headers=ADMIN_HEADERS)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["rate_limit"] == 5
+    assert body["in_flight"] == 0
+    assert body["waiting"] == 0
+
+
+@pytest.mark.asyncio
+async def test_movie_cache_status(test_client, movie_cache):
+    await movie_cache.set("movie:1", {"id": 1}, ttl=60)
+    await movie_cache.get("movie:1")
+
+    response = test_client.get("/api/admin/movie-cache", headers=ADMIN_HEADERS)
+
+    assert response.status_code == 200
+    assert response.json() == {"backend": "MemoryCacheBackend", "hits": 1, "misses": 0, "hit_ratio": 1.0, "size": 1}
+
+
+def test_suggest_index_status(test_client):
+    index = SuggestIndex.build([(1, "Heat", 1995, "Michael Mann")])
+    index.start_recording()
+    app.dependency_overrides[get_suggest_index] = lambda: index
+    try:
+        response = test_client.get("/api/admin/suggest-index", headers=ADMIN_HEADERS)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {"ready": False, "movies": 1}
@@ -1,12 +1,19 @@
-from unittest.mock import MagicMock, Mock
+import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, Mock
 
+import fastapi.routing
+import orjson
 import pytest
 from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.testclient import TestClient
 
 from dependencies.movie_service import get_movie_service
 from main import app
-from schemas.movies import MovieUpdate
+from routers import movies as movies_router
+from schemas.movies import ExistingMovie, ExportFormat, MovieUpdate, TotalCount, MOVIE_FIELDS, MOVIE_SUMMARY_FIELDS
+from utils.suggest import Suggestion
 
 
 @pytest.fixture
@@ -18,7 +25,7 @@ def test_client():
 def mock_movie_service():
     # Mock the MovieService methods
     mock_service = MagicMock()
-    mock_service.create_movie_from_title = Mock(
+    mock_service.create_movie_from_title = AsyncMock(
         return_value={
             "id": 1,
             "title": "Inception",
@@ -31,7 +38,7 @@ def mock_movie_service():
             "plot": "Plot"
         }
     )
-    mock_service.create_movie = Mock(
+    mock_service.create_movie = AsyncMock(
         return_value={
             "id": 2,
             "title": "Another Mock Movie",
@@ -44,11 +51,17 @@ def mock_movie_service():
             "plot": "Plot"
         }
     )
-    mock_service.update_movie = Mock(return_value={"id": 1, "title": "Updated Movie"})
-    mock_service.search_movies_by_name = Mock(return_value=[])
-    mock_service.get_movie_by_id = Mock(return_value=None)
-    mock_service.get_movies_with_pagination = Mock(return_value=([], 0))
-    mock_service.delete_movie_by_id = Mock(return_value=True)
+    mock_service.update_movie = AsyncMock(return_value={"id": 1, "title": "Updated Movie"})
+    mock_service.search_movies_by_name = AsyncMock(return_value=[])
+    mock_service.get_movie_by_id = AsyncMock(return_value=None)
+    mock_service.get_movies_with_pagination = AsyncMock(return_value=([], 0, None))
+    mock_service.get_movies_after_cursor = AsyncMock(return_value=([], 0, None))
+    mock_service.delete_movie_by_id = AsyncMock(return_value=True)
+    mock_service.suggest_movies = Mock(return_value=[])
+    mock_service.bulk_upsert_movies = AsyncMock(
+        return_value={"created": 1, "updated": 0, "failed": 0,
+                      "results": [{"imdb_id": "tt1234567", "status": "created", "detail": None}]}
+    )
     return mock_service
 
 
@@ -73,7 +86,7 @@ async def test_create_movie_with_title(test_client, mock_movie_service):
         "plot": "Plot"
     }
 
-    mock_movie_service.create_movie_from_title.assert_called_once_with("Inception")
+    mock_movie_service.create_movie_from_title.assert_called_once_with("Inception", ExistingMovie.return_existing)
 
 
 async def test_create_movie_with_data(test_client, mock_movie_service):
@@ -95,6 +108,34 @@ async def test_create_movie_with_data(test_client, mock_movie_service):
     mock_movie_service.create_movie.assert_called_once_with(movie_data)
 
 
+@pytest.mark.asyncio
+async def test_bulk_upsert_movies(test_client, mock_movie_service):
+    movies = [{"title": "Inception", "imdb_id": "tt1234567", "type": "movie", "poster_url": None}]
+    response = test_client.post("/api/movies/bulk", json=movies, headers={"Authorization": "Bearer token123"})
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert response.json()["results"] == [{"imdb_id": "tt1234567", "status": "created", "detail": None}]
+    mock_movie_service.bulk_upsert_movies.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_movies_empty(test_client, mock_movie_service):
+    response = test_client.post("/api/movies/bulk", json=[], headers={"Authorization": "Bearer token123"})
+    assert response.status_code == 400
+    mock_movie_service.bulk_upsert_movies.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_movies_requires_admin(test_client, mock_movie_service):
+    movies = [{"title": "Inception", "imdb_id": "tt1234567", "type": "movie", "poster_url": None}]
+    response = test_client.post("/api/movies/bulk", json=movies)
+    assert response.status_code == 401
+
+    response = test_client.post("/api/movies/bulk", json=movies, headers={"Authorization": "Bearer token456"})
+    assert response.status_code == 403
+    mock_movie_service.bulk_upsert_movies.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_update_movie_success(test_client, mock_movie_service):
     # Create a MovieUpdate instance
@@ -179,16 +220,25 @@ async def test_search_movies_success(test_client, mock_movie_service):
         {
             "id": 1,
             "title": "Mock Movie",
-            "imdb_id": "tt1234567",
-            "type": "movie",
-            "poster_url": "http://example.com/poster.jpg",
             "year": None,
-            "genre": None,
-            "director": None,
-            "plot": None
+            "poster_url": "http://example.com/poster.jpg",
         }
     ]
-    mock_movie_service.search_movies_by_name.assert_called_once_with("Mock")
+    mock_movie_service.search_movies_by_name.assert_called_once_with("Mock", 20, 0, MOVIE_SUMMARY_FIELDS)
+
+
+@pytest.mark.asyncio
+async def test_search_movies_paging(test_client, mock_movie_service):
+    test_client.get("/api/movies/search", params={"title": "Mock", "page": 3, "limit": 5})
+    mock_movie_service.search_movies_by_name.assert_called_once_with("Mock", 5, 10, MOVIE_SUMMARY_FIELDS)
+
+
+@pytest.mark.asyncio
+async def test_search_movies_fields(test_client, mock_movie_service):
+    mock_movie_service.search_movies_by_name.return_value = [{"title": "Mock Movie", "director": "Someone"}]
+    response = test_client.get("/api/movies/search", params={"title": "Mock", "fields": "director, title"})
+    assert response.json() == [{"title": "Mock Movie", "director": "Someone"}]
+    mock_movie_service.search_movies_by_name.assert_called_once_with("Mock", 20, 0, ("title", "director"))
 
 
 @pytest.mark.asyncio
@@ -206,6 +256,87 @@ async def test_search_movies_not_found(test_client, mock_movie_service):
     assert response.json() == {"detail": "Movies not found"}
 
 
+@pytest.mark.asyncio
+async def test_suggest_movies(test_client, mock_movie_service):
+    mock_movie_service.suggest_movies.return_value = [Suggestion(1, "Inception", 2010, "Christopher Nolan")]
+    response = test_client.get("/api/movies/suggest", params={"q": "inc", "limit": 5})
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "title": "Inception", "year": 2010}]
+    mock_movie_service.suggest_movies.assert_called_once_with("inc", 5)
+
+
+@pytest.mark.asyncio
+async def test_import_movies_reads_body_line_by_line(test_client, mock_movie_service):
+    received = []
+
+    async def import_movies(lines):
+        received.extend([line async for line in lines])
+        return {"lines": len(received), "created": 2, "updated": 0, "failed": 0, "errors": []}
+
+    mock_movie_service.import_movies = import_movies
+    response = test_client.post(
+        "/api/movies/import",
+        content=b'{"title": "A"}\n{"title": "B"}\n',
+        headers={"Content-Type": "application/x-ndjson", "Authorization": "Bearer token123"},
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "lines": 2, "created": 2, "updated": 0, "failed": 0, "errors": [], "errors_truncated": False,
+    }
+    assert received == [b'{"title": "A"}', b'{"title": "B"}']
+
+
+@pytest.mark.asyncio
+async def test_import_movies_requires_admin(test_client, mock_movie_service):
+    mock_movie_service.import_movies = AsyncMock()
+    response = test_client.post("/api/movies/import", content=b'{"title": "A"}\n')
+    assert response.status_code == 401
+
+    response = test_client.post(
+        "/api/movies/import", content=b'{"title": "A"}\n', headers={"Authorization": "Bearer token456"}
+    )
+    assert response.status_code == 403
+    mock_movie_service.import_movies.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_import_movies_rejects_oversized_uploads(test_client, mock_movie_service, monkeypatch):
+    monkeypatch.setattr(movies_router, "IMPORT_MAX_BYTES", 20)
+    received = []
+
+    async def import_movies(lines):
+        async for line in lines:
+            received.append(line)
+
+    mock_movie_service.import_movies = import_movies
+    headers = {"Authorization": "Bearer token123"}
+    response = test_client.post("/api/movies/import", content=b'{"title": "A"}\n' * 3, headers=headers)
+    assert response.status_code == 413
+    assert received == []
+
+    # Chunked uploads carry no Content-Length and are cut off while streaming
+    response = test_client.post("/api/movies/import", content=iter([b'{"title": "A"}\n'] * 3), headers=headers)
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_export_movies(test_client, monkeypatch):
+    exports = []
+
+    async def fake_export(session_factory, export_format, fields, **kwargs):
+        exports.append((export_format, fields))
+        yield b"id,title\r\n"
+        yield b"1,Inception\r\n"
+
+    monkeypatch.setattr("routers.movies.export_movies", fake_export)
+    response = test_client.get("/api/movies/export", params={"format": "csv", "fields": "id,title"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="movies.csv"'
+    assert response.text == "id,title\r\n1,Inception\r\n"
+    assert exports == [(ExportFormat.csv, ("title", "id"))]
+
+
 @pytest.mark.asyncio
 async def test_get_movie_by_id_success(test_client, mock_movie_service):
     mock_movie_service.get_movie_by_id.return_value = {
@@ -235,6 +366,42 @@ async def test_get_movie_by_id_success(test_client, mock_movie_service):
     mock_movie_service.get_movie_by_id.assert_called_once_with(1)
 
 
+@pytest.mark.asyncio
+async def test_get_movie_by_id_fields(test_client, mock_movie_service):
+    mock_movie_service.get_movie_by_id.return_value = SimpleNamespace(
+        id=1, title="Mock Movie", imdb_id="tt1234567", type="movie", poster_url=None, year=1999,
+        genre=None, director=None, plot="Plot", updated_at=datetime.datetime(2024, 5, 1),
+    )
+    response = test_client.get("/api/movies/1", params={"fields": "year,title"})
+    assert response.status_code == 200
+    assert response.json() == {"title": "Mock Movie", "year": 1999}
+    assert response.headers["etag"] != test_client.get("/api/movies/1").headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_get_movie_by_id_conditional(test_client, mock_movie_service):
+    mock_movie_service.get_movie_by_id.return_value = SimpleNamespace(
+        id=1, title="Mock Movie", imdb_id="tt1234567", type="movie", poster_url=None, year=None,
+        genre=None, director=None, plot=None, updated_at=datetime.datetime(2024, 5, 1, 12, 0, 0, 500),
+    )
+    response = test_client.get("/api/movies/1")
+    assert response.status_code == 200
+    assert response.headers["last-modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+
+    not_modified = test_client.get("/api/movies/1", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    assert test_client.get("/api/movies/1", headers={"If-None-Match": '"stale"'}).status_code == 200
+    since = test_client.get("/api/movies/1", headers={"If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"})
+    assert since.status_code == 304
+    older = test_client.get("/api/movies/1", headers={"If-Modified-Since": "Wed, 01 May 2024 11:59:59 GMT"})
+    assert older.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_get_movie_by_id_not_found(test_client, mock_movie_service):
     mock_movie_service.get_movie_by_id.return_value = None
@@ -257,7 +424,7 @@ async def test_get_movies_success(test_client, mock_movie_service):
           "director": None,
           "plot": None
       }
-  ], 1)
+  ], 1, None)
     response = test_client.get("/api/movies", params={"page": 1, "limit": 10})
     assert response.status_code == 200
     assert response.json() == {
@@ -265,18 +432,73 @@ async def test_get_movies_success(test_client, mock_movie_service):
             {
                 "id": 1,
                 "title": "Mock Movie",
-                "imdb_id": "tt1234567",
-                "type": "movie",
-                "poster_url": "http://example.com/poster.jpg",
                 "year": None,
-                "genre": None,
-                "director": None,
-                "plot": None
+                "poster_url": "http://example.com/poster.jpg",
             }
         ],
-        "total_pages": 1
+        "total_pages": 1,
+        "next_cursor": None
     }
-    mock_movie_service.get_movies_with_pagination.assert_called_once_with(0, 10)
+    mock_movie_service.get_movies_with_pagination.assert_called_once_with(
+        0, 10, TotalCount.estimated, MOVIE_SUMMARY_FIELDS
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_movies_fields(test_client, mock_movie_service):
+    mock_movie_service.get_movies_with_pagination.return_value = ([
+        {"id": 1, "title": "Mock Movie", "imdb_id": "tt1234567", "type": "movie", "poster_url": None, "year": None,
+         "genre": None, "director": None, "plot": "Plot"},
+    ], 1, None)
+    response = test_client.get("/api/movies", params={"fields": "plot,id"})
+    assert response.status_code == 200
+    assert response.json()["movies"] == [{"id": 1, "plot": "Plot"}]
+    mock_movie_service.get_movies_with_pagination.assert_called_once_with(0, 10, TotalCount.estimated, ("plot", "id"))
+
+    full = test_client.get("/api/movies", params={"fields": ",".join(MOVIE_FIELDS)})
+    assert set(full.json()["movies"][0]) == set(MOVIE_FIELDS)
+
+
+@pytest.mark.asyncio
+async def test_get_movies_unknown_field(test_client, mock_movie_service):
+    response = test_client.get("/api/movies", params={"fields": "title,budget,cast"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Unknown fields: budget, cast"}
+    mock_movie_service.get_movies_with_pagination.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_movies_with_cursor(test_client, mock_movie_service):
+    mock_movie_service.get_movies_after_cursor.return_value = ([], 25, "next-cursor")
+    response = test_client.get("/api/movies", params={"cursor": "some-cursor", "limit": 10})
+    assert response.status_code == 200
+    assert response.json() == {"movies": [], "total_pages": 3, "next_cursor": "next-cursor"}
+    mock_movie_service.get_movies_after_cursor.assert_called_once_with(
+        "some-cursor", 10, TotalCount.estimated, MOVIE_SUMMARY_FIELDS
+    )
+    mock_movie_service.get_movies_with_pagination.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_get_movies_etag_follows_page_content(test_client, mock_movie_service):
+    mock_movie_service.get_movies_with_pagination.return_value = ([], 0, None)
+    etag = test_client.get("/api/movies").headers["etag"]
+    assert test_client.get("/api/movies", headers={"If-None-Match": etag}).status_code == 304
+
+    mock_movie_service.get_movies_with_pagination.return_value = ([], 0, "next-cursor")
+    response = test_client.get("/api/movies", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.headers["cache-control"] == "no-cache"
+
+
+@pytest.mark.asyncio
+async def test_get_movies_without_total(test_client, mock_movie_service):
+    mock_movie_service.get_movies_with_pagination.return_value = ([], None, None)
+    response = test_client.get("/api/movies", params={"total": "none"})
+    assert response.status_code == 200
+    assert response.json()["total_pages"] is None
+    mock_movie_service.get_movies_with_pagination.assert_called_once_with(0, 10, TotalCount.none, MOVIE_SUMMARY_FIELDS)
 
 
 @pytest.mark.asyncio
@@ -315,3 +537,101 @@ async def test_delete_movie_unauthorized(test_client):
     response = test_client.delete("/api/movies/1", headers=headers)
     assert response.status_code == 401
     assert response.json() == {"detail": "Unauthorized"}
+
+
+@pytest.fixture
+def validations(monkeypatch):
+    """Count movie validations by the router's adapters and by FastAPI's response_model pass."""
+    calls = {"adapter": 0, "response_model": 0}
+    movie_adapters = movies_router.movie_adapters
+
+    class CountingAdapter:
+        def __init__(self, adapter):
+            self.adapter = adapter
+
+        def validate_python(self, *args, **kwargs):
+            calls["adapter"] += 1
+            return self.adapter.validate_python(*args, **kwargs)
+
+        def dump_python(self, *args, **kwargs):
+            return self.adapter.dump_python(*args, **kwargs)
+
+    serialize_response = fastapi.routing.serialize_response
+
+    async def counting_serialize_response(*, field=None, **kwargs):
+        if field is not None:
+            calls["response_model"] += 1
+        return await serialize_response(field=field, **kwargs)
+
+    monkeypatch.setattr(
+        movies_router, "movie_adapters", lambda fields: tuple(CountingAdapter(a) for a in movie_adapters(fields))
+    )
+    monkeypatch.setattr(fastapi.routing, "serialize_response", counting_serialize_response)
+    return calls
+
+
+def movie_row(movie_id: int, title: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=movie_id, title=title, imdb_id=f"tt{movie_id:07d}", type="movie", poster_url=None,
+        year=2001, genre=None, director=None, plot=None, updated_at=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_page_is_validated_once(test_client, mock_movie_service, validations):
+    mock_movie_service.get_movies_with_pagination.return_value = (
+        [movie_row(1, "Amélie"), movie_row(2, "Heat")], 2, None
+    )
+    response = test_client.get("/api/movies")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == orjson.dumps({
+        "movies": [
+            {"id": 1, "title": "Amélie", "year": 2001, "poster_url": None},
+            {"id": 2, "title": "Heat", "year": 2001, "poster_url": None},
+        ],
+        "total_pages": 1,
+        "next_cursor": None,
+    })
+    assert validations == {"adapter": 1, "response_model": 0}
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_validated_once(test_client, mock_movie_service, validations, monkeypatch):
+    rendered = []
+    render = ORJSONResponse.render
+    monkeypatch.setattr(ORJSONResponse, "render", lambda self, content: rendered.append(content) or render(self, content))
+    mock_movie_service.search_movies_by_name.return_value = [movie_row(1, "Heat")]
+    response = test_client.get("/api/movies/search", params={"title": "heat", "fields": "id,title"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [{"id": 1, "title": "Heat"}]
+    assert response.content == orjson.dumps(rendered[0])
+    assert validations == {"adapter": 1, "response_model": 0}
+
+
+@pytest.mark.asyncio
+async def test_detail_is_validated_once(test_client, mock_movie_service, validations):
+    mock_movie_service.get_movie_by_id = AsyncMock(return_value=movie_row(1, "Heat"))
+    response = test_client.get("/api/movies/1", params={"fields": "id,title,year"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"id": 1, "title": "Heat", "year": 2001}
+    assert validations == {"adapter": 1, "response_model": 0}
+
+
+@pytest.mark.asyncio
+async def test_other_routes_render_with_orjson(test_client, mock_movie_service, monkeypatch):
+    rendered = []
+    render = ORJSONResponse.render
+    monkeypatch.setattr(ORJSONResponse, "render", lambda self, content: rendered.append(content) or render(self, content))
+    mock_movie_service.suggest_movies.return_value = [Suggestion(1, "Heat", 1995, "Michael Mann")]
+    response = test_client.get("/api/movies/suggest", params={"q": "he"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == orjson.dumps([{"id": 1, "title": "Heat", "year": 1995}])
+    assert rendered == [[{"id": 1, "title": "Heat", "year": 1995}]]
@@ -0,0 +1,70 @@
+import csv
+import io
+
+import orjson
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from repositories.movie import MovieRepository
+from schemas.movies import ExportFormat, MovieCreate, MOVIE_FIELDS
+from services.export import export_movies
+
+
+@pytest_asyncio.fixture
+async def sessions(sqlite_engine):
+    """Session factory of a SQLite database holding five movies."""
+    factory = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+    async with factory() as session:
+        await MovieRepository(session).bulk_upsert([
+            MovieCreate(title=f"Movie, {i}", imdb_id=f"tt{3000000 + i}", type="movie", poster_url=None, year=2000 + i)
+            for i in range(5)
+        ])
+    return factory
+
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_export_streams_one_chunk_per_batch(sessions):
+    chunks = await collect(export_movies(sessions, ExportFormat.ndjson, MOVIE_FIELDS, batch_size=2))
+
+    assert len(chunks) == 3
+    movies = [orjson.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [movie["id"] for movie in movies] == [1, 2, 3, 4, 5]
+    assert set(movies[0]) == set(MOVIE_FIELDS)
+
+
+@pytest.mark.asyncio
+async def test_csv_export_has_header_and_selected_fields(sessions):
+    chunks = await collect(export_movies(sessions, ExportFormat.csv, ("title", "year", "poster_url")))
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["title", "year", "poster_url"]
+    assert rows[1] == ["Movie, 0", "2000", ""]
+    assert len(rows) == 6
+
+
+@pytest.mark.asyncio
+async def test_csv_export_of_empty_catalog_is_header_only(sqlite_engine):
+    factory = async_sessionmaker(sqlite_engine)
+    chunks = await collect(export_movies(factory, ExportFormat.csv, ("id", "title")))
+
+    assert b"".join(chunks) == b"id,title\r\n"
+
+
+@pytest.mark.asyncio
+async def test_export_stops_when_client_disconnects(sessions):
+    checks = []
+
+    async def is_disconnected():
+        checks.append(True)
+        return len(checks) > 1
+
+    chunks = await collect(
+        export_movies(sessions, ExportFormat.ndjson, ("id",), batch_size=2, is_disconnected=is_disconnected)
+    )
+
+    assert chunks == [b'{"id":1}\n{"id":2}\n']
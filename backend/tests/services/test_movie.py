@@ -0,0 +1,208 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.movies import Movie
+from schemas.movies import ExistingMovie, MovieCreate, TotalCount
+from services.movie import MovieService
+from utils.query_log import query_budget
+from utils.suggest import SuggestIndex
+
+INCEPTION = {
+    "Response": "True", "Title": "Inception", "Year": "2010", "imdbID": "tt1375666", "Type": "movie",
+    "Poster": "N/A", "Genre": "Sci-Fi", "Director": "Christopher Nolan", "Plot": "Dreams.",
+}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_create_from_title_is_coalesced(sqlite_engine):
+    sessions = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+    omdb_client = AsyncMock()
+
+    async def fetch_by_title(title):
+        await asyncio.sleep(0.01)
+        return INCEPTION
+
+    omdb_client.fetch_by_title.side_effect = fetch_by_title
+
+    async def create(title):
+        async with sessions() as session:
+            return await MovieService(session, omdb_client).create_movie_from_title(title)
+
+    movies = await asyncio.gather(*(create(title) for title in ["Inception", "inception", " Inception "] * 3))
+
+    assert {movie.imdb_id for movie in movies} == {"tt1375666"}
+    assert omdb_client.fetch_by_title.await_count == 1
+    async with sessions() as session:
+        assert await session.scalar(select(func.count(Movie.id))) == 1
+
+
+@pytest.mark.asyncio
+async def test_coalesced_create_survives_the_leader_being_cancelled(sqlite_engine):
+    sessions = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+    omdb_client = AsyncMock()
+    fetched = asyncio.Event()
+
+    async def fetch_by_title(title):
+        fetched.set()
+        await asyncio.sleep(0.05)
+        return INCEPTION
+
+    omdb_client.fetch_by_title.side_effect = fetch_by_title
+
+    async def create(session):
+        return await MovieService(session, omdb_client).create_movie_from_title("Inception")
+
+    async with sessions() as leader_session, sessions() as follower_session:
+        leader = asyncio.create_task(create(leader_session))
+        await fetched.wait()
+        follower = asyncio.create_task(create(follower_session))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await leader_session.close()  # As get_db does once the request is cancelled
+        movie = await follower
+
+        assert movie.imdb_id == "tt1375666"
+        assert movie in follower_session
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_create_from_title_returns_stored_movie_without_omdb_call(sqlite_engine):
+    sessions = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+    omdb_client = AsyncMock()
+    omdb_client.fetch_by_title.return_value = INCEPTION
+
+    async with sessions() as session:
+        first = await MovieService(session, omdb_client).create_movie_from_title("Inception")
+    async with sessions() as session:
+        second = await MovieService(session, omdb_client).create_movie_from_title("Inception")
+
+    assert second.id == first.id
+    assert omdb_client.fetch_by_title.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_create_from_title_matches_loosely_through_suggest_index(sqlite_engine):
+    sessions = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+    omdb_client = AsyncMock()
+    suggest_index = SuggestIndex()
+
+    async with sessions() as session:
+        service = MovieService(session, omdb_client, suggest_index)
+        stored = await service.create_movie(MovieCreate(title="The Matrix", imdb_id="tt0133093", type="movie", poster_url=None))
+        found = await service.create_movie_from_title("matrix, the")
+        with pytest.raises(HTTPException) as exc_info:
+            await service.create_movie_from_title("The Matrix", ExistingMovie.conflict)
+
+    assert found.id == stored.id
+    assert exc_info.value.status_code == 409
+    omdb_client.fetch_by_title.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_from_title_finds_movies_missing_from_the_suggest_index(sqlite_session):
+    # Stored by another instance: the database has it, this process' index does not
+    sqlite_session.add(Movie(title="Inception", imdb_id="tt1375666", type="movie"))
+    await sqlite_session.commit()
+    omdb_client = AsyncMock()
+    service = MovieService(sqlite_session, omdb_client, SuggestIndex())
+
+    found = await service.create_movie_from_title(" INCEPTION ")
+    with pytest.raises(HTTPException) as exc_info:
+        await service.create_movie_from_title("inception", ExistingMovie.conflict)
+
+    assert found.imdb_id == "tt1375666"
+    assert exc_info.value.status_code == 409
+    omdb_client.fetch_by_title.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_create_from_title_upserts_existing_imdb_id(sqlite_engine):
+    sessions = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+    omdb_client = AsyncMock()
+    omdb_client.fetch_by_title.return_value = INCEPTION
+
+    async with sessions() as session:
+        service = MovieService(session, omdb_client, SuggestIndex())
+        await service.create_movie(MovieCreate(title="Inception (2010)", imdb_id="tt1375666", type="movie", poster_url=None))
+        # Not found locally by title, OMDB resolves it to the stored IMDb ID
+        movie = await service.create_movie_from_title("Inception")
+        count = await session.scalar(select(func.count(Movie.id)))
+
+    assert movie.title == "Inception"
+    assert movie.director == "Christopher Nolan"
+    assert count == 1
+
+
+async def upload(*lines):
+    for line in lines:
+        yield line
+
+
+@pytest.mark.asyncio
+async def test_import_movies_upserts_batches_and_reports_line_errors(sqlite_engine):
+    sessions = async_sessionmaker(sqlite_engine, expire_on_commit=False)
+    suggest_index = SuggestIndex()
+    lines = [
+        b'{"title": "Heat", "imdb_id": "tt0113277", "type": "movie", "poster_url": null, "year": 1995}',
+        orjson.dumps(INCEPTION),
+        b"",
+        b"not json",
+        b'{"title": "Bad", "imdb_id": "nope", "type": "movie", "poster_url": null}',
+        None,
+        b'{"Response": "False", "Error": "Movie not found!", "imdbID": "tt0000001"}',
+        b'{"title": "Heat 2", "imdb_id": "tt0113277", "type": "movie", "poster_url": null}',
+        b"[1, 2]",
+    ]
+
+    async with sessions() as session:
+        service = MovieService(session, AsyncMock(), suggest_index)
+        summary = await service.import_movies(upload(*lines), batch_size=2)
+
+    assert {key: summary[key] for key in ("lines", "created", "updated", "failed")} == {
+        "lines": 9, "created": 2, "updated": 1, "failed": 5,
+    }
+    assert [(error["line"], error["imdb_id"]) for error in summary["errors"]] == [
+        (4, None), (5, "nope"), (6, None), (7, "tt0000001"), (9, None),
+    ]
+    assert summary["errors"][0]["detail"] == "Invalid JSON"
+    assert summary["errors"][1]["detail"].startswith("imdb_id: String should match pattern")
+    assert summary["errors"][3]["detail"] == "Movie not found!"
+    assert not summary["errors_truncated"]
+    assert [suggestion.title for suggestion in suggest_index.suggest("heat")] == ["Heat 2"]
+    async with sessions() as session:
+        assert await session.scalar(select(func.count(Movie.id))) == 2
+
+
+@pytest.mark.asyncio
+async def test_import_movies_caps_reported_errors(sqlite_engine, monkeypatch):
+    monkeypatch.setattr("services.movie.IMPORT_MAX_ERRORS", 2)
+    async with async_sessionmaker(sqlite_engine)() as session:
+        summary = await MovieService(session, AsyncMock()).import_movies(upload(*[b"{"] * 5))
+
+    assert summary["failed"] == 5
+    assert len(summary["errors"]) == 2
+    assert summary["errors_truncated"]
+
+
+@pytest.mark.asyncio
+async def test_list_pages_run_two_queries(sqlite_session):
+    sqlite_session.add_all(
+        Movie(title=f"Movie {i}", imdb_id=f"tt{i:07d}", type="movie", poster_url=None) for i in range(5)
+    )
+    await sqlite_session.commit()
+    service = MovieService(sqlite_session, AsyncMock(), SuggestIndex())
+
+    with query_budget(2) as tracker:
+        movies, total, cursor = await service.get_movies_with_pagination(0, 2, TotalCount.exact)
+    assert (len(movies), total, tracker.count) == (2, 5, 2)
+
+    with query_budget(2) as tracker:
+        await service.get_movies_after_cursor(cursor, 2, TotalCount.exact)
+    assert tracker.count == 2
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import main
+from config.database import FileSeeder, SeedStats
+from models.movies import Movie
+from utils.suggest import SuggestIndex
+
+
+def movie_payload(imdb_id: str, title: str) -> dict:
+    return {
+        "Response": "True", "Title": title, "Year": "2001", "imdbID": imdb_id, "Type": "movie",
+        "Poster": "N/A", "Genre": "Drama", "Director": "Jane Doe", "Plot": "Plot.",
+    }
+
+
+@pytest.mark.asyncio
+async def test_file_seeding_indexes_movies_in_groups(sqlite_engine, tmp_path, monkeypatch):
+    path = tmp_path / "movies.jsonl"
+    path.write_text("\n".join(
+        json.dumps(movie_payload(f"tt{i:07d}", f"Movie {i}")) for i in range(1, 6)
+    ) + "\n", encoding="utf-8")
+    monkeypatch.setattr(main, "SessionLocal", async_sessionmaker(sqlite_engine, expire_on_commit=False))
+    monkeypatch.setattr(main.settings, "SEED_SOURCE", "file")
+    monkeypatch.setattr(main.settings, "SEED_FILE_PATH", str(path))
+    monkeypatch.setattr(main, "SEED_INDEX_BATCH_SIZE", 3)
+    monkeypatch.setattr(
+        main, "run_file_seeder",
+        lambda path, insert_batch, stats: FileSeeder(path, batch_size=2, stats=stats).seed_database(insert_batch),
+    )
+    index = SuggestIndex()
+    sizes = []
+    add_many = index.add_many
+    monkeypatch.setattr(index, "add_many", lambda rows: (add_many(rows), sizes.append(len(index))))
+    app = SimpleNamespace(state=SimpleNamespace(suggest_index=index))
+
+    await main.seed_database(app, SeedStats())
+
+    # File batches of 2 movies, indexed once 3 are pending, the rest once seeding is done
+    assert sizes == [4, 5]
+    assert index.suggest("movie 3")[0].title == "Movie 3"
+
+
+@pytest.mark.asyncio
+async def test_omdb_seeding_tops_up_a_partly_seeded_database(sqlite_session, sqlite_engine, monkeypatch):
+    sqlite_session.add(Movie(title="Heat", imdb_id="tt0113277", type="movie"))
+    await sqlite_session.commit()
+    monkeypatch.setattr(main, "SessionLocal", async_sessionmaker(sqlite_engine, expire_on_commit=False))
+    monkeypatch.setattr(main.settings, "SEED_SOURCE", "omdb")
+    calls = []
+
+    async def run_movie_seeder(client, insert_batch, count, stats, existing_ids):
+        calls.append((count, existing_ids))
+
+    monkeypatch.setattr(main, "run_movie_seeder", run_movie_seeder)
+    app = SimpleNamespace(state=SimpleNamespace(suggest_index=SuggestIndex(), omdb_client=None))
+
+    await main.seed_database(app, SeedStats())
+
+    assert calls == [(main.SEED_MOVIE_COUNT - 1, {"tt0113277"})]
+
+
+@pytest.mark.asyncio
+async def test_suggest_index_is_built_in_the_background(sqlite_session, sqlite_engine, monkeypatch):
+    sqlite_session.add_all([
+        Movie(title="Heat", imdb_id="tt0113277", type="movie"),
+        Movie(title="Alien", imdb_id="tt0078748", type="movie"),
+    ])
+    await sqlite_session.commit()
+    monkeypatch.setattr(main, "SessionLocal", async_sessionmaker(sqlite_engine, expire_on_commit=False))
+    index = SuggestIndex()
+
+    task = asyncio.create_task(main.build_suggest_index(index))
+    await asyncio.sleep(0)
+    assert not index.ready
+    index.add(99, "Written meanwhile")
+    await task
+
+    assert index.ready
+    assert len(index) == 3
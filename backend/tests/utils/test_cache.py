@@ -0,0 +1,36 @@
+from utils.cache import LRUCache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries():
+    timer = FakeTimer()
+    cache = LRUCache(maxsize=10, ttl=60, timer=timer)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=5)
+
+    timer.now = 10
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+    timer.now = 61
+    assert cache.get("a") is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 2}
@@ -0,0 +1,76 @@
+import pytest
+
+from utils.cache_backend import MemoryCacheBackend, RedisCacheBackend, create_cache_backend
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of redis.asyncio.Redis the backend uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value.encode()
+        self.ttls[key] = px
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if key.startswith(match.rstrip("*")):
+                yield key
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_ttl_and_hit_ratio():
+    cache = MemoryCacheBackend(maxsize=10)
+    await cache.set("a", {"id": 1}, ttl=60)
+    await cache.set("b", {"id": 2}, ttl=0)
+
+    assert await cache.get("a") == {"id": 1}
+    assert await cache.get("b") is None  # Expired at once
+    await cache.delete("a")
+    assert await cache.get("a") is None
+
+    assert cache.stats() == {"backend": "MemoryCacheBackend", "hits": 1, "misses": 2, "hit_ratio": 0.333, "size": 0}
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_stores_json_with_per_key_ttl():
+    client = FakeRedis()
+    cache = RedisCacheBackend(client, prefix="test:")
+    await cache.set("movie:1", {"id": 1, "title": "Alien"}, ttl=2.5)
+    await cache.set("movie:2", {"id": 2}, ttl=60)
+    client.data["other:1"] = b"{}"
+
+    assert await cache.get("movie:1") == {"id": 1, "title": "Alien"}
+    assert client.ttls["test:movie:1"] == 2500
+
+    await cache.delete("movie:1")
+    assert await cache.get("movie:1") is None
+    await cache.clear()
+    assert list(client.data) == ["other:1"]
+    assert cache.stats()["hit_ratio"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_errors_are_misses():
+    class BrokenRedis(FakeRedis):
+        async def get(self, key):
+            raise ConnectionError("down")
+
+    cache = RedisCacheBackend(BrokenRedis())
+    assert await cache.get("movie:1") is None
+    assert cache.misses == 1
+
+
+def test_create_cache_backend():
+    assert isinstance(create_cache_backend(None, 10), MemoryCacheBackend)
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached://localhost", 10)
@@ -0,0 +1,112 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from main import app
+from utils.metrics import (
+    DB_QUERIES,
+    Counter,
+    Histogram,
+    MetricsMiddleware,
+    MetricsRegistry,
+    HTTP_REQUESTS,
+    instrument_engine,
+    statement_operation,
+)
+
+
+def test_counter_renders_one_sample_per_label_values():
+    counter = Counter("jobs_total", "Jobs run", ("state",))
+    counter.inc("done")
+    counter.inc("done", amount=2)
+    counter.inc('fa"iled')
+
+    assert counter.render() == (
+        "# HELP jobs_total Jobs run\n"
+        "# TYPE jobs_total counter\n"
+        'jobs_total{state="done"} 3\n'
+        'jobs_total{state="fa\\"iled"} 1\n'
+    )
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+
+    lines = histogram.render().splitlines()
+
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_registry_renders_every_metric():
+    registry = MetricsRegistry()
+    registry.counter("a_total", "A").inc()
+    registry.histogram("b_seconds", "B", buckets=(1,)).observe(0.5)
+
+    output = registry.render()
+
+    assert "a_total 1\n" in output
+    assert 'b_seconds_bucket{le="1.0"} 1\n' in output
+
+
+def test_statement_operation():
+    assert statement_operation("  select * from movies") == "SELECT"
+    assert statement_operation("INSERT INTO movies VALUES (1)") == "INSERT"
+    assert statement_operation("PRAGMA table_info(movies)") == "OTHER"
+
+
+def test_middleware_labels_requests_with_the_route_template():
+    test_app = FastAPI()
+    test_app.add_middleware(MetricsMiddleware)
+
+    @test_app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    client = TestClient(test_app)
+    ok = HTTP_REQUESTS.values.get(("GET", "/items/{item_id}", "200"), 0)
+    not_found = HTTP_REQUESTS.values.get(("GET", "/items/{item_id}", "404"), 0)
+    unmatched = HTTP_REQUESTS.values.get(("GET", "unmatched", "404"), 0)
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/0")
+    client.get("/nowhere")
+
+    assert HTTP_REQUESTS.values[("GET", "/items/{item_id}", "200")] == ok + 2
+    assert HTTP_REQUESTS.values[("GET", "/items/{item_id}", "404")] == not_found + 1
+    assert HTTP_REQUESTS.values[("GET", "unmatched", "404")] == unmatched + 1
+
+
+@pytest.mark.asyncio
+async def test_instrumented_engine_counts_statements():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    instrument_engine(engine)
+    selects = DB_QUERIES.values.get(("SELECT",), 0)
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        await conn.execute(text("SELECT 2"))
+    await engine.dispose()
+
+    assert DB_QUERIES.values[("SELECT",)] == selects + 2
+
+
+def test_metrics_endpoint_serves_the_exposition_format():
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_requests_total counter" in response.text
+    assert "# TYPE db_query_duration_seconds histogram" in response.text
@@ -0,0 +1,28 @@
+import pytest
+
+from utils.ndjson import iter_lines
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def collect(parts, max_line_bytes=100):
+    return [line async for line in iter_lines(chunks(*parts), max_line_bytes)]
+
+
+@pytest.mark.asyncio
+async def test_lines_split_across_chunks():
+    assert await collect([b'{"a":', b'1}\n{"b":2}\n\n{"c"', b":3}"]) == [b'{"a":1}', b'{"b":2}', b"", b'{"c":3}']
+
+
+@pytest.mark.asyncio
+async def test_overlong_lines_are_yielded_as_none():
+    lines = await collect([b"short\n", b"x" * 8, b"x" * 8, b"\nok\n", b"y" * 20], max_line_bytes=10)
+    assert lines == [b"short", None, b"ok", None]
+
+
+@pytest.mark.asyncio
+async def test_overlong_line_within_one_chunk():
+    assert await collect([b"x" * 20 + b"\nok"], max_line_bytes=10) == [None, b"ok"]
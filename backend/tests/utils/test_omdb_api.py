@@ -0,0 +1,140 @@
+import asyncio
+
+import httpx
+import pytest
+
+from utils.metrics import OMDB_REQUESTS
+from utils.omdb_api import OMDBClient, OMDBError
+from utils.omdb_cache import OMDBCache
+
+
+def make_client(handler) -> OMDBClient:
+    """Build an OMDBClient whose requests are answered by `handler`."""
+    return OMDBClient("test_api_key", transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_fetch_by_title_sends_api_key_and_title():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"Response": "True", "Title": "Inception"})
+
+    client = make_client(handler)
+    data = await client.fetch_by_title("Inception")
+    await client.aclose()
+
+    assert data["Title"] == "Inception"
+    assert requests[0].url.params["apikey"] == "test_api_key"
+    assert requests[0].url.params["t"] == "Inception"
+
+
+@pytest.mark.asyncio
+async def test_fetch_returns_error_payload():
+    client = make_client(lambda request: httpx.Response(200, json={"Response": "False", "Error": "Movie not found!"}))
+    data = await client.fetch_by_imdb_id("tt0000001")
+    await client.aclose()
+
+    assert data["Response"] == "False"
+
+
+@pytest.mark.asyncio
+async def test_http_error_raises_omdb_error():
+    client = make_client(lambda request: httpx.Response(429))
+    with pytest.raises(OMDBError) as exc_info:
+        await client.fetch_by_imdb_id("tt0000001")
+    await client.aclose()
+
+    assert exc_info.value.status_code == 429
+    assert client.limiter.throttled == 1
+    assert client.limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_exhausted_quota_counts_as_throttled():
+    responses = iter([
+        httpx.Response(401, json={"Response": "False", "Error": "Request limit reached!"}),
+        httpx.Response(401, json={"Response": "False", "Error": "Invalid API key!"}),
+    ])
+    client = make_client(lambda request: next(responses))
+    limit = client.limiter.limit
+    for _ in range(2):
+        with pytest.raises(OMDBError) as exc_info:
+            await client.fetch_by_title("Inception")
+        assert exc_info.value.status_code == 401
+    await client.aclose()
+
+    assert client.limiter.throttled == 1
+    assert client.limiter.limit < limit
+
+
+@pytest.mark.asyncio
+async def test_transport_error_raises_omdb_error():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectTimeout("timed out", request=request)
+
+    client = make_client(handler)
+    with pytest.raises(OMDBError) as exc_info:
+        await client.fetch_by_title("Inception")
+    await client.aclose()
+
+    assert exc_info.value.status_code is None
+    assert client.limiter.throttled == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_leaves_the_concurrency_limit_unchanged():
+    sent = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.set()
+        await asyncio.sleep(60)
+        return httpx.Response(200, json={"Response": "True"})
+
+    client = make_client(handler)
+    limit = client.limiter.limit
+    task = asyncio.create_task(client.fetch_by_title("Inception"))
+    await sent.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await client.aclose()
+
+    assert client.limiter.in_flight == 0
+    assert client.limiter.limit == limit
+    assert client.limiter.throttled == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_lookups_skip_the_api():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"Response": "True", "Title": "Inception", "imdbID": "tt1375666"})
+
+    client = OMDBClient("test_api_key", transport=httpx.MockTransport(handler), cache=OMDBCache(None))
+    await client.fetch_by_title("Inception")
+    await client.fetch_by_title("inception ")
+    data = await client.fetch_by_imdb_id("tt1375666")
+    await client.aclose()
+
+    assert data["Title"] == "Inception"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_calls_are_counted_by_outcome():
+    statuses = iter([200, 429, 503])
+    client = make_client(lambda request: httpx.Response(next(statuses), json={"Response": "True"}))
+    before = {outcome: OMDB_REQUESTS.values.get((outcome,), 0) for outcome in ("ok", "throttled", "server_error")}
+
+    await client.get(i="tt0000001")
+    for _ in range(2):
+        with pytest.raises(OMDBError):
+            await client.get(i="tt0000001")
+    await client.aclose()
+
+    for outcome in before:
+        assert OMDB_REQUESTS.values[(outcome,)] == before[outcome] + 1
@@ -0,0 +1,73 @@
+import pytest
+import pytest_asyncio
+
+from utils.omdb_cache import OMDBCache, title_key, imdb_key
+
+MOVIE_PAYLOAD = {"Response": "True", "Title": "Inception", "imdbID": "tt1375666"}
+NOT_FOUND_PAYLOAD = {"Response": "False", "Error": "Movie not found!"}
+
+
+@pytest_asyncio.fixture
+async def omdb_cache(tmp_path):
+    cache = OMDBCache(str(tmp_path / "omdb_cache.sqlite3"))
+    await cache.open()
+    yield cache
+    await cache.close()
+
+
+def test_keys_are_normalized():
+    assert title_key("  The  MATRIX ") == title_key("the matrix")
+    assert imdb_key("TT0133093") == "imdb:tt0133093"
+
+
+@pytest.mark.asyncio
+async def test_movie_is_cached_by_title_and_imdb_id(omdb_cache):
+    await omdb_cache.set(title_key("Inception"), MOVIE_PAYLOAD)
+
+    assert await omdb_cache.get(title_key("inception")) == MOVIE_PAYLOAD
+    assert await omdb_cache.get(imdb_key("tt1375666")) == MOVIE_PAYLOAD
+    assert await omdb_cache.get(title_key("Memento")) is None
+    assert omdb_cache.stats()["memory_hits"] == 2
+    assert omdb_cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_survives_restarts(omdb_cache):
+    await omdb_cache.set(title_key("Inception"), MOVIE_PAYLOAD)
+    await omdb_cache.close()
+
+    reopened = OMDBCache(omdb_cache.path)
+    await reopened.open()
+    assert await reopened.get(imdb_key("tt1375666")) == MOVIE_PAYLOAD
+    assert reopened.stats()["disk_hits"] == 1
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_negative_entries_use_short_ttl():
+    cache = OMDBCache(None, negative_ttl=0)
+    await cache.set(title_key("Nothing"), NOT_FOUND_PAYLOAD)
+
+    assert await cache.get(title_key("Nothing")) is None
+
+    cache.negative_ttl = 60
+    await cache.set(title_key("Nothing"), NOT_FOUND_PAYLOAD)
+    assert await cache.get(title_key("Nothing")) == NOT_FOUND_PAYLOAD
+    assert cache.stats()["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_incorrect_imdb_id_is_cached():
+    cache = OMDBCache(None)
+    payload = {"Response": "False", "Error": "Incorrect IMDb ID."}
+    await cache.set(imdb_key("tt0000042"), payload)
+
+    assert await cache.get(imdb_key("tt0000042")) == payload
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_not_cached():
+    cache = OMDBCache(None)
+    await cache.set(title_key("Inception"), {"Response": "False", "Error": "Request limit reached!"})
+
+    assert await cache.get(title_key("Inception")) is None
@@ -0,0 +1,15 @@
+import pytest
+
+from utils.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("Amélie", 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("Amélie", 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", encode_cursor("Title", 1)[:-3], "WyJhIiwiYiJd"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from utils.query_log import QueryBudgetExceeded, QueryBudgetMiddleware, QueryLog, QueryTracker, query_budget, track_queries
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    QueryLog().install(engine)
+    yield engine
+    await engine.dispose()
+
+
+def test_tracker_reports_the_most_repeated_statement():
+    tracker = QueryTracker("GET /api/movies/")
+    tracker.record("SELECT count(*) FROM movies", 0.001)
+    for _ in range(3):
+        tracker.record("SELECT * FROM movies WHERE id = ?", 0.002)
+
+    assert tracker.over_budget(4) is None
+    assert tracker.over_budget(3) == (
+        "GET /api/movies/ ran 4 queries (budget 3) in 7.0ms, 3 times: SELECT * FROM movies WHERE id = ?"
+    )
+
+
+@pytest.mark.asyncio
+async def test_query_budget_counts_statements_of_the_block(engine):
+    async with engine.connect() as conn:
+        with track_queries("request") as outer:
+            with query_budget(2) as inner:
+                await conn.execute(text("SELECT 1"))
+                await conn.execute(text("SELECT 2"))
+            await conn.execute(text("SELECT 3"))
+
+        with pytest.raises(QueryBudgetExceeded, match="ran 3 queries"):
+            with query_budget(2):
+                for i in range(3):
+                    await conn.execute(text("SELECT :i"), {"i": i})
+
+    assert (inner.count, outer.count) == (2, 3)
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_with_their_plan(caplog):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    QueryLog(slow_query_ms=1e-6).install(engine)
+
+    with caplog.at_level(logging.WARNING):
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+            with track_queries("GET /items"):
+                await conn.execute(text("SELECT * FROM items WHERE name = :name"), {"name": "x"})
+    await engine.dispose()
+
+    messages = [record.getMessage() for record in caplog.records if record.getMessage().startswith("Slow query")]
+    assert "no request" in messages[0]
+    assert "CREATE TABLE" in messages[0] and "SCAN" not in messages[0]
+    assert "GET /items): SELECT * FROM items WHERE name = ? ('x',)" in messages[1]
+    assert "SCAN items" in messages[1]
+
+
+def test_strict_middleware_fails_requests_over_budget():
+    test_app = FastAPI()
+    test_app.add_middleware(QueryBudgetMiddleware, budget=2, strict=True)
+
+    @test_app.get("/items")
+    async def read_items(count: int):
+        engine = create_async_engine("sqlite+aiosqlite://")
+        QueryLog().install(engine)
+        async with engine.connect() as conn:
+            for _ in range(count):
+                await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+        return {}
+
+    client = TestClient(test_app)
+
+    assert client.get("/items", params={"count": 2}).status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match="GET /items ran 3 queries"):
+        client.get("/items", params={"count": 3})
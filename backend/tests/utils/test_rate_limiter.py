@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from utils.rate_limiter import AdaptiveRateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_concurrency_increases_on_success_and_halves_on_throttling():
+    limiter = AdaptiveRateLimiter(rate=100, min_concurrency=1, max_concurrency=8, initial_concurrency=4)
+
+    for _ in range(5):  # About +1 per `limit` successful requests
+        limiter.in_flight += 1
+        limiter.release()
+    assert int(limiter.limit) == 5
+
+    limiter.in_flight += 1
+    limiter.release(throttled=True)
+    assert int(limiter.limit) == 2
+    assert limiter.stats()["throttled"] == 1
+
+    for _ in range(3):
+        limiter.in_flight += 1
+        limiter.release(throttled=True)
+    assert limiter.limit == 1
+
+
+@pytest.mark.asyncio
+async def test_throttled_requests_in_flight_decrease_the_limit_once():
+    limiter = AdaptiveRateLimiter(rate=1000, burst=10, initial_concurrency=8, max_concurrency=8)
+    requests = [await limiter.acquire() for _ in range(4)]
+
+    for request in requests:  # One overload answered to all the requests in flight
+        limiter.release(throttled=True, request=request)
+    assert limiter.limit == 4
+    assert limiter.throttled == 4
+
+    # A request sent after the decrease that is throttled again halves the limit again
+    limiter.release(throttled=True, request=await limiter.acquire())
+    assert limiter.limit == 2
+
+
+def test_concurrency_is_capped():
+    limiter = AdaptiveRateLimiter(rate=100, max_concurrency=3, initial_concurrency=3)
+    for _ in range(10):
+        limiter.in_flight += 1
+        limiter.release()
+    assert limiter.limit == 3
+
+
+def test_release_without_outcome_keeps_the_limit():
+    limiter = AdaptiveRateLimiter(rate=100, initial_concurrency=4)
+    limiter.in_flight += 1
+    limiter.release(throttled=None)
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_a_free_slot():
+    limiter = AdaptiveRateLimiter(rate=1000, burst=10, initial_concurrency=2, max_concurrency=2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    third = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not third.done()
+    assert limiter.stats()["waiting"] == 1
+
+    limiter.release()
+    await asyncio.wait_for(third, 1)
+    assert limiter.in_flight == 2
+    assert limiter.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_requests(monkeypatch):
+    clock = FakeClock()
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        clock.now += delay
+
+    monkeypatch.setattr("utils.rate_limiter.asyncio.sleep", fake_sleep)
+    limiter = AdaptiveRateLimiter(rate=2, burst=2, initial_concurrency=10, max_concurrency=10, timer=clock)
+
+    for _ in range(4):
+        await limiter.acquire()
+
+    assert sleeps == [0.5, 0.5]  # Burst of 2, then one token every 0.5s
+    assert clock.now == 1.0
+    assert limiter.stats()["observed_rate"] == 0.4  # 4 requests over the 10s window
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return "result"
+
+    waiters = [asyncio.create_task(flight.do("key", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.started == 1
+    assert flight.shared == 4
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached():
+    flight = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(flight.do("key", failing), flight.do("key", failing), return_exceptions=True)
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert len(attempts) == 1
+
+    with pytest.raises(ValueError):
+        await flight.do("key", failing)
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return 42
+
+    first = asyncio.create_task(flight.do("key", fetch))
+    second = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 42
+    with pytest.raises(asyncio.CancelledError):
+        await first
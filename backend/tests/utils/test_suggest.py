@@ -0,0 +1,110 @@
+import utils.suggest
+from utils.suggest import SuggestIndex
+
+ROWS = [
+    (1, "The Matrix", 1999, "Lana Wachowski"),
+    (2, "The Matrix Reloaded", 2003, "Lana Wachowski"),
+    (3, "Matilda", 1996, "Danny DeVito"),
+    (4, "Alien", 1979, "Ridley Scott"),
+    (5, "Aliens", 1986, "James Cameron"),
+]
+
+
+def titles(suggestions):
+    return [suggestion.title for suggestion in suggestions]
+
+
+def test_title_prefix_ranks_first():
+    index = SuggestIndex.build(ROWS)
+    assert titles(index.suggest("mat")) == ["Matilda", "The Matrix", "The Matrix Reloaded"]
+    assert titles(index.suggest("ALIEN", limit=1)) == ["Alien"]
+
+
+def test_director_and_word_prefixes():
+    index = SuggestIndex.build(ROWS)
+    assert titles(index.suggest("reloaded")) == ["The Matrix Reloaded"]
+    assert titles(index.suggest("ridley")) == ["Alien"]
+
+
+def test_typos_fall_back_to_trigrams():
+    index = SuggestIndex.build(ROWS)
+    assert titles(index.suggest("reloded")) == ["The Matrix Reloaded"]
+    assert titles(index.suggest("aliem"))[:2] == ["Alien", "Aliens"]
+    assert index.suggest("zzzz") == []
+
+
+def test_trigram_fallback_only_scans_rare_trigrams(monkeypatch):
+    monkeypatch.setattr(utils.suggest, "TRIGRAM_MAX_CANDIDATES", 100)
+    rows = [(i, f"The Story Of Night {i}", 2000, None) for i in range(1, 1001)]
+    index = SuggestIndex.build(rows + [(5000, "The Story Of Zanzibar", 2001, None)])
+
+    # The rare trigrams of the typo still lead to the title, however common the others are
+    assert titles(index.suggest("the stroy of zanzibra", limit=3)) == ["The Story Of Zanzibar"]
+    # Misses made of trigrams shared by 1000 titles are given up instead of scanning them all
+    assert index.suggest("hte stroy fo nihgt") == []
+
+
+def test_incremental_updates():
+    index = SuggestIndex.build(ROWS)
+    index.add(4, "Prometheus", 2012, "Ridley Scott")
+    index.remove(5)
+    index.add(6, "Alien: Covenant", 2017, "Ridley Scott")
+
+    assert titles(index.suggest("alien")) == ["Alien: Covenant"]
+    assert titles(index.suggest("prom")) == ["Prometheus"]
+    assert index.lookup("  the matrix ") == [1]
+    assert len(index) == 5
+
+
+def test_incremental_index_matches_bulk_build():
+    incremental = SuggestIndex()
+    for row in reversed(ROWS):
+        incremental.add(*row)
+    built = SuggestIndex.build(ROWS)
+    for query in ("the", "mat", "al", "wach"):
+        assert incremental.suggest(query) == built.suggest(query)
+
+
+def test_add_many_replaces_and_matches_bulk_build():
+    index = SuggestIndex.build(ROWS[:3])
+    index.add_many([(1, "Matrix, The", 1999, "Lana Wachowski"), *ROWS[3:], (5, "Aliens", 1986, "James Cameron")])
+    built = SuggestIndex.build([(1, "Matrix, The", 1999, "Lana Wachowski"), *ROWS[1:]])
+
+    assert len(index) == 5
+    for query in ("the", "mat", "al", "wach", "cameron"):
+        assert index.suggest(query) == built.suggest(query)
+    assert index.lookup("the matrix") == []
+    assert index._titles == built._titles and index._words == built._words
+
+
+def test_lookup_similar_ignores_articles_and_punctuation():
+    index = SuggestIndex.build(ROWS + [(6, "Spider-Man: Homecoming", 2017, "Jon Watts")])
+
+    assert index.lookup("matrix, the") == []
+    assert index.lookup_similar("matrix, the") == [1]
+    assert index.lookup_similar("spiderman homecoming") == [6]
+    assert index.lookup_similar("Alien") == [4]
+    assert index.lookup_similar("!!") == []
+
+    index.remove(6)
+    assert index.lookup_similar("spiderman homecoming") == []
+
+
+def test_load_replays_writes_made_during_the_build():
+    index = SuggestIndex()
+    index.start_recording()
+    assert not index.ready
+    snapshot = ROWS[:3]  # Read before the writes below
+    index.add(6, "Heat", 1995, "Michael Mann")
+    index.add_many([(2, "Terminator 2", 1991, "James Cameron")])
+    index.remove(3)
+
+    index.load(SuggestIndex.build(snapshot))
+
+    assert index.ready
+    assert sorted(movie.title for movie in index._movies.values()) == ["Heat", "Terminator 2", "The Matrix"]
+    assert index.lookup("heat") == [6]
+    assert index.suggest("term")[0].title == "Terminator 2"
+
+    index.remove(6)  # No longer recorded
+    assert index._changes is None and len(index) == 2
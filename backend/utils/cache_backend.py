@@ -0,0 +1,173 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from config.constants import CACHE_GENERATION_SLOTS
+from utils.cache import LRUCache
+
+
+class CacheBackend(ABC):
+    """
+    Async key/value cache of JSON-compatible values, each stored with its own TTL
+
+    Backends count hits and misses, so every implementation reports the same metrics, and
+    invalidations, so read-through fills racing a write can be skipped (see `generation`)
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.generations = [0] * CACHE_GENERATION_SLOTS
+
+    def generation(self, key: str) -> int:
+        """
+        Invalidations of `key` in this process so far (shared with the keys of the same slot)
+
+        Read it before loading a value to cache and fill only if it did not change meanwhile,
+        otherwise a load started before a write may put the old value back after the delete
+        """
+        return self.generations[hash(key) % CACHE_GENERATION_SLOTS]
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss"""
+        value = await self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Store a value for `ttl` seconds"""
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        """Drop keys if present"""
+        for key in keys:
+            self.generations[hash(key) % CACHE_GENERATION_SLOTS] += 1
+        await self._delete(*keys)
+
+    @abstractmethod
+    async def _delete(self, *keys: str) -> None:
+        pass
+
+    async def clear(self) -> None:
+        """Drop every entry of this cache"""
+        self.generations = [generation + 1 for generation in self.generations]
+        await self._clear()
+
+    @abstractmethod
+    async def _clear(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        """Release the connections of the backend, if any"""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and hit ratio"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU backend, the default. Entries are not shared between app instances,
+    so writes made elsewhere are only seen once the TTL expired
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self.cache = LRUCache(maxsize, ttl=0)
+
+    async def _get(self, key: str) -> Optional[Any]:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self.cache.set(key, value, ttl)
+
+    async def _delete(self, *keys: str) -> None:
+        for key in keys:
+            self.cache.delete(key)
+
+    async def _clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "size": len(self.cache)}
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend over a Redis-compatible async client (e.g. `redis.asyncio.Redis`), shared by
+    every app instance. Values are stored as JSON under `prefix`
+
+    Cache errors are logged and treated as misses, the database stays the source of truth
+    """
+
+    def __init__(self, client: Any, prefix: str = "cache:"):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+
+    async def _get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            logging.warning(f"Cache read of '{key}' failed: {e}")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+        except Exception as e:
+            logging.warning(f"Cache write of '{key}' failed: {e}")
+
+    async def _delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            logging.error(f"Cache invalidation of {keys} failed: {e}")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def _clear(self) -> None:
+        try:
+            keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*")]
+            if keys:
+                await self.client.delete(*keys)
+        except Exception as e:
+            logging.error(f"Cache clear failed: {e}")
+
+
+def create_cache_backend(url: Optional[str], maxsize: int, prefix: str = "cache:") -> CacheBackend:
+    """
+    Build the cache backend of a URL: in-process when empty, Redis for redis:// or rediss://
+
+    The Redis client (the `redis` package) is only needed when a Redis URL is configured
+    """
+    if not url:
+        return MemoryCacheBackend(maxsize)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            from redis.asyncio import Redis
+        except ImportError:
+            logging.error("CACHE_URL points to Redis but the redis package is not installed, caching in memory")
+            return MemoryCacheBackend(maxsize)
+        return RedisCacheBackend(Redis.from_url(url), prefix)
+    raise ValueError(f"Unsupported CACHE_URL scheme: {url}")
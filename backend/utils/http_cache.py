@@ -0,0 +1,69 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+
+# Clients may store responses but must revalidate them before every reuse, so a write is seen
+# by the next read; unchanged resources cost a 304 without a body
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of a response body"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def http_date(moment: datetime.datetime) -> str:
+    """Format a datetime as an HTTP date, naive datetimes are taken as UTC"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return format_datetime(moment.astimezone(datetime.timezone.utc), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime.datetime]) -> bool:
+    """
+    Whether the client copy is still fresh. If-None-Match wins over If-Modified-Since (RFC 9110)
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=datetime.timezone.utc)
+    return last_modified.replace(microsecond=0) <= since  # HTTP dates have a one second resolution
+
+
+def cached_json_response(
+        request: Request,
+        content: Any,
+        last_modified: Optional[datetime.datetime] = None,
+) -> Response:
+    """
+    JSON response with ETag, Last-Modified and Cache-Control headers, or an empty 304
+    when the request's validators match
+
+    Args:
+        request (Request): Incoming request, carrying If-None-Match / If-Modified-Since
+        content (Any): JSON-compatible payload, e.g. from `TypeAdapter.dump_python(mode="json")`
+        last_modified (Optional[datetime.datetime]): Last modification of the resource, if known
+    """
+    body = orjson.dumps(content)
+    etag = make_etag(body)
+    headers: Dict[str, str] = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,204 @@
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config.constants import METRICS_DB_BUCKETS, METRICS_HTTP_BUCKETS, METRICS_OMDB_BUCKETS
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Statement kinds DB metrics are labelled with, anything else counts as OTHER
+DB_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+
+def escape_label(value: str) -> str:
+    """Escape a label value for the exposition format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    """Base of the metric families: a name, a help text and label names"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[str]:
+        """Exposition lines of every labelled series"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.type_name}\n"
+        return header + "".join(f"{line}\n" for line in self.samples())
+
+
+class Counter(Metric):
+    """Monotonic count per label values"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.labelnames, labels)} {value}"
+            for labels, value in sorted(self.values.items())
+        ]
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values per label values, counted in fixed upper-bound buckets
+
+    Observing is one bisect and three increments, buckets are made cumulative when rendered
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = METRICS_HTTP_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        # label values -> [per-bucket counts (the last one is +Inf), sum, count]
+        self.series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        series = self.series.get(labelvalues)
+        if series is None:
+            series = self.series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for labels, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{format_labels(bucket_labels, labels + (le,))} {cumulative}")
+            suffix = format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics rendered together in the Prometheus text format
+
+    Metrics are updated from the event loop thread only (SQLAlchemy events of async engines
+    run there too), so no locking is needed
+    """
+
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = METRICS_HTTP_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        return "".join(metric.render() for metric in self.metrics)
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by method, route template and status code", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template", ("method", "route"),
+    METRICS_HTTP_BUCKETS,
+)
+DB_QUERIES = REGISTRY.counter("db_queries_total", "Database statements executed by operation", ("operation",))
+DB_QUERY_DURATION = REGISTRY.histogram(
+    "db_query_duration_seconds", "Database statement latency by operation", ("operation",), METRICS_DB_BUCKETS
+)
+OMDB_REQUESTS = REGISTRY.counter("omdb_requests_total", "Calls to the OMDB API by outcome", ("outcome",))
+OMDB_REQUEST_DURATION = REGISTRY.histogram(
+    "omdb_request_duration_seconds", "OMDB API call latency by outcome", ("outcome",), METRICS_OMDB_BUCKETS
+)
+
+
+def statement_operation(statement: str) -> str:
+    """SELECT, INSERT, UPDATE, DELETE or OTHER, from the first keyword of a SQL statement"""
+    operation = statement.lstrip()[:6].upper()
+    return operation if operation in DB_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context.metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    operation = statement_operation(statement)
+    DB_QUERIES.inc(operation)
+    DB_QUERY_DURATION.observe(time.perf_counter() - context.metrics_started, operation)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count and time every statement run by an engine (executemany counts once)"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting and timing requests per route template
+
+    Requests are labelled with the path of the matched route (`/api/movies/{movie_id}`),
+    never the raw path, so the number of series stays bounded; unmatched requests share
+    the `unmatched` label
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(scope["method"], template, str(status))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], template)
@@ -0,0 +1,39 @@
+from typing import AsyncIterable, AsyncIterator, Optional
+
+
+async def iter_lines(chunks: AsyncIterable[bytes], max_line_bytes: int) -> AsyncIterator[Optional[bytes]]:
+    """
+    Split a byte stream (e.g. a request body) into lines, holding at most one line in memory
+
+    Lines longer than `max_line_bytes` are dropped and yielded as None, so callers can
+    report them without buffering them
+    """
+    buffer = bytearray()
+    too_long = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not too_long:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        too_long = True
+                        buffer.clear()
+                break
+
+            if too_long or len(buffer) + end - start > max_line_bytes:
+                yield None
+            elif buffer:
+                buffer += chunk[start:end]
+                yield bytes(buffer)
+            else:
+                yield chunk[start:end]
+            buffer.clear()
+            too_long = False
+            start = end + 1
+
+    if too_long:
+        yield None
+    elif buffer:
+        yield bytes(buffer)
@@ -1,24 +1,162 @@
 import logging
+import time
+from typing import Dict, Optional
 
 import httpx
 
-from config.settings import settings
+from config.constants import (
+    OMDB_BASE_URL,
+    OMDB_TIMEOUT,
+    OMDB_CONNECT_TIMEOUT,
+    OMDB_MAX_CONNECTIONS,
+    OMDB_MAX_KEEPALIVE_CONNECTIONS,
+    OMDB_KEEPALIVE_EXPIRY,
+    OMDB_RATE_LIMIT,
+    OMDB_RATE_BURST,
+    OMDB_MIN_CONCURRENCY,
+    OMDB_INITIAL_CONCURRENCY,
+    OMDB_MAX_CONCURRENCY,
+)
+from utils.metrics import OMDB_REQUEST_DURATION, OMDB_REQUESTS
+from utils.omdb_cache import OMDBCache, title_key, imdb_key
+from utils.rate_limiter import AdaptiveRateLimiter
 
+# OMDB answers 401 with this error once the daily quota of the API key is used up
+OMDB_REQUEST_LIMIT_ERROR = "Request limit reached!"
 
-async def fetch_movie_from_omdb(title: str):
+
+class OMDBError(Exception):
     """
-    Fetch movie details from the OMDB API by title
+    Raised when the OMDB API cannot be reached or answers with an HTTP error
     """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_request_limit(response: httpx.Response) -> bool:
+    """Whether OMDB refused the request because the API key ran out of quota"""
+    if response.status_code != 401:
+        return False
     try:
-        url = f"http://www.omdbapi.com/?apikey={settings.OMDB_API_KEY}&t={title}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("Response") == "True":
-                return data
-        logging.error(f"OMDB API returned error: {response.text}")
-        return None
-    except Exception as e:
-        logging.error(f"Failed to fetch movie from OMDB: {e}")
-        return None
+        return response.json().get("Error") == OMDB_REQUEST_LIMIT_ERROR
+    except (ValueError, AttributeError):
+        return False
+
+
+def call_outcome(response: httpx.Response) -> str:
+    """Metrics label of an OMDB response: ok, throttled (429, quota), server_error (5xx) or http_error"""
+    if response.status_code == 200:
+        return "ok"
+    if response.status_code == 429 or is_request_limit(response):
+        return "throttled"
+    return "server_error" if response.status_code >= 500 else "http_error"
+
+
+class OMDBClient:
+    """
+    Shared async client for the OMDB API
+
+    A single instance is created by the app lifespan, so every lookup reuses the same
+    pool of keep-alive (HTTP/2) connections instead of paying TCP/TLS setup per call.
+    Lookups are answered from `cache` first when one is given, calls that reach OMDB go
+    through `limiter`, which paces seeding and user traffic together
+    """
+
+    def __init__(
+            self,
+            api_key: str,
+            base_url: str = OMDB_BASE_URL,
+            transport: Optional[httpx.AsyncBaseTransport] = None,
+            cache: Optional[OMDBCache] = None,
+            limiter: Optional[AdaptiveRateLimiter] = None,
+            rate_limit: float = OMDB_RATE_LIMIT,
+    ):
+        self.cache = cache
+        self.limiter = limiter or AdaptiveRateLimiter(
+            rate_limit,
+            burst=OMDB_RATE_BURST,
+            min_concurrency=OMDB_MIN_CONCURRENCY,
+            max_concurrency=OMDB_MAX_CONCURRENCY,
+            initial_concurrency=OMDB_INITIAL_CONCURRENCY,
+        )
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            params={"apikey": api_key},
+            timeout=httpx.Timeout(OMDB_TIMEOUT, connect=OMDB_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=OMDB_MAX_CONNECTIONS,
+                max_keepalive_connections=OMDB_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OMDB_KEEPALIVE_EXPIRY,
+            ),
+            http2=True,
+            transport=transport,
+        )
+
+    async def get(self, **params: str) -> Dict:
+        """
+        Query the OMDB API
+
+        Args:
+            **params: OMDB query parameters (e.g. t=<title>, i=<imdb id>)
+
+        Returns:
+            Dict: The decoded OMDB payload, which may be a {"Response": "False"} error payload
+
+        Raises:
+            OMDBError: If the request fails or OMDB answers with a non 200 status
+        """
+        request = await self.limiter.acquire()
+        throttled = None  # No outcome if the request is cancelled
+        try:
+            started = time.perf_counter()
+            try:
+                response = await self.client.get("", params=params)
+            except httpx.HTTPError as e:
+                throttled = True  # Timeouts and refused connections mean OMDB is overloaded too
+                self._observe("transport_error", started)
+                raise OMDBError(f"Error calling OMDB API: {e!r}") from e
+            outcome = call_outcome(response)
+            throttled = outcome in ("throttled", "server_error")
+            self._observe(outcome, started)
+        finally:
+            self.limiter.release(throttled, request)
+
+        if response.status_code != 200:
+            raise OMDBError(f"OMDB API responded with HTTP {response.status_code}", response.status_code)
+
+        try:
+            return response.json()
+        except ValueError as e:
+            raise OMDBError(f"Invalid JSON from OMDB API: {e}", response.status_code) from e
+
+    async def fetch_by_title(self, title: str) -> Dict:
+        """Fetch the OMDB payload of a movie by title"""
+        return await self._cached_get(title_key(title), t=title)
+
+    async def fetch_by_imdb_id(self, imdb_id: str) -> Dict:
+        """Fetch the OMDB payload of a movie by IMDb ID"""
+        return await self._cached_get(imdb_key(imdb_id), i=imdb_id)
+
+    async def _cached_get(self, key: str, **params: str) -> Dict:
+        if self.cache is not None:
+            payload = await self.cache.get(key)
+            if payload is not None:
+                logging.debug(f"OMDB cache hit: {key}")
+                return payload
+
+        logging.info(f"Fetching movie from OMDB: {params}")
+        payload = await self.get(**params)
+        if self.cache is not None:
+            await self.cache.set(key, payload)
+        return payload
+
+    @staticmethod
+    def _observe(outcome: str, started: float) -> None:
+        OMDB_REQUESTS.inc(outcome)
+        OMDB_REQUEST_DURATION.observe(time.perf_counter() - started, outcome)
+
+    async def aclose(self) -> None:
+        """Close the pooled connections"""
+        await self.client.aclose()
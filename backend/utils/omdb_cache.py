@@ -0,0 +1,149 @@
+import json
+import logging
+import time
+from typing import Dict, Optional
+
+import aiosqlite
+
+from config.constants import OMDB_CACHE_SIZE, OMDB_CACHE_TTL, OMDB_NEGATIVE_CACHE_TTL
+from utils.cache import LRUCache
+from utils.transformers import normalize_title
+
+# OMDB errors that are safe to cache, other errors (quota, bad key...) are transient
+OMDB_NOT_FOUND_ERRORS = ("Movie not found!", "Incorrect IMDb ID.")
+
+
+def title_key(title: str) -> str:
+    """Cache key of a title lookup"""
+    return f"title:{normalize_title(title)}"
+
+
+def imdb_key(imdb_id: str) -> str:
+    """Cache key of an IMDb ID lookup"""
+    return f"imdb:{imdb_id.strip().lower()}"
+
+
+class OMDBCache:
+    """
+    Two-tier cache of OMDB payloads
+
+    An in-process LRU answers hot lookups, a local SQLite file keeps payloads across
+    restarts. "Movie not found!" and "Incorrect IMDb ID." answers are cached too, with a
+    shorter TTL, so seeding does not look up the same unknown IDs again
+    """
+
+    def __init__(
+            self,
+            path: Optional[str],
+            maxsize: int = OMDB_CACHE_SIZE,
+            ttl: float = OMDB_CACHE_TTL,
+            negative_ttl: float = OMDB_NEGATIVE_CACHE_TTL,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.memory = LRUCache(maxsize, ttl)
+        self.db: Optional[aiosqlite.Connection] = None
+        self.disk_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    async def open(self) -> None:
+        """Open the persistent store, the cache stays memory-only if it is unavailable"""
+        if not self.path:
+            return
+        try:
+            self.db = await aiosqlite.connect(self.path)
+            await self.db.execute(
+                "CREATE TABLE IF NOT EXISTS omdb_cache "
+                "(key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            await self.db.execute("DELETE FROM omdb_cache WHERE expires_at < ?", (time.time(),))
+            await self.db.commit()
+        except Exception as e:
+            logging.warning(f"OMDB cache store '{self.path}' unavailable, using memory only: {e}")
+            await self.close()
+
+    async def close(self) -> None:
+        """Close the persistent store"""
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    async def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached OMDB payload
+
+        Returns:
+            Optional[Dict]: The cached payload (possibly a negative one), or None on a miss
+        """
+        payload = self.memory.get(key)
+        if payload is None and self.db is not None:
+            payload = await self._get_from_disk(key)
+        if payload is None:
+            self.misses += 1
+        elif payload.get("Response") != "True":
+            self.negative_hits += 1
+        return payload
+
+    async def set(self, key: str, payload: Dict) -> None:
+        """
+        Cache an OMDB payload under `key`, and under its IMDb ID when it is a movie
+
+        Transient errors are not cached
+        """
+        if payload.get("Response") == "True":
+            keys = [key]
+            if payload.get("imdbID"):
+                keys.append(imdb_key(payload["imdbID"]))
+            ttl = self.ttl
+        elif payload.get("Error") in OMDB_NOT_FOUND_ERRORS:
+            keys, ttl = [key], self.negative_ttl
+        else:
+            return
+
+        for cache_key in keys:
+            self.memory.set(cache_key, payload, ttl)
+        if self.db is not None:
+            await self._set_on_disk(keys, payload, ttl)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters of both tiers"""
+        return {
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "memory_size": len(self.memory),
+        }
+
+    async def _get_from_disk(self, key: str) -> Optional[Dict]:
+        try:
+            async with self.db.execute(
+                    "SELECT payload, expires_at FROM omdb_cache WHERE key = ?", (key,)
+            ) as cursor:
+                row = await cursor.fetchone()
+        except Exception as e:
+            logging.warning(f"OMDB cache read failed for {key}: {e}")
+            return None
+
+        if row is None or row[1] <= time.time():
+            return None
+
+        payload = json.loads(row[0])
+        self.disk_hits += 1
+        # Promote to the memory tier for the remaining lifetime of the entry
+        self.memory.set(key, payload, row[1] - time.time())
+        return payload
+
+    async def _set_on_disk(self, keys, payload: Dict, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        data = json.dumps(payload)
+        try:
+            await self.db.executemany(
+                "INSERT OR REPLACE INTO omdb_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+                [(cache_key, data, expires_at) for cache_key in keys],
+            )
+            await self.db.commit()
+        except Exception as e:
+            logging.warning(f"OMDB cache write failed for {keys}: {e}")
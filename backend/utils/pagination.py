@@ -0,0 +1,30 @@
+import base64
+import binascii
+import json
+from typing import Tuple
+
+
+def encode_cursor(title: str, movie_id: int) -> str:
+    """
+    Encode the last (title, id) of a page into an opaque keyset cursor
+    """
+    raw = json.dumps([title, movie_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a keyset cursor back into (title, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        title, movie_id = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if not isinstance(title, str) or not isinstance(movie_id, int):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return title, movie_id
@@ -0,0 +1,168 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from utils.metrics import statement_operation
+
+# Prefix turning a statement into a plan query, per dialect
+EXPLAIN_PREFIXES = {"sqlite": "EXPLAIN QUERY PLAN ", "mysql": "EXPLAIN "}
+EXPLAINED_OPERATIONS = frozenset({"SELECT", "UPDATE", "DELETE"})
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a request or block runs more statements than its budget, in strict mode only
+    """
+
+
+class QueryTracker:
+    """
+    Statements run on behalf of one request (or block of code), counted per statement so
+    a statement repeated per row (N+1) stands out. Nested trackers also count into their parent
+    """
+
+    def __init__(self, label: str, parent: Optional["QueryTracker"] = None):
+        self.label = label
+        self.parent = parent
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        tracker = self
+        while tracker is not None:
+            tracker.count += 1
+            tracker.duration += duration
+            tracker.statements[statement] += 1
+            tracker = tracker.parent
+
+    def over_budget(self, budget: int) -> Optional[str]:
+        """Report of the statements run when there were more than `budget`, None otherwise"""
+        if self.count <= budget:
+            return None
+        message = f"{self.label} ran {self.count} queries (budget {budget}) in {self.duration * 1000:.1f}ms"
+        statement, repeats = self.statements.most_common(1)[0]
+        if repeats > 1:
+            message += f", {repeats} times: {statement}"
+        return message
+
+
+_current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("query_tracker", default=None)
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[QueryTracker]:
+    """Attribute the statements run inside the block (and tasks it starts) to a new tracker"""
+    tracker = QueryTracker(label, _current_tracker.get())
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@contextmanager
+def query_budget(budget: int, label: str = "block") -> Iterator[QueryTracker]:
+    """
+    Fail with QueryBudgetExceeded when the block runs more than `budget` statements, e.g.
+    `with query_budget(2): await service.get_movies_with_pagination(...)` in a test
+    """
+    with track_queries(label) as tracker:
+        yield tracker
+    message = tracker.over_budget(budget)
+    if message:
+        raise QueryBudgetExceeded(message)
+
+
+def explain_statement(conn, statement: str, parameters) -> Optional[str]:
+    """
+    Plan of a statement, one line per plan row. Runs on a raw cursor of the same connection,
+    so it is neither instrumented nor part of the ORM transaction state
+    """
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name, "EXPLAIN ")
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception as e:
+        logging.debug(f"EXPLAIN failed: {e}")
+        return None
+    finally:
+        cursor.close()
+    return "\n".join(" | ".join(str(value) for value in row) for row in rows)
+
+
+class QueryLog:
+    """
+    SQLAlchemy cursor hooks attributing every statement to the current tracker and logging
+    the statements slower than `slow_query_ms` with their parameters and plan
+    """
+
+    def __init__(self, slow_query_ms: float = 0, explain: bool = True):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.explain = explain
+
+    def install(self, engine: AsyncEngine) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self.after_cursor_execute)
+
+    @staticmethod
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        context.query_log_started = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        duration = time.perf_counter() - context.query_log_started
+        tracker = _current_tracker.get()
+        if tracker is not None:
+            tracker.record(statement, duration)
+        if self.slow_query_seconds and duration >= self.slow_query_seconds:
+            self.log_slow_query(conn, statement, parameters, context, executemany, duration, tracker)
+
+    def log_slow_query(self, conn, statement, parameters, context, executemany, duration, tracker) -> None:
+        source = tracker.label if tracker is not None else "no request"
+        shown_parameters = f"{len(parameters)} parameter sets" if executemany else repr(parameters)
+        message = f"Slow query ({duration * 1000:.1f}ms, {source}): {statement} {shown_parameters}"
+        # Statements streaming from a server-side cursor keep the connection busy until consumed
+        if (
+                self.explain
+                and not executemany
+                and not context.execution_options.get("stream_results")
+                and statement_operation(statement) in EXPLAINED_OPERATIONS
+        ):
+            plan = explain_statement(conn, statement, parameters)
+            if plan:
+                message += f"\n{plan}"
+        logging.warning(message)
+
+
+class QueryBudgetMiddleware:
+    """
+    ASGI middleware tracking the statements of each request, reporting the requests that ran
+    more than `budget` of them (0 disables the check). In `strict` mode such requests raise
+    QueryBudgetExceeded instead, so tests going through the app fail on N+1 regressions
+    """
+
+    def __init__(self, app, budget: int, strict: bool = False):
+        self.app = app
+        self.budget = budget
+        self.strict = strict
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}") as tracker:
+            await self.app(scope, receive, send)
+
+        message = tracker.over_budget(self.budget) if self.budget else None
+        if message:
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logging.warning(message)
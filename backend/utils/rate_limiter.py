@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+# Seconds of history the observed request rate is computed over
+RATE_WINDOW = 10.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket capping requests per second, combined with an AIMD concurrency limit
+
+    Every successful request raises the concurrency limit by about one per `limit` requests
+    (additive increase), a throttled one (429, 5xx, timeout) halves it (multiplicative
+    decrease), once per window: requests sent before the last decrease saw the same overload
+    and don't shrink the limit again. Callers wait in `acquire` for both a free slot and a token
+    and must call `release` once done. Meant to be used from the event loop only
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            burst: Optional[int] = None,
+            min_concurrency: int = 1,
+            max_concurrency: int = 20,
+            initial_concurrency: Optional[int] = None,
+            decrease_factor: float = 0.5,
+            timer: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.timer = timer
+        self.limit = float(initial_concurrency or min_concurrency)
+        self.tokens = float(self.burst)
+        self.updated_at = timer()
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.throttled = 0
+        # Sequence number of the last request sent when the limit was last decreased
+        self._decreased_after = 0
+        self._history: Deque[float] = deque()
+        self._released = asyncio.Event()
+
+    async def acquire(self) -> int:
+        """Wait until a request may be sent, return its sequence number to pass to `release`"""
+        self.waiting += 1
+        try:
+            while self.in_flight >= int(self.limit):
+                self._released.clear()
+                await self._released.wait()
+            self.in_flight += 1
+            try:
+                await self._take_token()
+            except BaseException:
+                self.in_flight -= 1
+                self._released.set()
+                raise
+        finally:
+            self.waiting -= 1
+        self.requests += 1
+        self._history.append(self.timer())
+        self.observed_rate()  # Drops the history older than the window
+        return self.requests
+
+    def release(self, throttled: Optional[bool] = False, request: Optional[int] = None) -> None:
+        """
+        Free the slot of a finished request, adapting the concurrency limit to its outcome.
+        None stands for a request without outcome (e.g. cancelled), the limit is left as is.
+        `request` is the sequence number returned by `acquire`: a throttled request sent before
+        the last decrease leaves the limit as is
+        """
+        self.in_flight -= 1
+        if throttled:
+            self.throttled += 1
+            if request is None or request > self._decreased_after:
+                self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                self._decreased_after = self.requests
+        elif throttled is not None:
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self._released.set()
+
+    def stats(self) -> Dict[str, float]:
+        """Current limits, observed rate and queue depth"""
+        return {
+            "rate_limit": self.rate,
+            "observed_rate": round(self.observed_rate(), 2),
+            "concurrency_limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "throttled": self.throttled,
+        }
+
+    def observed_rate(self) -> float:
+        """Requests per second sent over the last RATE_WINDOW seconds"""
+        horizon = self.timer() - RATE_WINDOW
+        while self._history and self._history[0] < horizon:
+            self._history.popleft()
+        return len(self._history) / RATE_WINDOW
+
+    async def _take_token(self) -> None:
+        while True:
+            now = self.timer()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
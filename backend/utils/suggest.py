@@ -0,0 +1,239 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from math import ceil
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from utils.transformers import normalize_title, title_fingerprint
+
+# Share of the query trigrams a title must contain to be suggested
+MIN_TRIGRAM_SIMILARITY = 0.5
+# Typo matches are drawn from the postings of the rarest query trigrams, up to this many titles:
+# common trigrams cost the most and tell the least, and a lookup's work stays bounded whatever
+# the catalog size
+TRIGRAM_MAX_CANDIDATES = 2_000
+
+
+class Suggestion(NamedTuple):
+    id: int
+    title: str
+    year: Optional[int]
+    director: Optional[str]
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of a normalized text, padded so word boundaries count"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SuggestIndex:
+    """
+    In-process typeahead index over movie titles and directors
+
+    Ranking: titles starting with the query, then titles or directors with a word
+    starting with it, then typo-tolerant trigram matches. Lookups never touch the
+    database, the index is built at startup and updated on every write
+
+    Memory: about 2.2 KB per movie (titles, word keys and trigram postings), 220 MB for
+    100k movies. Building is CPU bound, run `build` off the event loop and hand the result
+    to the live index with `load`
+    """
+
+    def __init__(self):
+        self._movies: Dict[int, Suggestion] = {}
+        self._titles: List[Tuple[str, int]] = []  # (normalized title, id), sorted
+        self._words: List[Tuple[str, int]] = []  # (title/director from each word on, id), sorted
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._exact: Dict[str, Set[int]] = {}  # normalized title -> ids
+        self._fingerprints: Dict[str, Set[int]] = {}  # title fingerprint -> ids
+        self._changes: Optional[Dict[int, Optional[Suggestion]]] = None  # Writes since start_recording
+        self.ready = True  # False while a build is pending: entries may be missing
+
+    def __len__(self) -> int:
+        return len(self._movies)
+
+    @classmethod
+    def build(cls, rows: Iterable[Tuple[int, str, Optional[int], Optional[str]]]) -> "SuggestIndex":
+        """Build an index from (id, title, year, director) rows, sorting the keys once at the end"""
+        index = cls()
+        for movie_id, title, year, director in rows:
+            index._insert(Suggestion(movie_id, title, year, director), index._titles.append, index._words.append)
+        index._titles.sort()
+        index._words.sort()
+        return index
+
+    def start_recording(self) -> None:
+        """Remember the writes made from now on, so `load` can apply them to a newer build"""
+        self._changes = {}
+        self.ready = False
+
+    def stop_recording(self) -> None:
+        """Forget the recorded writes when the build they were meant for failed"""
+        self._changes = None
+
+    def load(self, built: "SuggestIndex") -> None:
+        """
+        Take over the entries of `built` in place, so holders of this index see them, then
+        replay the writes recorded since `start_recording`
+        """
+        changes = self._changes or {}
+        self.__dict__.update(built.__dict__)
+        self._changes = None
+        self.ready = True
+        for movie_id in [movie_id for movie_id, movie in changes.items() if movie is None]:
+            self.remove(movie_id)
+        self.add_many(movie for movie in changes.values() if movie is not None)
+
+    def add(self, movie_id: int, title: str, year: Optional[int] = None, director: Optional[str] = None) -> None:
+        """Index a movie, replacing any previous entry with the same id"""
+        if movie_id in self._movies:
+            self.remove(movie_id)
+        if self._changes is not None:
+            self._changes[movie_id] = Suggestion(movie_id, title, year, director)
+        self._insert(
+            Suggestion(movie_id, title, year, director),
+            lambda item: insort(self._titles, item),
+            lambda item: insort(self._words, item),
+        )
+
+    def add_many(self, rows: Iterable[Tuple[int, str, Optional[int], Optional[str]]]) -> None:
+        """
+        Index (id, title, year, director) rows, replacing previous entries with the same ids.
+        Sorted keys are filtered and merged once per call rather than updated one by one,
+        for batches of writes
+        """
+        latest = {row[0]: row for row in rows}
+        if self._changes is not None:
+            self._changes.update((movie_id, Suggestion(*row)) for movie_id, row in latest.items())
+        replaced = {movie_id for movie_id in latest if self._forget(movie_id) is not None}
+        if replaced:
+            self._titles = [item for item in self._titles if item[1] not in replaced]
+            self._words = [item for item in self._words if item[1] not in replaced]
+
+        titles, words = [], []
+        for movie_id, title, year, director in latest.values():
+            self._insert(Suggestion(movie_id, title, year, director), titles.append, words.append)
+        if titles:
+            # Timsort merges the new sorted run into the already sorted keys in linear time
+            self._titles.extend(sorted(titles))
+            self._titles.sort()
+            self._words.extend(sorted(words))
+            self._words.sort()
+
+    def remove(self, movie_id: int) -> None:
+        """Drop a movie from the index if present"""
+        if self._changes is not None:
+            self._changes[movie_id] = None
+        movie = self._forget(movie_id)
+        if movie is None:
+            return
+        self._delete_sorted(self._titles, (normalize_title(movie.title), movie_id))
+        for word_key in self._word_keys(movie):
+            self._delete_sorted(self._words, (word_key, movie_id))
+
+    def _forget(self, movie_id: int) -> Optional[Suggestion]:
+        """Drop a movie from every structure but the sorted key lists, returning it if it was indexed"""
+        movie = self._movies.pop(movie_id, None)
+        if movie is None:
+            return None
+
+        key = normalize_title(movie.title)
+        self._exact[key].discard(movie_id)
+        if not self._exact[key]:
+            del self._exact[key]
+        fingerprint = title_fingerprint(movie.title)
+        self._fingerprints[fingerprint].discard(movie_id)
+        if not self._fingerprints[fingerprint]:
+            del self._fingerprints[fingerprint]
+        for trigram in trigrams(key):
+            postings = self._trigrams[trigram]
+            postings.discard(movie_id)
+            if not postings:
+                del self._trigrams[trigram]
+        return movie
+
+    def lookup(self, title: str) -> List[int]:
+        """Ids of the movies whose normalized title equals the normalized `title`"""
+        return sorted(self._exact.get(normalize_title(title), ()))
+
+    def lookup_similar(self, title: str) -> List[int]:
+        """Ids of the movies whose title only differs from `title` by case, punctuation, spacing or articles"""
+        fingerprint = title_fingerprint(title)
+        return sorted(self._fingerprints.get(fingerprint, ())) if fingerprint else []
+
+    def suggest(self, query: str, limit: int = 10) -> List[Suggestion]:
+        """Return up to `limit` movies matching the query, best first"""
+        query = normalize_title(query)
+        if not query:
+            return []
+
+        found: Dict[int, None] = {}  # Ordered set of matching ids
+        for keys in (self._titles, self._words):
+            self._collect_prefix(keys, query, found, limit)
+            if len(found) >= limit:
+                break
+        if len(found) < limit and len(query) >= 3:
+            for movie_id in self._trigram_matches(query, limit):
+                found.setdefault(movie_id)
+                if len(found) >= limit:
+                    break
+        return [self._movies[movie_id] for movie_id in list(found)[:limit]]
+
+    def _insert(self, movie: Suggestion, add_title: Callable, add_word: Callable) -> None:
+        self._movies[movie.id] = movie
+        key = normalize_title(movie.title)
+        add_title((key, movie.id))
+        self._exact.setdefault(key, set()).add(movie.id)
+        self._fingerprints.setdefault(title_fingerprint(movie.title), set()).add(movie.id)
+        for word_key in self._word_keys(movie):
+            add_word((word_key, movie.id))
+        for trigram in trigrams(key):
+            self._trigrams.setdefault(trigram, set()).add(movie.id)
+
+    @staticmethod
+    def _word_keys(movie: Suggestion) -> Set[str]:
+        keys = set()
+        for text in (movie.title, movie.director):
+            words = normalize_title(text).split() if text else []
+            keys.update(" ".join(words[i:]) for i in range(len(words)))
+        return keys
+
+    @staticmethod
+    def _delete_sorted(keys: List[Tuple[str, int]], item: Tuple[str, int]) -> None:
+        position = bisect_left(keys, item)
+        if position < len(keys) and keys[position] == item:
+            del keys[position]
+
+    @staticmethod
+    def _collect_prefix(keys: List[Tuple[str, int]], query: str, found: Dict[int, None], limit: int) -> None:
+        position = bisect_left(keys, (query, -1))
+        while position < len(keys) and len(found) < limit:
+            key, movie_id = keys[position]
+            if not key.startswith(query):
+                break
+            found.setdefault(movie_id)
+            position += 1
+
+    def _trigram_matches(self, query: str, limit: int) -> List[int]:
+        postings = sorted((self._trigrams.get(trigram, set()) for trigram in trigrams(query)), key=len)
+        needed = ceil(MIN_TRIGRAM_SIMILARITY * len(postings))
+
+        # A title sharing `needed` trigrams holds one of the len - needed + 1 rarest (pigeonhole),
+        # so candidates are only taken from their postings, rarest first, while they fit the budget
+        candidates: Set[int] = set()
+        for trigram_postings in postings[:len(postings) - needed + 1]:
+            if len(candidates) + len(trigram_postings) > TRIGRAM_MAX_CANDIDATES:
+                break
+            candidates |= trigram_postings
+        if not candidates:
+            return []
+
+        shared = Counter()
+        for trigram_postings in postings:
+            shared.update(candidates & trigram_postings)  # Set operations, no per-title Python loop
+        # Containment rather than Jaccard, so a short query is not penalized by long titles
+        scored = sorted(
+            (-count, len(self._movies[movie_id].title), movie_id)
+            for movie_id, count in shared.items() if count >= needed
+        )
+        return [movie_id for _, _, movie_id in scored[:limit]]
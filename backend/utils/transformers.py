@@ -1,4 +1,10 @@
-from typing import Dict, Optional
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+# Leading/trailing articles ignored by title fingerprints ("The Matrix" == "Matrix, The")
+ARTICLE_PATTERN = re.compile(r"^(the|a|an) |, (the|a|an)$")
+NON_ALPHANUMERIC_PATTERN = re.compile(r"[\W_]+")
 
 
 def transform_movie_data(api_data: Dict) -> Optional[Dict]:
@@ -8,9 +14,10 @@ def transform_movie_data(api_data: Dict) -> Optional[Dict]:
     if not api_data or api_data.get("Response") != "True":
         return None
 
+    year = api_data.get("Year") or ""
     transformed_data = {
         "title": api_data.get("Title"),
-        "year": int(api_data.get("Year")) if api_data.get("Year").isdigit() else None,
+        "year": int(year) if year.isdigit() else None,
         "imdb_id": api_data.get("imdbID"),
         "type": api_data.get("Type"),
         "poster_url": api_data.get("Poster") if api_data.get("Poster") != "N/A" else None,
@@ -20,3 +27,33 @@ def transform_movie_data(api_data: Dict) -> Optional[Dict]:
     }
 
     return transformed_data
+
+
+def import_record_data(record: Any) -> Dict:
+    """
+    Movie fields of an imported record: OMDB payloads (recognized by their `imdbID`) are
+    transformed, anything else is taken as MovieCreate fields
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Expected a JSON object")
+    if "imdbID" not in record:
+        return record
+    data = transform_movie_data({"Response": "True", **record})  # Payloads without Response are successful ones
+    if data is None:
+        raise ValueError(record.get("Error") or "Unsuccessful OMDB response")
+    return data
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalize a title for lookups: unicode folding, case folding and collapsed whitespace
+    """
+    return " ".join(unicodedata.normalize("NFKC", title).casefold().split())
+
+
+def title_fingerprint(title: str) -> str:
+    """
+    Loose form of a title for duplicate detection: normalized, without articles,
+    punctuation or spaces ("Spider-Man: Homecoming" == "spiderman homecoming")
+    """
+    return NON_ALPHANUMERIC_PATTERN.sub("", ARTICLE_PATTERN.sub("", normalize_title(title)))